@@ -0,0 +1,32 @@
+"""alerts keyset pagination index
+
+Revision ID: 20261018_0002
+Revises: 20260225_0001
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0002'
+down_revision: Union[str, None] = '20260225_0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_alerts_session_created_id',
+        'alerts',
+        ['exam_session_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+    )
+    op.drop_index(op.f('ix_alerts_exam_session_id'), table_name='alerts')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_alerts_exam_session_id'), 'alerts', ['exam_session_id'], unique=False)
+    op.drop_index('ix_alerts_session_created_id', table_name='alerts')
@@ -0,0 +1,30 @@
+"""alert occurrence counter for coalesced bursts
+
+Revision ID: 20261018_0003
+Revises: 20261018_0002
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0003'
+down_revision: Union[str, None] = '20261018_0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('occurrences', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    # Existing rows were last seen when they were created, not when this migration ran.
+    op.add_column('alerts', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute('UPDATE alerts SET last_seen_at = created_at')
+    op.alter_column('alerts', 'last_seen_at', server_default=sa.text('now()'), nullable=False)
+
+
+def downgrade() -> None:
+    op.drop_column('alerts', 'last_seen_at')
+    op.drop_column('alerts', 'occurrences')
@@ -0,0 +1,75 @@
+"""range-partition alerts by created_at
+
+Revision ID: 20261018_0004
+Revises: 20261018_0003
+Create Date: 2026-10-18 00:00:00
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '20261018_0004'
+down_revision: Union[str, None] = '20261018_0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+_COLUMNS = """
+    id UUID NOT NULL,
+    exam_session_id UUID NOT NULL REFERENCES exam_sessions (id) ON DELETE CASCADE,
+    severity alert_severity NOT NULL,
+    event_type VARCHAR(100) NOT NULL,
+    description TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+    occurrences INTEGER NOT NULL DEFAULT 1,
+    last_seen_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+"""
+
+_CREATE_MONTHLY_PARTITIONS = f"""
+DO $$
+DECLARE
+    bucket date := date_trunc('month', COALESCE((SELECT min(created_at) FROM alerts_unpartitioned), now()) AT TIME ZONE 'UTC')::date;
+    last_bucket date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date;
+BEGIN
+    WHILE bucket <= last_bucket LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF alerts FOR VALUES FROM (%L) TO (%L)',
+            'alerts_p' || to_char(bucket, 'YYYYMM'),
+            bucket::timestamp AT TIME ZONE 'UTC',
+            (bucket + interval '1 month')::timestamp AT TIME ZONE 'UTC'
+        );
+        bucket := (bucket + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE alerts RENAME TO alerts_unpartitioned')
+    op.execute('ALTER INDEX ix_alerts_session_created_id RENAME TO ix_alerts_unpartitioned_session_created_id')
+    op.execute('ALTER TABLE alerts_unpartitioned RENAME CONSTRAINT alerts_pkey TO alerts_unpartitioned_pkey')
+
+    op.execute(f'CREATE TABLE alerts ({_COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)')
+    op.execute('CREATE INDEX ix_alerts_session_created_id ON alerts (exam_session_id, created_at DESC, id DESC)')
+    op.execute('CREATE TABLE alerts_default PARTITION OF alerts DEFAULT')
+    op.execute(_CREATE_MONTHLY_PARTITIONS)
+
+    op.execute(
+        'INSERT INTO alerts (id, exam_session_id, severity, event_type, description, created_at, occurrences, last_seen_at) '
+        'SELECT id, exam_session_id, severity, event_type, description, created_at, occurrences, last_seen_at '
+        'FROM alerts_unpartitioned'
+    )
+    op.execute('DROP TABLE alerts_unpartitioned')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE alerts RENAME TO alerts_partitioned')
+    op.execute('ALTER INDEX ix_alerts_session_created_id RENAME TO ix_alerts_partitioned_session_created_id')
+    op.execute('ALTER TABLE alerts_partitioned RENAME CONSTRAINT alerts_pkey TO alerts_partitioned_pkey')
+    op.execute(f'CREATE TABLE alerts ({_COLUMNS}, CONSTRAINT alerts_pkey PRIMARY KEY (id))')
+    op.execute('CREATE INDEX ix_alerts_session_created_id ON alerts (exam_session_id, created_at DESC, id DESC)')
+    op.execute('INSERT INTO alerts SELECT * FROM alerts_partitioned')
+    op.execute('DROP TABLE alerts_partitioned')
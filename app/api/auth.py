@@ -3,14 +3,19 @@ from jwt import InvalidTokenError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.security import (
+    PasswordHasherBusy,
     create_access_token,
     create_refresh_token,
     decode_token,
-    get_password_hash,
-    verify_password,
+    password_hasher,
 )
-from app.db.session import get_db, redis_client
+from app.api.deps import get_current_user, hasher_busy, limit_by_ip
+from app.db.principals import Principal
+from app.db.rate_limits import login_limiter, register_limiter
+from app.db.refresh_tokens import refresh_token_store
+from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RefreshRequest, TokenPair
 from app.schemas.user import UserCreate, UserRead
@@ -18,16 +23,26 @@ from app.schemas.user import UserCreate, UserRead
 router = APIRouter(prefix='/auth', tags=['auth'])
 
 
-@router.post('/register', response_model=UserRead, status_code=status.HTTP_201_CREATED)
+@router.post(
+    '/register',
+    response_model=UserRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_by_ip(register_limiter))],
+)
 async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)) -> User:
     existing = await db.execute(select(User).where(User.email == payload.email))
     if existing.scalar_one_or_none() is not None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Email already registered')
 
+    try:
+        hashed_password = await password_hasher.hash(payload.password)
+    except PasswordHasherBusy as exc:
+        raise hasher_busy() from exc
+
     user = User(
         email=payload.email,
         full_name=payload.full_name,
-        hashed_password=get_password_hash(payload.password),
+        hashed_password=hashed_password,
         role=payload.role,
     )
     db.add(user)
@@ -36,16 +51,29 @@ async def register(payload: UserCreate, db: AsyncSession = Depends(get_db)) -> U
     return user
 
 
-@router.post('/login', response_model=TokenPair)
+@router.post('/login', response_model=TokenPair, dependencies=[Depends(limit_by_ip(login_limiter))])
 async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)) -> TokenPair:
     result = await db.execute(select(User).where(User.email == payload.email))
     user = result.scalar_one_or_none()
-    if user is None or not verify_password(payload.password, user.hashed_password):
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid credentials')
+
+    try:
+        if settings.PASSWORD_REHASH_ON_LOGIN:
+            verified, new_hash = await password_hasher.verify_and_update(payload.password, user.hashed_password)
+        else:
+            verified, new_hash = await password_hasher.verify(payload.password, user.hashed_password), None
+    except PasswordHasherBusy as exc:
+        raise hasher_busy() from exc
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid credentials')
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        await db.commit()
 
     access_token = create_access_token(str(user.id))
     refresh_token = create_refresh_token(str(user.id))
-    await redis_client.setex(f'refresh:{refresh_token}', 60 * 60 * 24 * 7, str(user.id))
+    await refresh_token_store.issue(str(user.id), refresh_token)
     return TokenPair(access_token=access_token, refresh_token=refresh_token)
 
 
@@ -59,12 +87,14 @@ async def refresh_tokens(payload: RefreshRequest) -> TokenPair:
     except InvalidTokenError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid refresh token') from exc
 
-    exists = await redis_client.get(f'refresh:{payload.refresh_token}')
-    if exists is None:
+    new_refresh = create_refresh_token(subject)
+    if not await refresh_token_store.rotate(subject, payload.refresh_token, new_refresh):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Refresh token revoked or expired')
 
-    await redis_client.delete(f'refresh:{payload.refresh_token}')
     access_token = create_access_token(subject)
-    new_refresh = create_refresh_token(subject)
-    await redis_client.setex(f'refresh:{new_refresh}', 60 * 60 * 24 * 7, subject)
     return TokenPair(access_token=access_token, refresh_token=new_refresh)
+
+
+@router.post('/logout-all', status_code=status.HTTP_204_NO_CONTENT)
+async def logout_everywhere(current_user: Principal = Depends(get_current_user)) -> None:
+    await refresh_token_store.revoke_all(current_user.id)
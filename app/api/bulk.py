@@ -0,0 +1,56 @@
+import csv
+import io
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.config import settings
+from app.schemas.bulk import BulkRowError
+
+
+async def read_rows(request: Request) -> list[dict[str, Any]]:
+    body = await request.body()
+    content_type = request.headers.get('content-type', '').split(';')[0].strip()
+    if content_type == 'text/csv':
+        try:
+            rows = [{key: value for key, value in row.items() if value != ''} for row in csv.DictReader(io.StringIO(body.decode()))]
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid CSV body') from exc
+    elif content_type == 'application/json':
+        try:
+            rows = orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid JSON body') from exc
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Expected a JSON array')
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail='Expected application/json or text/csv')
+
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.BULK_IMPORT_MAX_ROWS} rows per import',
+        )
+    return rows
+
+
+def validate_rows(rows: list[Any], schema: type[BaseModel]) -> tuple[list[tuple[int, BaseModel]], list[BulkRowError]]:
+    valid: list[tuple[int, BaseModel]] = []
+    errors: list[BulkRowError] = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, schema.model_validate(row)))
+        except ValidationError as exc:
+            first = exc.errors()[0]
+            location = '.'.join(str(part) for part in first['loc'])
+            errors.append(BulkRowError(row=index, detail=f'{location}: {first["msg"]}' if location else first['msg']))
+    return valid, errors
+
+
+def upsert_insert(dialect: str, table):
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    return sqlite.insert(table)
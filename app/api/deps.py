@@ -1,19 +1,26 @@
+import math
+from ipaddress import ip_address, ip_network
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import InvalidTokenError
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.logging import session_id_var
 from app.core.security import decode_token
+from app.db.principals import Principal, principal_cache
+from app.db.rate_limits import RateLimiter, alert_session_limiter, alert_user_limiter
 from app.db.session import get_db
 from app.models.user import User, UserRole
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/v1/auth/login')
+trusted_proxies = [ip_network(proxy, strict=False) for proxy in settings.RATE_LIMIT_TRUSTED_PROXIES]
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+async def authenticate_token(token: str, db: AsyncSession) -> Principal:
     try:
         payload = decode_token(token)
         if payload.get('type') != 'access':
@@ -25,17 +32,86 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except (InvalidTokenError, ValueError) as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Could not validate credentials') from exc
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if user is None:
+    async def load(user_id: UUID) -> Principal | None:
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        return Principal.from_user(user) if user is not None else None
+
+    principal = await principal_cache.get(user_id, load)
+    if principal is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='User not found')
-    return user
+    return principal
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    return await authenticate_token(token, db)
 
 
 def require_role(*roles: UserRole):
-    async def checker(current_user: User = Depends(get_current_user)) -> User:
+    async def checker(current_user: Principal = Depends(get_current_user)) -> Principal:
         if current_user.role not in roles:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Insufficient permissions')
         return current_user
 
     return checker
+
+
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail='Authentication is busy, retry shortly',
+        headers={'Retry-After': '1'},
+    )
+
+
+async def bind_log_context(request: Request) -> None:
+    session_id = request.path_params.get('session_id')
+    if session_id is not None:
+        session_id_var.set(str(session_id))
+
+
+def too_many_requests(wait: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail='Rate limit exceeded',
+        headers={'Retry-After': str(max(math.ceil(wait), 1))},
+    )
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
+
+
+# Walk X-Forwarded-For from the right and stop at the first hop no trusted proxy vouches for.
+def client_ip(request: Request) -> str:
+    host = request.client.host if request.client is not None else 'unknown'
+    if not trusted_proxies or not _is_trusted_proxy(host):
+        return host
+    forwarded = [hop.strip() for hop in request.headers.get('x-forwarded-for', '').split(',') if hop.strip()]
+    for hop in reversed(forwarded):
+        host = hop
+        if not _is_trusted_proxy(hop):
+            break
+    return host
+
+
+def limit_by_ip(limiter: RateLimiter | None):
+    async def checker(request: Request) -> None:
+        if limiter is not None:
+            wait = await limiter.check(client_ip(request))
+            if wait:
+                raise too_many_requests(wait)
+
+    return checker
+
+
+async def limit_alert_writes(session_id: UUID, current_user: Principal = Depends(get_current_user)) -> None:
+    for limiter, key in ((alert_session_limiter, session_id), (alert_user_limiter, current_user.id)):
+        if limiter is not None:
+            wait = await limiter.check(key)
+            if wait:
+                raise too_many_requests(wait)
@@ -1,24 +1,50 @@
+import re
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, require_role
-from app.db.session import get_db
-from app.models.alert import Alert
+from app.api.bulk import read_rows, validate_rows
+from app.api.deps import bind_log_context, get_current_user, limit_alert_writes, require_role
+from app.api.export import ExportFormat, export_response
+from app.api.pagination import PageParams, as_utc, finish_page, keyset_page, keyset_slice
+from app.api.responses import columns_for, etag_headers, not_modified, rows_response, version_etag
+from app.core.config import settings
+from app.db.alert_buffer import alert_buffer, insert_alerts
+from app.db.alert_partitions import alert_archive, merge_archived
+from app.db.alert_dedup import AlertWrite, alert_deduplicator
+from app.db.alert_stats import alert_stats
+from app.db.principals import Principal
+from app.db.session import get_db, get_read_db
+from app.db.versions import version_store
+from app.models.alert import Alert, AlertSeverity
 from app.models.exam_session import ExamSession, SessionStatus
 from app.models.user import User, UserRole
-from app.schemas.exam import AlertCreate, AlertRead, ExamSessionCreate, ExamSessionRead
+from app.schemas.bulk import BulkRowError
+from app.schemas.exam import (
+    AlertBatchCreate,
+    AlertCreate,
+    AlertRead,
+    AlertSummary,
+    ExamSessionBulkCreate,
+    ExamSessionBulkResult,
+    ExamSessionCreate,
+    ExamSessionRead,
+)
+from app.websocket.event_log import EVENT_ID_PATTERN
+from app.websocket.manager import EventType, manager
 
-router = APIRouter(prefix='/exam', tags=['exam'])
+router = APIRouter(prefix='/exam', tags=['exam'], dependencies=[Depends(bind_log_context)])
 
 
 @router.post('/sessions', response_model=ExamSessionRead, status_code=status.HTTP_201_CREATED)
 async def create_exam_session(
     payload: ExamSessionCreate,
-    _: User = Depends(require_role(UserRole.INVIGILATOR)),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
     db: AsyncSession = Depends(get_db),
 ) -> ExamSession:
     session = ExamSession(
@@ -32,10 +58,56 @@ async def create_exam_session(
     return session
 
 
+@router.post('/sessions:batch', response_model=ExamSessionBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_exam_sessions_batch(
+    request: Request,
+    start: bool = Query(default=False),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    valid, errors = validate_rows(await read_rows(request), ExamSessionBulkCreate)
+    user_ids = {row.student_id for _, row in valid if row.student_id} | {row.invigilator_id for _, row in valid if row.invigilator_id}
+    emails = {row.student_email for _, row in valid if row.student_id is None}
+    known_ids: set[UUID] = set()
+    ids_by_email: dict[str, UUID] = {}
+    if user_ids or emails:
+        result = await db.execute(select(User.id, User.email).where(or_(User.id.in_(user_ids), User.email.in_(emails))))
+        for user_id, email in result:
+            known_ids.add(user_id)
+            ids_by_email[email] = user_id
+
+    started_at = datetime.now(timezone.utc) if start else None
+    rows = []
+    for index, row in valid:
+        student_id = row.student_id or ids_by_email.get(row.student_email)
+        if student_id not in known_ids:
+            errors.append(BulkRowError(row=index, detail='Student not found'))
+        elif row.invigilator_id is not None and row.invigilator_id not in known_ids:
+            errors.append(BulkRowError(row=index, detail='Invigilator not found'))
+        else:
+            rows.append(
+                {
+                    'id': uuid4(),
+                    'exam_name': row.exam_name,
+                    'student_id': student_id,
+                    'invigilator_id': row.invigilator_id,
+                    'status': SessionStatus.ACTIVE if start else SessionStatus.SCHEDULED,
+                    'started_at': started_at,
+                }
+            )
+
+    created = []
+    if rows:
+        stmt = insert(ExamSession).returning(*columns_for(ExamSession, ExamSessionRead), sort_by_parameter_order=True)
+        created = (await db.execute(stmt, rows)).all()
+        await db.commit()
+    return {'created': created, 'errors': sorted(errors, key=lambda error: error.row)}
+
+
 @router.post('/sessions/{session_id}/start', response_model=ExamSessionRead)
 async def start_session(
     session_id: UUID,
-    _: User = Depends(require_role(UserRole.INVIGILATOR)),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
     db: AsyncSession = Depends(get_db),
 ) -> ExamSession:
     result = await db.execute(select(ExamSession).where(ExamSession.id == session_id))
@@ -46,37 +118,221 @@ async def start_session(
     session.status = SessionStatus.ACTIVE
     session.started_at = datetime.now(timezone.utc)
     await db.commit()
+    await version_store.bump_session(session_id)
     await db.refresh(session)
     return session
 
 
-@router.post('/sessions/{session_id}/alerts', response_model=AlertRead, status_code=status.HTTP_201_CREATED)
+async def _authorize_alert_write(db: AsyncSession, session_id: UUID, current_user: Principal) -> str:
+    result = await db.execute(select(ExamSession.student_id, ExamSession.exam_name).where(ExamSession.id == session_id))
+    row = result.one_or_none()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Session not found')
+
+    if current_user.role == UserRole.STUDENT and row.student_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Not allowed for this session')
+    return row.exam_name
+
+
+async def _write_alerts(db: AsyncSession, session_id: UUID, alerts: list[AlertCreate]) -> list[AlertWrite]:
+    rows = [{'exam_session_id': session_id, **alert.model_dump()} for alert in alerts]
+    if alert_deduplicator is None:
+        return [AlertWrite(alert=alert, count=1, created=True) for alert in await _insert_alerts(db, rows)]
+
+    # Repeats may wait for the first writer's commit; hold neither a pooled connection nor a stale snapshot meanwhile.
+    await db.close()
+    claimed, repeats = await alert_deduplicator.claim(session_id, rows)
+    try:
+        writes, orphans = await alert_deduplicator.bump(db, session_id, repeats)
+        claimed += orphans
+        created = await _insert_alerts(db, [pending.row for pending in claimed]) if claimed else []
+    except BaseException:
+        await alert_deduplicator.release(session_id, claimed)
+        raise
+    await alert_deduplicator.confirm(session_id, claimed)
+    return writes + [AlertWrite(alert=alert, count=pending.count, created=True) for alert, pending in zip(created, claimed)]
+
+
+async def _insert_alerts(db: AsyncSession, rows: list[dict]) -> list[Alert]:
+    if alert_buffer is not None:
+        await db.close()
+        return await alert_buffer.submit(rows)
+    return await insert_alerts(db, rows)
+
+
+async def _after_alerts_committed(session_id: UUID, exam_name: str, writes: list[AlertWrite]) -> None:
+    await alert_stats.record(session_id, exam_name, [(write.alert, write.count) for write in writes])
+    for write in writes:
+        data = AlertRead.model_validate(write.alert).model_dump(mode='json')
+        if write.created:
+            await manager.publish(session_id, EventType.ALERT_CREATED, data)
+        else:
+            manager.publish_coalesced(
+                session_id, str(write.alert.id), EventType.ALERT_UPDATED, data, settings.WS_COALESCE_INTERVAL_MS / 1000
+            )
+
+
+@router.post(
+    '/sessions/{session_id}/alerts',
+    response_model=AlertRead,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_alert_writes)],
+)
 async def create_alert(
     session_id: UUID,
     payload: AlertCreate,
-    current_user: User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> Alert:
-    result = await db.execute(select(ExamSession).where(ExamSession.id == session_id))
-    session = result.scalar_one_or_none()
-    if session is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Session not found')
+    exam_name = await _authorize_alert_write(db, session_id, current_user)
+    writes = await _write_alerts(db, session_id, [payload])
+    await version_store.bump_session(session_id)
+    background_tasks.add_task(_after_alerts_committed, session_id, exam_name, writes)
+    return writes[0].alert
 
-    if current_user.role == UserRole.STUDENT and session.student_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Not allowed for this session')
 
-    alert = Alert(exam_session_id=session_id, **payload.model_dump())
-    db.add(alert)
-    await db.commit()
-    await db.refresh(alert)
-    return alert
+@router.post(
+    '/sessions/{session_id}/alerts:batch',
+    response_model=list[AlertRead],
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_alert_writes)],
+)
+async def create_alerts_batch(
+    session_id: UUID,
+    payload: AlertBatchCreate,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> list[Alert]:
+    exam_name = await _authorize_alert_write(db, session_id, current_user)
+    writes = await _write_alerts(db, session_id, payload.alerts)
+    await version_store.bump_session(session_id)
+    background_tasks.add_task(_after_alerts_committed, session_id, exam_name, writes)
+    return [write.alert for write in writes]
 
 
 @router.get('/sessions/{session_id}/alerts', response_model=list[AlertRead])
 async def list_alerts(
     session_id: UUID,
-    _: User = Depends(require_role(UserRole.INVIGILATOR)),
+    request: Request,
+    response: Response,
+    since: datetime | None = Query(default=None),
+    severity: AlertSeverity | None = Query(default=None),
+    page: PageParams = Depends(),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
     db: AsyncSession = Depends(get_db),
-) -> list[Alert]:
-    result = await db.execute(select(Alert).where(Alert.exam_session_id == session_id).order_by(Alert.created_at.desc()))
-    return list(result.scalars().all())
+) -> Response:
+    etag = version_etag(await version_store.session_version(session_id), request)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    stmt = select(*columns_for(Alert, AlertRead)).where(Alert.exam_session_id == session_id)
+    if since is not None:
+        stmt = stmt.where(Alert.created_at >= since)
+    if severity is not None:
+        stmt = stmt.where(Alert.severity == severity)
+    await alert_archive.refresh()
+    if alert_archive.has_session(session_id):
+        rows = merge_archived(await alert_archive.session_rows(session_id), (await db.execute(stmt)).all())
+        if since is not None:
+            rows = [row for row in rows if as_utc(row.created_at) >= as_utc(since)]
+        if severity is not None:
+            rows = [row for row in rows if row.severity == severity]
+        rows = keyset_slice(rows, page)
+    else:
+        rows = (await db.execute(keyset_page(stmt, Alert.created_at, Alert.id, page))).all()
+    response.headers.update(etag_headers(etag))
+    return rows_response(finish_page(rows, page, response), AlertRead, response)
+
+
+@router.get('/sessions/{session_id}/alerts/export')
+async def export_session_alerts(
+    session_id: UUID,
+    format: ExportFormat = Query(default=ExportFormat.NDJSON),
+    gzip: bool = Query(default=False),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+) -> StreamingResponse:
+    stmt = (
+        select(*columns_for(Alert, AlertRead))
+        .where(Alert.exam_session_id == session_id)
+        .order_by(Alert.created_at, Alert.id)
+    )
+    await alert_archive.refresh()
+    archived = alert_archive.iter_sessions([session_id]) if alert_archive.has_session(session_id) else None
+    return export_response(stmt, AlertRead, format, gzip, f'alerts-{session_id}', archived)
+
+
+@router.get('/exams/{exam_name}/alerts/export')
+async def export_exam_alerts(
+    exam_name: str,
+    format: ExportFormat = Query(default=ExportFormat.NDJSON),
+    gzip: bool = Query(default=False),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    session_ids = (await db.scalars(select(ExamSession.id).where(ExamSession.exam_name == exam_name))).all()
+    await alert_archive.refresh()
+    archived_ids = [session_id for session_id in session_ids if alert_archive.has_session(session_id)]
+    stmt = (
+        select(*columns_for(Alert, AlertRead))
+        .join(ExamSession, ExamSession.id == Alert.exam_session_id)
+        .where(ExamSession.exam_name == exam_name)
+        .order_by(Alert.exam_session_id, Alert.created_at, Alert.id)
+    )
+    archived = alert_archive.iter_sessions(archived_ids) if archived_ids else None
+    return export_response(stmt, AlertRead, format, gzip, f'alerts-{exam_name}', archived)
+
+
+@router.get('/sessions/{session_id}/summary', response_model=AlertSummary)
+async def session_alert_summary(
+    session_id: UUID,
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+) -> dict:
+    return await alert_stats.session_summary(session_id)
+
+
+@router.get('/exams/{exam_name}/summary', response_model=AlertSummary)
+async def exam_alert_summary(
+    exam_name: str,
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+) -> dict:
+    return await alert_stats.exam_summary(exam_name)
+
+
+_SSE_LINE_BREAK = re.compile(r'\r\n|\r|\n')
+
+
+def _sse_event(event_id: str, data: str) -> str:
+    # Every line of the payload gets its own data field so a line break cannot start a new event.
+    lines = ''.join(f'data: {line}\n' for line in _SSE_LINE_BREAK.split(data))
+    return f'id: {event_id}\n{lines}\n'
+
+
+@router.get('/sessions/{session_id}/events')
+async def stream_session_events(
+    session_id: UUID,
+    last_event_id: str | None = Header(default=None),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+) -> StreamingResponse:
+    event_log = manager.event_log
+    if event_log is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Event log is disabled')
+    if last_event_id is not None and not EVENT_ID_PATTERN.match(last_event_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid Last-Event-ID')
+
+    async def events() -> AsyncIterator[str]:
+        cursor = last_event_id or await event_log.last_id(session_id)
+        for event_id, data in await event_log.read_after(session_id, cursor):
+            cursor = event_id
+            yield _sse_event(event_id, data)
+        while True:
+            entries = await event_log.wait_after(session_id, cursor, block_ms=15_000)
+            if not entries:
+                yield ': keepalive\n\n'
+                continue
+            for event_id, data in entries:
+                cursor = event_id
+                yield _sse_event(event_id, data)
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
@@ -0,0 +1,105 @@
+import csv
+import enum
+import io
+import re
+import zlib
+from collections.abc import AsyncIterator, Sequence
+from urllib.parse import quote
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.core.config import settings
+from app.db.session import db_router
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+MEDIA_TYPES = {ExportFormat.NDJSON: 'application/x-ndjson', ExportFormat.CSV: 'text/csv'}
+_UNSAFE_FILENAME = re.compile(r'[^A-Za-z0-9._-]')
+
+
+async def stream_partitions(stmt: Select, chunk_size: int = settings.EXPORT_CHUNK_SIZE) -> AsyncIterator[Sequence]:
+    async with db_router.read_session() as db:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+def _csv_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence], fields: Sequence[str], fmt: ExportFormat, compress: bool = False
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def emit(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor is not None else chunk
+
+    if fmt is ExportFormat.CSV:
+        writer.writerow(fields)
+        yield emit(buffer.getvalue().encode())
+
+    async for partition in partitions:
+        if fmt is ExportFormat.NDJSON:
+            chunk = b''.join(
+                orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE) for row in partition
+            )
+        else:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_csv_value(value) for value in row] for row in partition)
+            chunk = buffer.getvalue().encode()
+        data = emit(chunk)
+        if data:
+            yield data
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+async def merge_partitions(archived: AsyncIterator[Sequence], live: AsyncIterator[Sequence]) -> AsyncIterator[Sequence]:
+    # A partition is archived before it is detached, so the same rows can briefly exist in both sources.
+    seen = set()
+    async for partition in archived:
+        seen.update(row.id for row in partition)
+        yield partition
+    async for partition in live:
+        yield [row for row in partition if row.id not in seen] if seen else partition
+
+
+def content_disposition(filename: str) -> str:
+    fallback = _UNSAFE_FILENAME.sub('_', filename)
+    return f'attachment; filename="{fallback}"; filename*=UTF-8\'\'{quote(filename, safe="")}'
+
+
+def export_response(
+    stmt: Select,
+    schema: type[BaseModel],
+    fmt: ExportFormat,
+    compress: bool,
+    filename: str,
+    archived: AsyncIterator[Sequence] | None = None,
+) -> StreamingResponse:
+    headers = {'Content-Disposition': content_disposition(f'{filename}.{fmt.value}')}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+    partitions = stream_partitions(stmt) if archived is None else merge_partitions(archived, stream_partitions(stmt))
+    return StreamingResponse(
+        encode_rows(partitions, tuple(schema.model_fields), fmt, compress),
+        media_type=MEDIA_TYPES[fmt],
+        headers=headers,
+    )
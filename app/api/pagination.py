@@ -0,0 +1,66 @@
+import base64
+import binascii
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class PageParams:
+    def __init__(
+        self,
+        cursor: str | None = Query(default=None, description='Opaque cursor from the previous page'),
+        limit: int = Query(default=100, ge=1, le=1000),
+    ) -> None:
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    raw = f'{created_at.isoformat()}|{row_id}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor') from exc
+
+
+def keyset_page(
+    stmt: Select,
+    created_at: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    page: PageParams,
+) -> Select:
+    if page.cursor is not None:
+        stmt = stmt.where(tuple_(created_at, row_id) < tuple_(*decode_cursor(page.cursor)))
+    return stmt.order_by(created_at.desc(), row_id.desc()).limit(page.limit + 1)
+
+
+def as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def keyset_slice(rows: list, page: PageParams) -> list:
+    rows = sorted(rows, key=lambda row: (as_utc(row.created_at), row.id), reverse=True)
+    if page.cursor is not None:
+        created_at, row_id = decode_cursor(page.cursor)
+        cursor = (as_utc(created_at), row_id)
+        rows = [row for row in rows if (as_utc(row.created_at), row.id) < cursor]
+    return rows[: page.limit + 1]
+
+
+def finish_page(rows: list, page: PageParams, response: Response) -> list:
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    return rows
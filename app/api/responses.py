@@ -0,0 +1,44 @@
+import hashlib
+from collections.abc import Sequence
+
+import orjson
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.db.base import Base
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+
+
+def columns_for(model: type[Base], schema: type[BaseModel]) -> list[InstrumentedAttribute]:
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def rows_response(rows: Sequence, schema: type[BaseModel], response: Response) -> FastJSONResponse:
+    fields = tuple(schema.model_fields)
+    return FastJSONResponse([dict(zip(fields, row)) for row in rows], headers=dict(response.headers))
+
+
+def version_etag(version: int, request: Request, *parts: str) -> str:
+    query = '&'.join(sorted(f'{key}={value}' for key, value in request.query_params.multi_items()))
+    digest = hashlib.blake2b('|'.join((query, *parts)).encode(), digest_size=6).hexdigest()
+    return f'"{version}-{digest}"'
+
+
+def not_modified(request: Request, etag: str) -> Response | None:
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return None
+    candidates = {candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')}
+    if etag in candidates or '*' in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
+    return None
+
+
+def etag_headers(etag: str) -> dict[str, str]:
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}
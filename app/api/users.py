@@ -1,24 +1,88 @@
-from fastapi import APIRouter, Depends
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, require_role
-from app.db.session import get_db
+from app.api.bulk import read_rows, upsert_insert, validate_rows
+from app.api.deps import get_current_user, hasher_busy, require_role
+from app.api.pagination import PageParams, finish_page, keyset_page
+from app.api.responses import FastJSONResponse, columns_for, etag_headers, not_modified, rows_response, version_etag
+from app.core.security import PasswordHasherBusy, bulk_password_hasher
+from app.db.principals import Principal
+from app.db.session import get_db, get_read_db
+from app.db.versions import version_store
 from app.models.user import User, UserRole
-from app.schemas.user import UserRead
+from app.schemas.bulk import BulkRowError
+from app.schemas.user import UserBulkResult, UserCreate, UserRead
 
 router = APIRouter(prefix='/users', tags=['users'])
 
 
 @router.get('/me', response_model=UserRead)
-async def get_me(current_user: User = Depends(get_current_user)) -> User:
+async def get_me(request: Request, response: Response, current_user: Principal = Depends(get_current_user)) -> Principal | Response:
+    etag = version_etag(await version_store.user_version(current_user.id), request, current_user.dumps())
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    response.headers.update(etag_headers(etag))
     return current_user
 
 
 @router.get('/', response_model=list[UserRead])
 async def list_users(
-    _: User = Depends(require_role(UserRole.INVIGILATOR)),
+    response: Response,
+    page: PageParams = Depends(),
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
+    db: AsyncSession = Depends(get_read_db),
+) -> FastJSONResponse:
+    result = await db.execute(keyset_page(select(*columns_for(User, UserRead)), User.created_at, User.id, page))
+    return rows_response(finish_page(result.all(), page, response), UserRead, response)
+
+
+@router.post(':batch', response_model=UserBulkResult, status_code=status.HTTP_201_CREATED)
+async def create_users_batch(
+    request: Request,
+    _: Principal = Depends(require_role(UserRole.INVIGILATOR)),
     db: AsyncSession = Depends(get_db),
-) -> list[User]:
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
-    return list(result.scalars().all())
+) -> dict:
+    valid, errors = validate_rows(await read_rows(request), UserCreate)
+    rows_by_email: dict[str, int] = {}
+    unique: list[tuple[int, UserCreate]] = []
+    for index, user in valid:
+        if user.email in rows_by_email:
+            errors.append(BulkRowError(row=index, detail=f'Duplicate email in import, first seen in row {rows_by_email[user.email]}'))
+            continue
+        rows_by_email[user.email] = index
+        unique.append((index, user))
+    if unique:
+        # Skip hashing rows that would only be rejected; the upsert below still catches concurrent imports.
+        result = await db.execute(select(User.email).where(User.email.in_([user.email for _, user in unique])))
+        registered = set(result.scalars())
+        errors.extend(BulkRowError(row=index, detail='Email already registered') for index, user in unique if user.email in registered)
+        unique = [(index, user) for index, user in unique if user.email not in registered]
+    if not unique:
+        return {'created': [], 'errors': sorted(errors, key=lambda error: error.row)}
+
+    try:
+        hashes = await bulk_password_hasher.hash_many([user.password for _, user in unique])
+    except PasswordHasherBusy as exc:
+        raise hasher_busy() from exc
+
+    rows = [
+        {'id': uuid4(), 'email': user.email, 'full_name': user.full_name, 'hashed_password': hashed, 'role': user.role}
+        for (_, user), hashed in zip(unique, hashes)
+    ]
+    stmt = (
+        upsert_insert(db.bind.dialect.name, User)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(*columns_for(User, UserRead))
+    )
+    created = (await db.execute(stmt, rows)).all()
+    await db.commit()
+
+    created_emails = {row.email for row in created}
+    errors.extend(
+        BulkRowError(row=index, detail='Email already registered') for index, user in unique if user.email not in created_emails
+    )
+    return {'created': created, 'errors': sorted(errors, key=lambda error: error.row)}
@@ -1,5 +1,6 @@
 from functools import lru_cache
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,6 +15,14 @@ class Settings(BaseSettings):
 
     DATABASE_URL: str = 'postgresql+asyncpg://quasar:quasar@db:5432/quasar'
     ALEMBIC_DATABASE_URL: str = 'postgresql+psycopg://quasar:quasar@db:5432/quasar'
+    DATABASE_REPLICA_URL: str | None = None
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_CHECK_INTERVAL_SECONDS: float = 5.0
+    DB_REPLICA_PROBE_TIMEOUT_SECONDS: float = 1.0
 
     REDIS_URL: str = 'redis://redis:6379/0'
 
@@ -22,7 +31,68 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
 
+    PASSWORD_HASH_EXECUTOR: str = 'thread'
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 256
+    PASSWORD_REHASH_ON_LOGIN: bool = False
+    PASSWORD_BULK_HASH_ROUNDS: int = 12
+    PASSWORD_BULK_HASH_WORKERS: int = 1
+
     LOG_LEVEL: str = 'INFO'
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_SAMPLE_RATES: dict[str, float] = {}
+    LOG_RATE_LIMITS: dict[str, int] = {}
+    METRICS_ENABLED: bool = True
+    SQL_PROFILING: bool = False
+    SQL_SLOW_QUERY_MS: float = 0.0
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+
+    WS_SEND_QUEUE_SIZE: int = 256
+    WS_SLOW_CONSUMER_POLICY: str = 'DROP_OLDEST'
+    WS_BROKER: str = 'local'
+    WS_COALESCE_INTERVAL_MS: int = 500
+    WS_BATCHING: bool = False
+    WS_BATCH_INTERVAL_MS: int = 0
+    WS_BATCH_MAX_BYTES: int = 64 * 1024
+    WS_EVENT_LOG: bool = False
+    WS_EVENT_LOG_MAXLEN: int = 1000
+    WS_EVENT_LOG_TTL_SECONDS: int = 86400
+
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 30.0
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 300
+
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_SHARED: bool = True
+    RATE_LIMIT_MAX_KEYS: int = 100_000
+    RATE_LIMIT_TRUSTED_PROXIES: list[str] = []
+    RATE_LIMITS: dict[str, str] = {
+        'login_ip': '600/m',
+        'register_ip': '120/m',
+        'alerts_session': '200/s',
+        'alerts_user': '400/s',
+        'ws_frames_session': '200/s',
+    }
+
+    ALERT_WRITE_BEHIND: bool = False
+    ALERT_BATCH_MAX_SIZE: int = 500
+    ALERT_BATCH_MAX_DELAY_MS: int = 20
+    ALERT_DEDUP_WINDOW_SECONDS: float = 0.0
+    ALERT_DEDUP_WAIT_MS: int = 2000
+    ALERT_STATS_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    ALERT_PARTITION_MONTHS_AHEAD: int = 3
+    ALERT_PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 6 * 60 * 60
+    ALERT_ARCHIVE_DIR: str = '/var/lib/quasar/alert-archive'
+    ALERT_ARCHIVE_AFTER_DAYS: int = 180
+    EXPORT_CHUNK_SIZE: int = 1000
+    ETAG_VERSION_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    BULK_IMPORT_MAX_ROWS: int = 20_000
+
+    @model_validator(mode='after')
+    def _require_shared_broker_store(self) -> 'Settings':
+        if self.WS_BROKER == 'redis' and self.REDIS_URL.startswith('memory://'):
+            raise ValueError('WS_BROKER=redis needs a real REDIS_URL, memory:// has no pub/sub')
+        return self
 
 
 @lru_cache
@@ -1,27 +1,138 @@
-import json
 import logging
+import queue
+import random
 import sys
-from datetime import datetime, timezone
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from uuid import uuid4
+
+import orjson
 
 from app.core.config import settings
 
+request_id_var: ContextVar[str | None] = ContextVar('request_id', default=None)
+session_id_var: ContextVar[str | None] = ContextVar('session_id', default=None)
+
+_listener: QueueListener | None = None
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': f'{time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))}.{int(record.msecs):03d}Z',
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
         }
+        request_id = getattr(record, 'request_id', None)
+        if request_id is not None:
+            payload['request_id'] = request_id
+        session_id = getattr(record, 'session_id', None)
+        if session_id is not None:
+            payload['session_id'] = session_id
+        payload.update(getattr(record, 'fields', {}))
         if record.exc_info:
             payload['exception'] = self.formatException(record.exc_info)
-        return json.dumps(payload)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class ContextFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.session_id = session_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, sample_rates: dict[str, float], rate_limits: dict[str, int]) -> None:
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.rate_limits = rate_limits
+        self._windows: dict[str, tuple[int, int]] = {}
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+        rate = self.sample_rates.get(record.name)
+        if rate is not None and random.random() >= rate:
+            self.suppressed += 1
+            return False
+        limit = self.rate_limits.get(record.name)
+        if limit is None:
+            return True
+        second = int(record.created)
+        window, count = self._windows.get(record.name, (second, 0))
+        if window != second:
+            window, count = second, 0
+        self._windows[record.name] = (window, count + 1)
+        if count >= limit:
+            self.suppressed += 1
+            return False
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
 
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RequestContextMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] not in ('http', 'websocket'):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = dict(scope['headers']).get(b'x-request-id', b'').decode('latin-1')[:128] or uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message) -> None:
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message.get('headers', ()), (b'x-request-id', request_id.encode('latin-1'))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
+
+
+def setup_logging(stream=None) -> None:
+    global _listener
+    shutdown_logging()
 
-def setup_logging() -> None:
     root = logging.getLogger()
     root.setLevel(settings.LOG_LEVEL.upper())
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JsonFormatter())
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    if settings.LOG_QUEUE_SIZE > 0:
+        handler: logging.Handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        _listener = QueueListener(handler.queue, stream_handler)
+        _listener.start()
+    else:
+        handler = stream_handler
+    handler.addFilter(ContextFilter())
+    if settings.LOG_SAMPLE_RATES or settings.LOG_RATE_LIMITS:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMITS))
     root.handlers = [handler]
+
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
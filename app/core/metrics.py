@@ -0,0 +1,179 @@
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    # Collectors mirror totals that are counted elsewhere; for a counter they must never decrease.
+    def set(self, *label_values: str, value: float) -> None:
+        self._values[label_values] = value
+
+    def render(self) -> Iterable[str]:
+        for label_values, value in self._values.items():
+            yield f'{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [0.0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> Iterable[str]:
+        for label_values, series in self._series.items():
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float('inf')), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f'{self.name}_bucket{_format_labels(self.labels, label_values, le)} {_format_value(cumulative)}'
+            yield f'{self.name}_count{_format_labels(self.labels, label_values)} {_format_value(series[-2])}'
+            yield f'{self.name}_sum{_format_labels(self.labels, label_values)} {_format_value(series[-1])}'
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(name, documentation, labels, buckets))
+
+    def collector(self, fn: Callable[[], None]) -> Callable[[], None]:
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+registry = Registry()
+
+http_requests_in_flight = registry.gauge('http_requests_in_flight', 'HTTP requests currently being served.')
+http_request_duration = registry.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route.', ('method', 'route', 'status')
+)
+db_pool_checkout_wait = registry.histogram('db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled DB connection.')
+db_pool_connections = registry.gauge('db_pool_connections', 'DB pool connections by state.', ('state',))
+redis_command_duration = registry.histogram('redis_command_duration_seconds', 'Redis command latency.', ('command',))
+ws_connections = registry.gauge('ws_connections', 'Open WebSocket connections.')
+ws_sessions = registry.gauge('ws_sessions', 'Exam sessions with at least one local subscriber.')
+ws_send_queue_depth_max = registry.gauge('ws_send_queue_depth_max', 'Deepest per-socket outbound queue at scrape time.')
+ws_send_queue_depth_sum = registry.gauge('ws_send_queue_depth_sum', 'Messages waiting in all outbound queues at scrape time.')
+ws_dropped_messages = registry.counter('ws_dropped_messages_total', 'Messages dropped by the slow-consumer policy.')
+ws_evicted_clients = registry.counter('ws_evicted_clients_total', 'Clients evicted by the slow-consumer policy.')
+ws_broadcast_duration = registry.histogram(
+    'ws_broadcast_fanout_seconds',
+    'Time to enqueue one broadcast for all local subscribers.',
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05),
+)
+password_hash_wait = registry.histogram('password_hash_queue_wait_seconds', 'Time a hashing job waited for a pool worker.')
+password_hash_pending = registry.gauge('password_hash_pending', 'Hashing jobs queued or running.')
+password_hash_rejected = registry.counter('password_hash_rejected_total', 'Hashing jobs shed with 503.')
+rate_limit_rejections = registry.counter('rate_limit_rejections_total', 'Requests and frames rejected by rate limits.', ('policy',))
+principal_cache_lookups = registry.counter('principal_cache_lookups_total', 'Principal cache lookups by outcome.', ('outcome',))
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            route = scope.get('route')
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope['method'],
+                getattr(route, 'path', '<unmatched>'),
+                str(status_code),
+            )
@@ -0,0 +1,134 @@
+import logging
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('app.sql.slow')
+
+_WHITESPACE = re.compile(r'\s+')
+_PARAMETER_LIST = re.compile(r'\((?:\s*(?:\$\d+|\?|%\(\w+\)s|:\w+)\s*,?)+\)')
+_STARTED_AT = '_profiling_started_at'
+
+
+def normalize_statement(statement: str) -> str:
+    return _PARAMETER_LIST.sub('(...)', _WHITESPACE.sub(' ', statement).strip())
+
+
+@dataclass(slots=True)
+class QueryProfile:
+    count: int = 0
+    duration: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int = settings.SQL_N_PLUS_ONE_THRESHOLD) -> dict[str, int]:
+        return {statement: count for statement, count in self.statements.items() if count >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+current_profile: ContextVar[QueryProfile | None] = ContextVar('current_profile', default=None)
+_installed: set[int] = set()
+_counters: dict[int, list[QueryProfile]] = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_STARTED_AT, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info[_STARTED_AT].pop()
+    profile = current_profile.get()
+    counters = _counters.get(id(conn.engine))
+    if profile is None and not counters and not settings.SQL_SLOW_QUERY_MS:
+        return
+
+    normalized = normalize_statement(statement)
+    if profile is not None:
+        profile.record(normalized, duration)
+    for counter in counters or ():
+        counter.record(normalized, duration)
+    if settings.SQL_SLOW_QUERY_MS and duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            'slow query',
+            extra={'fields': {'duration_ms': round(duration * 1000, 3), 'statement': normalized, 'executemany': executemany}},
+        )
+
+
+def install(engine: Engine) -> None:
+    if id(engine) in _installed:
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    _installed.add(id(engine))
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryProfile]:
+    install(engine)
+    profile = QueryProfile()
+    counters = _counters.setdefault(id(engine), [])
+    counters.append(profile)
+    try:
+        yield profile
+    finally:
+        counters.remove(profile)
+        if not counters:
+            _counters.pop(id(engine), None)
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message) -> None:
+            if message['type'] == 'http.response.start':
+                message['headers'] = [*message.get('headers', ()), (b'server-timing', profile.server_timing().encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            route = getattr(scope.get('route'), 'path', scope['path'])
+            repeated = profile.repeated()
+            if repeated:
+                logger.warning(
+                    'possible N+1 query pattern',
+                    extra={'fields': {'method': scope['method'], 'route': route, 'repeated': repeated}},
+                )
+            logger.debug(
+                'request queries',
+                extra={
+                    'fields': {
+                        'method': scope['method'],
+                        'route': route,
+                        'query_count': profile.count,
+                        'db_ms': round(profile.duration * 1000, 3),
+                        'statements': dict(profile.statements),
+                    }
+                },
+            )
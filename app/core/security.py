@@ -1,12 +1,18 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
+from uuid import uuid4
 
 import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.metrics import password_hash_wait
 
-pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
+pwd_context = CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__min_rounds=12)
+bulk_pwd_context = pwd_context.copy(bcrypt__rounds=settings.PASSWORD_BULK_HASH_ROUNDS, bcrypt__min_rounds=4)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -17,6 +23,88 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_bulk_password_hash(password: str) -> str:
+    return bulk_pwd_context.hash(password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _timed_call(fn, *args):
+    return time.time(), fn(*args)
+
+
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self, executor: Executor, max_pending: int) -> None:
+        self._executor = executor
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+    def _admit(self) -> None:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy('password hashing queue is full')
+
+    async def _run(self, fn, *args):
+        self._admit()
+        return await self._execute(fn, *args)
+
+    async def _execute(self, fn, *args):
+        submitted = time.time()
+        self.pending += 1
+        try:
+            started, result = await asyncio.get_running_loop().run_in_executor(self._executor, _timed_call, fn, *args)
+            password_hash_wait.observe(started - submitted)
+            return result
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    # One import is admitted at a time and keeps at most `parallelism` single-password jobs in flight.
+    async def hash_many(self, passwords: list[str], parallelism: int | None = None) -> list[str]:
+        self._admit()
+        hashes = [''] * len(passwords)
+        jobs = iter(enumerate(passwords))
+
+        async def worker() -> None:
+            for index, password in jobs:
+                hashes[index] = await self._execute(get_bulk_password_hash, password)
+
+        await asyncio.gather(*(worker() for _ in range(min(parallelism or self.max_pending, len(passwords)))))
+        return hashes
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, plain_password, hashed_password)
+
+
+def _hash_executor(workers: int, name: str) -> Executor:
+    if settings.PASSWORD_HASH_EXECUTOR == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+
+
+password_hasher = PasswordHasher(
+    _hash_executor(settings.PASSWORD_HASH_WORKERS, 'password-hash'),
+    settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE,
+)
+# Imports hash on their own workers so interactive logins never queue behind them.
+bulk_password_hasher = PasswordHasher(
+    _hash_executor(settings.PASSWORD_BULK_HASH_WORKERS, 'password-bulk-hash'),
+    settings.PASSWORD_BULK_HASH_WORKERS,
+)
+
+
 def _create_token(subject: str, token_type: str, expires_delta: timedelta) -> str:
     now = datetime.now(timezone.utc)
     payload: dict[str, Any] = {
@@ -24,6 +112,7 @@ def _create_token(subject: str, token_type: str, expires_delta: timedelta) -> st
         'type': token_type,
         'iat': int(now.timestamp()),
         'exp': int((now + expires_delta).timestamp()),
+        'jti': uuid4().hex,
     }
     return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.alert import Alert
+
+logger = logging.getLogger(__name__)
+
+
+async def insert_alerts(db: AsyncSession, rows: list[dict[str, Any]]) -> list[Alert]:
+    result = await db.scalars(insert(Alert).returning(Alert, sort_by_parameter_order=True), rows)
+    alerts = list(result.all())
+    await db.commit()
+    return alerts
+
+
+# Requests share one INSERT per flush. If it fails, each request is retried in its own transaction,
+# so one bad row fails only the request that submitted it.
+class AlertWriteBuffer:
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], max_size: int, max_delay: float) -> None:
+        self._session_factory = session_factory
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[list[dict[str, Any]], asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, rows: list[dict[str, Any]]) -> list[Alert]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += len(rows)
+
+        if self._pending_rows >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    async def drain(self) -> None:
+        self._flush()
+        while self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, size = [], 0
+        for submission in self._pending:
+            batch.append(submission)
+            size += len(submission[0])
+            if size >= self.max_size:
+                self._spawn(batch)
+                batch, size = [], 0
+        if batch:
+            self._spawn(batch)
+        self._pending, self._pending_rows = [], 0
+
+    def _spawn(self, batch: list[tuple[list[dict[str, Any]], asyncio.Future]]) -> None:
+        task = asyncio.create_task(self._write(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _write(self, batch: list[tuple[list[dict[str, Any]], asyncio.Future]]) -> None:
+        try:
+            async with self._session_factory() as db:
+                alerts = await insert_alerts(db, [row for rows, _ in batch for row in rows])
+        except Exception as exc:
+            if len(batch) > 1:
+                logger.warning('alert batch of %d requests failed, retrying them one by one', len(batch), exc_info=True)
+                for submission in batch:
+                    await self._write([submission])
+                return
+            logger.exception('alert batch of %d rows failed', len(batch[0][0]))
+            if not batch[0][1].done():
+                batch[0][1].set_exception(exc)
+            return
+
+        offset = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(alerts[offset : offset + len(rows)])
+            offset += len(rows)
+
+
+alert_buffer = (
+    AlertWriteBuffer(SessionLocal, settings.ALERT_BATCH_MAX_SIZE, settings.ALERT_BATCH_MAX_DELAY_MS / 1000)
+    if settings.ALERT_WRITE_BEHIND
+    else None
+)
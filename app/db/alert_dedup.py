@@ -0,0 +1,180 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID, uuid4
+
+from redis.asyncio import Redis
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.local_store import LocalStore, local_script
+from app.db.session import redis_client
+from app.db.types import utcnow
+from app.models.alert import Alert
+
+_PENDING = 'pending:'
+
+# Replace a claim, or drop it, only while it still holds the value this writer saw: a commit promotes its
+# marker to the alert id, and an orphan takes over a key whose alert is gone with a fresh window (ARGV[3]).
+_SETTLE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if ARGV[2] == '' then
+    redis.call('DEL', KEYS[1])
+elseif ARGV[3] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+else
+    redis.call('SET', KEYS[1], ARGV[2], 'KEEPTTL')
+end
+return 1
+"""
+
+
+@local_script(_SETTLE_SCRIPT)
+async def _settle_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    if await store.get(keys[0]) != args[0]:
+        return 0
+    if args[1] == '':
+        await store.delete(keys[0])
+    elif len(args) > 2:
+        await store.set(keys[0], args[1], px=int(args[2]))
+    else:
+        await store.set(keys[0], args[1], keepttl=True)
+    return 1
+
+
+@dataclass(slots=True)
+class AlertWrite:
+    alert: Alert
+    count: int
+    created: bool
+
+
+@dataclass(slots=True)
+class PendingAlert:
+    row: dict[str, Any]
+    count: int
+
+
+# A claim holds a pending marker until its row commits. Repeats wait for it to be promoted to the alert id
+# rather than updating a row that is not visible yet. Keys are claimed in sorted order so waits cannot cycle.
+class AlertDeduplicator:
+    def __init__(
+        self,
+        redis: Redis,
+        window_seconds: float,
+        wait_seconds: float,
+        poll_interval: float = 0.01,
+        prefix: str = 'alert_dedup:',
+    ) -> None:
+        self.redis = redis
+        self.window_ms = int(window_seconds * 1000)
+        self.wait_seconds = wait_seconds
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._settle = redis.register_script(_SETTLE_SCRIPT)
+        self._claims: dict[str, tuple[UUID, asyncio.Future]] = {}
+
+    async def claim(self, session_id: UUID, rows: list[dict[str, Any]]) -> tuple[list[PendingAlert], list[tuple[UUID, PendingAlert]]]:
+        groups: dict[tuple[str, str], PendingAlert] = {}
+        for row in rows:
+            group_key = (row['severity'].value, row['event_type'])
+            pending = groups.get(group_key)
+            if pending is None:
+                groups[group_key] = PendingAlert(row=row, count=1)
+            else:
+                pending.count += 1
+
+        fresh: list[PendingAlert] = []
+        repeats: list[tuple[UUID, PendingAlert]] = []
+        for (severity, event_type), pending in sorted(groups.items()):
+            alert_id = uuid4()
+            pending.row = {**pending.row, 'id': alert_id, 'occurrences': pending.count}
+            existing = await self._claim(self._key(session_id, severity, event_type), alert_id)
+            if existing is None:
+                fresh.append(pending)
+            else:
+                repeats.append((existing, pending))
+        return fresh, repeats
+
+    async def bump(self, db: AsyncSession, session_id: UUID, repeats: list[tuple[UUID, PendingAlert]]) -> tuple[list[AlertWrite], list[PendingAlert]]:
+        writes: list[AlertWrite] = []
+        orphans: list[PendingAlert] = []
+        for alert_id, pending in repeats:
+            stmt = (
+                update(Alert)
+                .where(Alert.id == alert_id, Alert.exam_session_id == session_id)
+                .values(occurrences=Alert.occurrences + pending.count, last_seen_at=utcnow())
+                .returning(Alert)
+                .execution_options(synchronize_session=False)
+            )
+            alert = (await db.scalars(stmt)).one_or_none()
+            if alert is None:
+                # The claimed row is gone, so this alert inserts a new one and takes the key over unless
+                # another writer already has.
+                orphans.append(pending)
+                key = self._key(session_id, pending.row['severity'].value, pending.row['event_type'])
+                marker = _PENDING + str(pending.row['id'])
+                if await self._settle(keys=[key], args=[str(alert_id), marker, self.window_ms]):
+                    self._hold(key, pending.row['id'])
+            else:
+                writes.append(AlertWrite(alert=alert, count=pending.count, created=False))
+        if writes:
+            await db.commit()
+        return writes, orphans
+
+    async def confirm(self, session_id: UUID, claimed: list[PendingAlert]) -> None:
+        await self._finish(session_id, claimed, committed=True)
+
+    async def release(self, session_id: UUID, claimed: list[PendingAlert]) -> None:
+        await self._finish(session_id, claimed, committed=False)
+
+    async def _claim(self, key: str, alert_id: UUID) -> UUID | None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        while True:
+            existing = await self.redis.set(key, _PENDING + str(alert_id), nx=True, px=self.window_ms, get=True)
+            if existing is None:
+                self._hold(key, alert_id)
+                return None
+            if not existing.startswith(_PENDING):
+                return UUID(existing)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                # The first writer is stuck; insert a separate row rather than stall this request.
+                return None
+            held = self._claims.get(key)
+            try:
+                if held is not None:
+                    await asyncio.wait_for(asyncio.shield(held[1]), timeout=remaining)
+                else:
+                    await asyncio.sleep(min(self.poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    def _hold(self, key: str, alert_id: UUID) -> None:
+        self._claims[key] = (alert_id, asyncio.get_running_loop().create_future())
+
+    async def _finish(self, session_id: UUID, claimed: list[PendingAlert], committed: bool) -> None:
+        for pending in claimed:
+            alert_id = pending.row['id']
+            key = self._key(session_id, pending.row['severity'].value, pending.row['event_type'])
+            try:
+                await self._settle(keys=[key], args=[_PENDING + str(alert_id), str(alert_id) if committed else ''])
+            finally:
+                held = self._claims.get(key)
+                if held is not None and held[0] == alert_id:
+                    del self._claims[key]
+                    held[1].set_result(None)
+
+    def _key(self, session_id: UUID, severity: str, event_type: str) -> str:
+        return f'{self.prefix}{session_id}:{severity}:{event_type}'
+
+
+alert_deduplicator = (
+    AlertDeduplicator(redis_client, settings.ALERT_DEDUP_WINDOW_SECONDS, settings.ALERT_DEDUP_WAIT_MS / 1000)
+    if settings.ALERT_DEDUP_WINDOW_SECONDS > 0
+    else None
+)
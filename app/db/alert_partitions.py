@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import re
+import shutil
+import time
+from collections import namedtuple
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID
+
+import orjson
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.alert import Alert
+from app.schemas.exam import AlertRead
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r'^alerts_p(\d{4})(\d{2})$')
+ARCHIVE_FIELDS = tuple(AlertRead.model_fields)
+ArchivedAlert = namedtuple('ArchivedAlert', ARCHIVE_FIELDS)
+
+_LIST_PARTITIONS = text(
+    'SELECT child.relname FROM pg_inherits '
+    'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+    'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+    "WHERE parent.relname = 'alerts'"
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(month: date) -> str:
+    return f'alerts_p{month:%Y%m}'
+
+
+def partition_month(name: str) -> date | None:
+    match = PARTITION_PATTERN.match(name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def _bound(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+async def list_partitions(db: AsyncSession) -> list[str]:
+    return sorted(name for name in (await db.scalars(_LIST_PARTITIONS)) if PARTITION_PATTERN.match(name))
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int, today: date | None = None) -> list[str]:
+    month = month_start(today or datetime.now(timezone.utc).date())
+    existing = set(await list_partitions(db))
+    created = []
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            await db.execute(
+                text(
+                    f'CREATE TABLE IF NOT EXISTS {name} PARTITION OF alerts '
+                    f"FOR VALUES FROM ('{_bound(month).isoformat()}') TO ('{_bound(next_month(month)).isoformat()}')"
+                )
+            )
+            created.append(name)
+        month = next_month(month)
+    await db.commit()
+    return created
+
+
+class AlertArchive:
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._index: dict[UUID, list[Path]] = {}
+        self._version: int | None = None
+
+    async def refresh(self) -> None:
+        # Partitions are renamed into the root, so its mtime changes whenever another process archives one.
+        if self._stat_root() != self._version:
+            await asyncio.to_thread(self._rebuild)
+
+    def session_files(self, session_id: UUID) -> list[Path]:
+        return self._index.get(session_id, [])
+
+    def has_session(self, session_id: UUID) -> bool:
+        return session_id in self._index
+
+    def _stat_root(self) -> int | None:
+        try:
+            return self.root.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _rebuild(self) -> None:
+        version = self._stat_root()
+        index: dict[UUID, list[Path]] = {}
+        if version is not None:
+            for path in sorted(self.root.glob('alerts_p*/*.ndjson.gz')):
+                index.setdefault(UUID(path.name.removesuffix('.ndjson.gz')), []).append(path)
+        # A directory touched within the last second may change again without a visible mtime step.
+        settled = version is None or time.time_ns() - version > 1_000_000_000
+        self._index, self._version = index, version if settled else -1
+
+    async def session_rows(self, session_id: UUID) -> list[ArchivedAlert]:
+        return await asyncio.to_thread(self._read_session, session_id)
+
+    async def iter_sessions(self, session_ids: Iterable[UUID]) -> AsyncIterator[list[ArchivedAlert]]:
+        for session_id in session_ids:
+            rows = await self.session_rows(session_id)
+            if rows:
+                yield rows
+
+    def _read_session(self, session_id: UUID) -> list[ArchivedAlert]:
+        rows = []
+        for path in self.session_files(session_id):
+            with gzip.open(path, 'rb') as handle:
+                for line in handle:
+                    alert = AlertRead.model_validate_json(line)
+                    rows.append(ArchivedAlert(*(getattr(alert, field) for field in ARCHIVE_FIELDS)))
+        return rows
+
+    async def write_partition(self, db: AsyncSession, name: str) -> int:
+        month = partition_month(name)
+        staging = self.root / '.partial' / name
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir(parents=True)
+
+        stmt = (
+            select(*(getattr(Alert, field) for field in ARCHIVE_FIELDS))
+            .where(Alert.created_at >= _bound(month), Alert.created_at < _bound(next_month(month)))
+            .order_by(Alert.exam_session_id, Alert.created_at, Alert.id)
+            .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+        )
+        written = 0
+        current: UUID | None = None
+        handle = None
+        try:
+            async for partition in (await db.stream(stmt)).partitions():
+                for row in partition:
+                    if row.exam_session_id != current:
+                        if handle is not None:
+                            handle.close()
+                        current = row.exam_session_id
+                        handle = gzip.open(staging / f'{current}.ndjson.gz', 'wb')
+                    handle.write(orjson.dumps(dict(zip(ARCHIVE_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE))
+                    written += 1
+        finally:
+            if handle is not None:
+                handle.close()
+
+        (staging / 'MANIFEST.json').write_bytes(
+            orjson.dumps({'partition': name, 'rows': written, 'archived_at': datetime.now(timezone.utc)})
+        )
+        for path in staging.iterdir():
+            with open(path, 'rb') as synced:
+                os.fsync(synced.fileno())
+        target = self.root / name
+        if target.exists():
+            shutil.rmtree(target)
+        staging.rename(target)
+        await asyncio.to_thread(self._rebuild)
+        return written
+
+
+alert_archive = AlertArchive(Path(settings.ALERT_ARCHIVE_DIR))
+
+
+async def archive_partitions(
+    session_factory: async_sessionmaker[AsyncSession],
+    archive: AlertArchive,
+    older_than_days: int,
+    drop: bool,
+    today: date | None = None,
+) -> list[tuple[str, int]]:
+    cutoff = month_start((today or datetime.now(timezone.utc).date()) - timedelta(days=older_than_days))
+    async with session_factory() as db:
+        candidates = [name for name in await list_partitions(db) if next_month(partition_month(name)) <= cutoff]
+
+    archived = []
+    for name in candidates:
+        async with session_factory() as db:
+            rows = await archive.write_partition(db, name)
+            await db.execute(text(f'ALTER TABLE alerts DETACH PARTITION {name}'))
+            if drop:
+                await db.execute(text(f'DROP TABLE {name}'))
+            await db.commit()
+        logger.info('archived alert partition', extra={'fields': {'partition': name, 'rows': rows, 'dropped': drop}})
+        archived.append((name, rows))
+    return archived
+
+
+async def run_maintenance(interval: float = settings.ALERT_PARTITION_MAINTENANCE_INTERVAL_SECONDS) -> None:
+    while True:
+        try:
+            async with SessionLocal() as db:
+                created = await ensure_partitions(db, settings.ALERT_PARTITION_MONTHS_AHEAD)
+            if created:
+                logger.info('created alert partitions', extra={'fields': {'partitions': created}})
+        except Exception:
+            logger.exception('alert partition maintenance failed')
+        await asyncio.sleep(interval)
+
+
+def merge_archived(archived: Sequence[ArchivedAlert], live: Sequence) -> list:
+    seen = {row.id for row in live}
+    return [row for row in archived if row.id not in seen] + list(live)
+
+
+async def _maintain() -> None:
+    async with SessionLocal() as db:
+        created = await ensure_partitions(db, settings.ALERT_PARTITION_MONTHS_AHEAD)
+    print(f'created {len(created)} alert partitions')
+
+
+async def _archive(older_than_days: int, drop: bool) -> None:
+    archived = await archive_partitions(SessionLocal, alert_archive, older_than_days, drop)
+    for name, rows in archived:
+        print(f'archived {name}: {rows} alerts')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Alert partition maintenance.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    subcommands.add_parser('maintain', help='Create partitions for the current and upcoming months')
+    archive = subcommands.add_parser('archive', help='Archive and detach partitions older than the cutoff')
+    archive.add_argument('--older-than-days', type=int, default=settings.ALERT_ARCHIVE_AFTER_DAYS)
+    archive.add_argument('--drop', action='store_true', help='Drop partitions after detaching them')
+    args = parser.parse_args()
+    if args.command == 'maintain':
+        asyncio.run(_maintain())
+    else:
+        asyncio.run(_archive(args.older_than_days, args.drop))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal, redis_client
+from app.models.alert import Alert, AlertSeverity
+from app.models.exam_session import ExamSession
+
+MINUTE_FORMAT = '%Y-%m-%dT%H:%M'
+
+
+def minute_bucket(created_at: datetime) -> str:
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.strftime(MINUTE_FORMAT)
+
+
+def _minute_expression(dialect: str):
+    if dialect == 'postgresql':
+        return func.to_char(func.date_trunc('minute', func.timezone('UTC', Alert.created_at)), 'YYYY-MM-DD"T"HH24:MI')
+    return func.strftime(MINUTE_FORMAT, Alert.created_at)
+
+
+class AlertStats:
+    def __init__(self, redis: Redis, ttl_seconds: int, prefix: str = 'alert_stats:') -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def record(self, session_id: UUID, exam_name: str, alerts: Iterable[tuple[Alert, int]]) -> None:
+        keys = (self.session_key(session_id), self.exam_key(exam_name))
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for alert, count in alerts:
+                # Repeats count towards the minute the alert was first raised, the only time rebuild can see.
+                bucket = minute_bucket(alert.created_at)
+                for key in keys:
+                    pipe.hincrby(key, 'total', count)
+                    pipe.hincrby(key, f'severity:{alert.severity.value}', count)
+                    pipe.hincrby(key, f'event:{alert.event_type}', count)
+                    pipe.hincrby(key, f'minute:{bucket}', count)
+            for key in keys:
+                pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+
+    async def session_summary(self, session_id: UUID) -> dict:
+        return self._summary(await self.redis.hgetall(self.session_key(session_id)))
+
+    async def exam_summary(self, exam_name: str) -> dict:
+        return self._summary(await self.redis.hgetall(self.exam_key(exam_name)))
+
+    async def rebuild(self, db: AsyncSession, exam_name: str | None = None) -> int:
+        minute = _minute_expression(db.bind.dialect.name).label('minute')
+        stmt = (
+            select(ExamSession.id, ExamSession.exam_name, Alert.severity, Alert.event_type, minute, func.sum(Alert.occurrences))
+            .join(Alert, Alert.exam_session_id == ExamSession.id)
+            .group_by(ExamSession.id, ExamSession.exam_name, Alert.severity, Alert.event_type, minute)
+        )
+        if exam_name is not None:
+            stmt = stmt.where(ExamSession.exam_name == exam_name)
+
+        counters: dict[str, dict[str, int]] = {}
+        for session_id, name, severity, event_type, bucket, count in await db.execute(stmt):
+            for key in (self.session_key(session_id), self.exam_key(name)):
+                fields = counters.setdefault(key, {})
+                for field in ('total', f'severity:{severity.value}', f'event:{event_type}', f'minute:{bucket}'):
+                    fields[field] = fields.get(field, 0) + count
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if exam_name is not None:
+                pipe.delete(self.exam_key(exam_name))
+            for key, fields in counters.items():
+                pipe.delete(key)
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+        return len(counters)
+
+    def session_key(self, session_id: UUID) -> str:
+        return f'{self.prefix}session:{session_id}'
+
+    def exam_key(self, exam_name: str) -> str:
+        return f'{self.prefix}exam:{exam_name}'
+
+    @staticmethod
+    def _summary(raw: dict[str, str]) -> dict:
+        summary: dict = {
+            'total': int(raw.get('total', 0)),
+            'by_severity': {severity: 0 for severity in AlertSeverity},
+            'by_event_type': {},
+            'per_minute': {},
+        }
+        for field, value in raw.items():
+            kind, _, name = field.partition(':')
+            if kind == 'severity':
+                summary['by_severity'][AlertSeverity(name)] = int(value)
+            elif kind == 'event':
+                summary['by_event_type'][name] = int(value)
+            elif kind == 'minute':
+                summary['per_minute'][name] = int(value)
+        summary['per_minute'] = dict(sorted(summary['per_minute'].items()))
+        return summary
+
+
+alert_stats = AlertStats(redis_client, settings.ALERT_STATS_TTL_SECONDS)
+
+
+async def _rebuild(exam_name: str | None) -> None:
+    async with SessionLocal() as db:
+        rebuilt = await alert_stats.rebuild(db, exam_name)
+    await redis_client.aclose()
+    print(f'rebuilt {rebuilt} alert rollups')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Alert rollup maintenance.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    rebuild = subcommands.add_parser('rebuild', help='Recompute rollups from the alerts table')
+    rebuild.add_argument('--exam-name', default=None)
+    args = parser.parse_args()
+    asyncio.run(_rebuild(args.exam_name))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+import asyncio
+import heapq
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+ScriptHandler = Callable[['LocalStore', list[str], list[str]], Awaitable[Any]]
+
+_SCRIPTS: dict[str, ScriptHandler] = {}
+
+
+def local_script(source: str) -> Callable[[ScriptHandler], ScriptHandler]:
+    def register(handler: ScriptHandler) -> ScriptHandler:
+        _SCRIPTS[source] = handler
+        return handler
+
+    return register
+
+
+class LocalScript:
+    def __init__(self, store: 'LocalStore', handler: ScriptHandler) -> None:
+        self.store = store
+        self.handler = handler
+
+    async def __call__(self, keys=(), args=(), client=None) -> Any:
+        return await self.handler(self.store, [str(key) for key in keys], [str(arg) for arg in args])
+
+
+class LocalPipeline:
+    def __init__(self, store: 'LocalStore') -> None:
+        self._store = store
+        self._calls: list[tuple[Callable, tuple, dict]] = []
+
+    async def __aenter__(self) -> 'LocalPipeline':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._calls.clear()
+
+    def __getattr__(self, name: str):
+        method = getattr(self._store, name)
+
+        def queue(*args, **kwargs) -> 'LocalPipeline':
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list[Any]:
+        calls, self._calls = self._calls, []
+        return [await method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+class _Stream:
+    __slots__ = ('entries', 'last')
+
+    def __init__(self) -> None:
+        self.entries: list[tuple[tuple[int, int], str, dict[str, str]]] = []
+        self.last = (0, 0)
+
+
+def _stream_key(event_id: str) -> tuple[int, int]:
+    millis, _, sequence = event_id.partition('-')
+    return int(millis), int(sequence or 0)
+
+
+# Single-process stand-in for the Redis commands the app uses, with decode_responses=True semantics.
+# No command awaits internally, so each command, pipeline step and script runs atomically on the event loop.
+class LocalStore:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self.clock = clock
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+        self._deadlines: list[tuple[float, str]] = []
+        self._stream_waiters: dict[str, set[asyncio.Future]] = {}
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self._lookup(key)
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ex: int | None = None,
+        px: int | None = None,
+        nx: bool = False,
+        xx: bool = False,
+        keepttl: bool = False,
+        get: bool = False,
+    ) -> Any:
+        self._purge()
+        previous = self._lookup(key)
+        if (nx and previous is not None) or (xx and previous is None):
+            return previous if get else None
+        self._data[key] = value if isinstance(value, str) else str(value)
+        if ex is not None:
+            self._expire_in(key, float(ex))
+        elif px is not None:
+            self._expire_in(key, px / 1000)
+        elif not keepttl:
+            self._expires.pop(key, None)
+        return previous if get else True
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                self._drop(key)
+                removed += 1
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(self._lookup(key) is not None for key in keys)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        self._purge()
+        value = int(self._lookup(key) or 0) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        if self._lookup(key) is None:
+            return False
+        self._expire_in(key, float(seconds))
+        return True
+
+    async def pexpire(self, key: str, milliseconds: int) -> bool:
+        return await self.expire(key, milliseconds / 1000)
+
+    async def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        self._purge()
+        current = self._container(key, dict)
+        added = sum(member not in current for member in mapping)
+        current.update({member: float(score) for member, score in mapping.items()})
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        current = self._lookup(key)
+        if current is None:
+            return 0
+        removed = sum(current.pop(member, None) is not None for member in members)
+        if not current:
+            self._drop(key)
+        return removed
+
+    async def zremrangebyscore(self, key: str, min: float, max: float) -> int:
+        current = self._lookup(key)
+        if current is None:
+            return 0
+        expired = [member for member, score in current.items() if float(min) <= score <= float(max)]
+        return await self.zrem(key, *expired)
+
+    async def zrange(self, key: str, start: int, end: int) -> list[str]:
+        members = sorted((self._lookup(key) or {}).items(), key=lambda item: (item[1], item[0]))
+        return [member for member, _ in members[start:None if end == -1 else end + 1]]
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        self._purge()
+        current = self._container(key, dict)
+        value = int(current.get(field, 0)) + amount
+        current[field] = str(value)
+        return value
+
+    async def hset(self, key: str, field: str | None = None, value: Any = None, mapping: dict | None = None) -> int:
+        self._purge()
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        current = self._container(key, dict)
+        added = sum(name not in current for name in items)
+        current.update({name: item if isinstance(item, str) else str(item) for name, item in items.items()})
+        return added
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self._lookup(key) or {})
+
+    async def xadd(self, key: str, fields: dict, maxlen: int | None = None, approximate: bool = True) -> str:
+        self._purge()
+        stream = self._container(key, _Stream)
+        millis = time.time_ns() // 1_000_000
+        stream.last = (millis, 0) if millis > stream.last[0] else (stream.last[0], stream.last[1] + 1)
+        event_id = f'{stream.last[0]}-{stream.last[1]}'
+        stream.entries.append((stream.last, event_id, {name: str(value) for name, value in fields.items()}))
+        if maxlen is not None and len(stream.entries) > maxlen:
+            del stream.entries[: len(stream.entries) - maxlen]
+        for waiter in self._stream_waiters.pop(key, ()):
+            if not waiter.done():
+                waiter.set_result(None)
+        return event_id
+
+    async def xrange(self, key: str, min: str = '-', max: str = '+', count: int | None = None) -> list[tuple[str, dict]]:
+        entries = [(event_id, dict(fields)) for position, event_id, fields in self._entries(key) if self._in_range(position, min, max)]
+        return entries[:count] if count is not None else entries
+
+    async def xrevrange(self, key: str, max: str = '+', min: str = '-', count: int | None = None) -> list[tuple[str, dict]]:
+        entries = list(reversed(await self.xrange(key, min, max)))
+        return entries[:count] if count is not None else entries
+
+    async def xread(self, streams: dict[str, str], count: int | None = None, block: int | None = None) -> list:
+        after = {key: self._read_position(key, event_id) for key, event_id in streams.items()}
+        response = self._read(after, count)
+        if response or block is None:
+            return response
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        for key in after:
+            self._stream_waiters.setdefault(key, set()).add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout=block / 1000 if block else None)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            for key in after:
+                self._stream_waiters.get(key, set()).discard(waiter)
+        return self._read(after, count)
+
+    def pipeline(self, transaction: bool = True) -> LocalPipeline:
+        return LocalPipeline(self)
+
+    def register_script(self, source: str) -> LocalScript:
+        handler = _SCRIPTS.get(source)
+        if handler is None:
+            raise NotImplementedError('No in-process implementation is registered for this Lua script')
+        return LocalScript(self, handler)
+
+    async def aclose(self) -> None:
+        return None
+
+    def _lookup(self, key: str) -> Any:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= self.clock():
+            self._drop(key)
+            return None
+        return self._data.get(key)
+
+    def _container(self, key: str, factory: type):
+        current = self._lookup(key)
+        if current is None:
+            current = self._data[key] = factory()
+        return current
+
+    def _drop(self, key: str) -> None:
+        self._data.pop(key, None)
+        self._expires.pop(key, None)
+
+    def _expire_in(self, key: str, seconds: float) -> None:
+        deadline = self.clock() + seconds
+        self._expires[key] = deadline
+        heapq.heappush(self._deadlines, (deadline, key))
+        if len(self._deadlines) > 2 * len(self._expires) + 1024:
+            self._deadlines = [(deadline, key) for key, deadline in self._expires.items()]
+            heapq.heapify(self._deadlines)
+
+    def _purge(self) -> None:
+        now = self.clock()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, key = heapq.heappop(self._deadlines)
+            if self._expires.get(key) == deadline:
+                self._drop(key)
+
+    def _entries(self, key: str) -> list:
+        stream = self._lookup(key)
+        return stream.entries if stream is not None else []
+
+    @staticmethod
+    def _in_range(position: tuple[int, int], low: str, high: str) -> bool:
+        if low != '-':
+            exclusive = low.startswith('(')
+            bound = _stream_key(low.lstrip('('))
+            if position < bound or (exclusive and position == bound):
+                return False
+        if high != '+':
+            exclusive = high.startswith('(')
+            bound = _stream_key(high.lstrip('('))
+            if position > bound or (exclusive and position == bound):
+                return False
+        return True
+
+    def _read_position(self, key: str, event_id: str) -> tuple[int, int]:
+        if event_id == '$':
+            stream = self._lookup(key)
+            return stream.last if stream is not None else (0, 0)
+        return _stream_key(event_id)
+
+    def _read(self, after: dict[str, tuple[int, int]], count: int | None) -> list:
+        response = []
+        for key, position in after.items():
+            entries = [(event_id, dict(fields)) for entry_position, event_id, fields in self._entries(key) if entry_position > position]
+            if entries:
+                response.append([key, entries[:count] if count is not None else entries])
+        return response
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.db.local_store import LocalStore
+from app.db.session import redis_client
+from app.db.versions import version_store
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATED_KEY = 'invalidated_principals'
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: UUID
+    email: str
+    full_name: str
+    role: UserRole
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> 'Principal':
+        return cls(id=user.id, email=user.email, full_name=user.full_name, role=user.role, created_at=user.created_at)
+
+    def dumps(self) -> str:
+        return json.dumps(
+            {
+                'id': str(self.id),
+                'email': self.email,
+                'full_name': self.full_name,
+                'role': self.role.value,
+                'created_at': self.created_at.isoformat(),
+            }
+        )
+
+    @classmethod
+    def loads(cls, raw: str) -> 'Principal':
+        data = json.loads(raw)
+        return cls(
+            id=UUID(data['id']),
+            email=data['email'],
+            full_name=data['full_name'],
+            role=UserRole(data['role']),
+            created_at=datetime.fromisoformat(data['created_at']),
+        )
+
+
+PrincipalLoader = Callable[[UUID], Awaitable[Principal | None]]
+
+
+# Invalidations are published so every worker drops its local copy. Pub/sub is at-most-once, so the
+# local tier is cleared whenever the subscription is (re)established; the local TTL bounds the rest.
+class PrincipalCache:
+    def __init__(
+        self,
+        redis: Redis,
+        max_size: int,
+        local_ttl: float,
+        redis_ttl: int,
+        channel: str = 'principal:invalidated',
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.redis = redis
+        self.max_size = max_size
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.channel = channel
+        self.clock = clock
+        # The in-process store serves a single worker, so there is nobody to tell.
+        self.broadcast = not isinstance(redis, LocalStore)
+        self._local: OrderedDict[UUID, tuple[float, Principal]] = OrderedDict()
+        self._background: set[asyncio.Task] = set()
+        self._listener: asyncio.Task | None = None
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: UUID, loader: PrincipalLoader) -> Principal | None:
+        entry = self._local.get(user_id)
+        if entry is not None:
+            expires_at, principal = entry
+            if expires_at > self.clock():
+                self._local.move_to_end(user_id)
+                self.local_hits += 1
+                return principal
+            del self._local[user_id]
+
+        try:
+            raw = await self.redis.get(self._key(user_id))
+        except Exception:
+            logger.warning('principal cache redis lookup failed', exc_info=True)
+            raw = None
+        if raw is not None:
+            principal = Principal.loads(raw)
+            self.redis_hits += 1
+            self._remember(principal)
+            return principal
+
+        self.misses += 1
+        principal = await loader(user_id)
+        if principal is not None:
+            self._remember(principal)
+            try:
+                await self.redis.set(self._key(principal.id), principal.dumps(), ex=self.redis_ttl)
+            except Exception:
+                logger.warning('principal cache redis store failed', exc_info=True)
+        return principal
+
+    async def invalidate(self, user_id: UUID) -> None:
+        self._local.pop(user_id, None)
+        await self.redis.delete(self._key(user_id))
+        if self.broadcast:
+            await self.redis.publish(self.channel, str(user_id))
+        await version_store.bump_user(user_id)
+
+    async def start(self) -> None:
+        if self.broadcast and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    def invalidate_soon(self, user_id: UUID) -> None:
+        self._local.pop(user_id, None)
+        task = asyncio.get_running_loop().create_task(self.invalidate(user_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._local),
+            'local_hits': self.local_hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+        }
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._local.clear()
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message['type'] == 'message':
+                        self._forget(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning('principal invalidation listener failed, resubscribing', exc_info=True)
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+    def _forget(self, raw: str) -> None:
+        try:
+            self._local.pop(UUID(raw), None)
+        except ValueError:
+            return
+
+    def _remember(self, principal: Principal) -> None:
+        self._local[principal.id] = (self.clock() + self.local_ttl, principal)
+        self._local.move_to_end(principal.id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    def _key(user_id: UUID) -> str:
+        return f'principal:{user_id}'
+
+
+principal_cache = PrincipalCache(
+    redis_client,
+    max_size=settings.PRINCIPAL_CACHE_SIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS,
+    redis_ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _mark_principal_stale(_mapper, _connection, target: User) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_INVALIDATED_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_stale_principals(session: Session) -> None:
+    for user_id in session.info.pop(_INVALIDATED_KEY, ()):
+        principal_cache.invalidate_soon(user_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_stale_principals(session: Session) -> None:
+    session.info.pop(_INVALIDATED_KEY, None)
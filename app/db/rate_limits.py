@@ -0,0 +1,150 @@
+import logging
+import re
+import time
+from collections.abc import Hashable
+from dataclasses import dataclass
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.metrics import rate_limit_rejections
+from app.db.local_store import LocalStore, local_script
+from app.db.session import redis_client
+
+logger = logging.getLogger(__name__)
+
+_POLICY_PATTERN = re.compile(r'^\s*(\d+)\s*/\s*(\d+(?:\.\d+)?)?\s*(s|m|h)\s*$')
+_UNIT_SECONDS = {'s': 1.0, 'm': 60.0, 'h': 3600.0}
+
+# Weighted sliding window over two fixed-window counters: O(1) memory per key and atomic across workers.
+_WINDOW_SCRIPT = """
+local elapsed = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * (window - elapsed) / window + current + 1 > limit then
+    return math.max(window - elapsed, 1)
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], window * 2)
+return 0
+"""
+
+
+@local_script(_WINDOW_SCRIPT)
+async def _window_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    elapsed, window, limit = (int(arg) for arg in args)
+    current = int(await store.get(keys[0]) or 0)
+    previous = int(await store.get(keys[1]) or 0)
+    if previous * (window - elapsed) / window + current + 1 > limit:
+        return max(window - elapsed, 1)
+    await store.incr(keys[0])
+    await store.pexpire(keys[0], window * 2)
+    return 0
+
+
+@dataclass(frozen=True, slots=True)
+class RatePolicy:
+    name: str
+    limit: int
+    period: float
+    shared: bool
+
+    @classmethod
+    def parse(cls, name: str, spec: str, shared: bool = True) -> 'RatePolicy':
+        match = _POLICY_PATTERN.match(spec)
+        if match is None or int(match[1]) < 1:
+            raise ValueError(f'Invalid rate limit {name}={spec!r}, expected e.g. "10/m" or "20/5s"')
+        return cls(name, int(match[1]), float(match[2] or 1) * _UNIT_SECONDS[match[3]], shared)
+
+
+class TokenBuckets:
+    __slots__ = ('rate', 'burst', 'max_keys', '_buckets')
+
+    def __init__(self, rate: float, burst: float, max_keys: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: dict[Hashable, list[float]] = {}
+
+    def take(self, key: Hashable, now: float | None = None) -> float:
+        if now is None:
+            now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._prune(now)
+            self._buckets[key] = [self.burst - 1.0, now]
+            return 0.0
+        tokens = bucket[0] + (now - bucket[1]) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        bucket[1] = now
+        if tokens >= 1.0:
+            bucket[0] = tokens - 1.0
+            return 0.0
+        bucket[0] = tokens
+        return (1.0 - tokens) / self.rate
+
+    def forget(self, key: Hashable) -> None:
+        self._buckets.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _prune(self, now: float) -> None:
+        refill = self.burst / self.rate
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if now - bucket[1] < refill}
+        while len(self._buckets) >= self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+
+
+class RateLimiter:
+    def __init__(self, policy: RatePolicy, redis: Redis | None, max_keys: int, prefix: str = 'ratelimit:') -> None:
+        self.policy = policy
+        self.local = TokenBuckets(policy.limit / policy.period, policy.limit, max_keys)
+        self.redis = redis if policy.shared else None
+        self.prefix = f'{prefix}{policy.name}:'
+        self._window_ms = int(policy.period * 1000)
+        self._window = self.redis.register_script(_WINDOW_SCRIPT) if self.redis is not None else None
+
+    def check_local(self, key: Hashable) -> float:
+        wait = self.local.take(key)
+        if wait:
+            rate_limit_rejections.inc(self.policy.name)
+        return wait
+
+    async def check(self, key: Hashable) -> float:
+        wait = self.check_local(key)
+        if wait or self._window is None:
+            return wait
+        now_ms = time.time_ns() // 1_000_000
+        index, elapsed = divmod(now_ms, self._window_ms)
+        try:
+            wait_ms = await self._window(
+                keys=[f'{self.prefix}{key}:{index}', f'{self.prefix}{key}:{index - 1}'],
+                args=[elapsed, self._window_ms, self.policy.limit],
+            )
+        except Exception:
+            logger.warning('shared rate limit check failed, enforcing the local limit only', exc_info=True)
+            return 0.0
+        if wait_ms:
+            rate_limit_rejections.inc(self.policy.name)
+        return int(wait_ms) / 1000
+
+
+def _limiter(name: str, shared: bool = True) -> RateLimiter | None:
+    spec = settings.RATE_LIMITS.get(name)
+    if not settings.RATE_LIMIT_ENABLED or not spec:
+        return None
+    policy = RatePolicy.parse(name, spec, shared=shared and settings.RATE_LIMIT_SHARED)
+    return RateLimiter(policy, redis_client, settings.RATE_LIMIT_MAX_KEYS)
+
+
+login_limiter = _limiter('login_ip')
+register_limiter = _limiter('register_ip')
+alert_session_limiter = _limiter('alerts_session')
+alert_user_limiter = _limiter('alerts_user')
+# A session's socket is pinned to one worker, so per-frame limits stay in-process.
+ws_frame_limiter = _limiter('ws_frames_session', shared=False)
@@ -0,0 +1,142 @@
+import hashlib
+import time
+from collections.abc import Callable
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.db.local_store import LocalStore, local_script
+from app.db.session import redis_client
+
+# Families are sorted sets scored by expiry so digests of tokens that simply expire get pruned.
+# Families written by older releases are plain sets; they are converted the first time a script touches them.
+_FAMILY = """
+local function family(key, expires)
+    if redis.call('TYPE', key).ok == 'set' then
+        local digests = redis.call('SMEMBERS', key)
+        redis.call('DEL', key)
+        for _, digest in ipairs(digests) do
+            redis.call('ZADD', key, expires, digest)
+        end
+    end
+    return key
+end
+"""
+
+_ISSUE_SCRIPT = _FAMILY + """
+local expires = tonumber(ARGV[3]) + tonumber(ARGV[4])
+local tokens = family(KEYS[2], expires)
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[4])
+redis.call('ZREMRANGEBYSCORE', tokens, '-inf', ARGV[3])
+redis.call('ZADD', tokens, expires, ARGV[2])
+redis.call('EXPIRE', tokens, ARGV[4])
+return 1
+"""
+
+_ROTATE_SCRIPT = _FAMILY + """
+local owner = redis.call('GET', KEYS[1])
+if not owner or owner ~= ARGV[1] then
+    return 0
+end
+local expires = tonumber(ARGV[4]) + tonumber(ARGV[5])
+local tokens = family(KEYS[3], expires)
+redis.call('DEL', KEYS[1])
+redis.call('SET', KEYS[2], owner, 'EX', ARGV[5])
+redis.call('ZREM', tokens, ARGV[2])
+redis.call('ZREMRANGEBYSCORE', tokens, '-inf', ARGV[4])
+redis.call('ZADD', tokens, expires, ARGV[3])
+redis.call('EXPIRE', tokens, ARGV[5])
+return 1
+"""
+
+_REVOKE_FAMILY_SCRIPT = _FAMILY + """
+local members = redis.call('ZRANGE', family(KEYS[1], 0), 0, -1)
+for _, digest in ipairs(members) do
+    redis.call('DEL', ARGV[1] .. digest)
+end
+redis.call('DEL', KEYS[1])
+return #members
+"""
+
+
+# The in-process store never holds families from older releases, so the ports skip the set conversion.
+@local_script(_ISSUE_SCRIPT)
+async def _issue_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    now, ttl = float(args[2]), int(args[3])
+    await store.set(keys[0], args[0], ex=ttl)
+    await store.zremrangebyscore(keys[1], float('-inf'), now)
+    await store.zadd(keys[1], {args[1]: now + ttl})
+    await store.expire(keys[1], ttl)
+    return 1
+
+
+@local_script(_ROTATE_SCRIPT)
+async def _rotate_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    owner = await store.get(keys[0])
+    if owner is None or owner != args[0]:
+        return 0
+    now, ttl = float(args[3]), int(args[4])
+    await store.delete(keys[0])
+    await store.set(keys[1], owner, ex=ttl)
+    await store.zrem(keys[2], args[1])
+    await store.zremrangebyscore(keys[2], float('-inf'), now)
+    await store.zadd(keys[2], {args[2]: now + ttl})
+    await store.expire(keys[2], ttl)
+    return 1
+
+
+@local_script(_REVOKE_FAMILY_SCRIPT)
+async def _revoke_family_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    members = await store.zrange(keys[0], 0, -1)
+    for digest in members:
+        await store.delete(args[0] + digest)
+    await store.delete(keys[0])
+    return len(members)
+
+
+class RefreshTokenStore:
+    def __init__(
+        self,
+        redis: Redis,
+        ttl_seconds: int,
+        prefix: str = 'refresh:',
+        family_prefix: str = 'refresh_family:',
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.family_prefix = family_prefix
+        self.clock = clock
+        self._issue = redis.register_script(_ISSUE_SCRIPT)
+        self._rotate = redis.register_script(_ROTATE_SCRIPT)
+        self._revoke_family = redis.register_script(_REVOKE_FAMILY_SCRIPT)
+
+    async def issue(self, user_id: str, token: str) -> None:
+        digest = self.digest(token)
+        await self._issue(
+            keys=[self.prefix + digest, self._family(user_id)],
+            args=[user_id, digest, self.clock(), self.ttl_seconds],
+        )
+
+    async def rotate(self, user_id: str, old_token: str, new_token: str) -> bool:
+        old_digest, new_digest = self.digest(old_token), self.digest(new_token)
+        rotated = await self._rotate(
+            keys=[self.prefix + old_digest, self.prefix + new_digest, self._family(user_id)],
+            args=[user_id, old_digest, new_digest, self.clock(), self.ttl_seconds],
+        )
+        return bool(rotated)
+
+    async def revoke_all(self, user_id: str | UUID) -> int:
+        return int(await self._revoke_family(keys=[self._family(str(user_id))], args=[self.prefix]))
+
+    @staticmethod
+    def digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _family(self, user_id: str) -> str:
+        return f'{self.family_prefix}{user_id}'
+
+
+refresh_token_store = RefreshTokenStore(redis_client, settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60)
@@ -1,15 +1,198 @@
-from collections.abc import AsyncGenerator
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
 
 from redis.asyncio import Redis
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
+from app.core import profiling
 from app.core.config import settings
+from app.core.metrics import db_pool_checkout_wait, redis_command_duration
+from app.db.local_store import LocalStore
 
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+logger = logging.getLogger(__name__)
+
+REPLICA_LAG_QUERY = text(
+    'SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END'
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+class InstrumentedRedis(Redis):
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            redis_command_duration.observe(time.perf_counter() - started, str(args[0]))
+
+
+def _sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in ('journal_mode=WAL', 'synchronous=NORMAL', 'foreign_keys=ON', 'busy_timeout=5000'):
+        cursor.execute(f'PRAGMA {pragma}')
+    cursor.close()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool if settings.METRICS_ENABLED else None,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine.sync_engine, 'connect', _sqlite_pragmas)
+    if settings.SQL_PROFILING or settings.SQL_SLOW_QUERY_MS:
+        profiling.install(engine.sync_engine)
+    return engine
+
+
+def is_connection_error(exc: BaseException) -> bool:
+    if isinstance(exc, DBAPIError):
+        return exc.connection_invalidated or isinstance(exc, OperationalError)
+    return isinstance(exc, (OSError, TimeoutError))
+
+
+class ReplicaSession(AsyncSession):
+    # Reads are plain SELECTs, so a statement that loses its replica connection can run again on the primary.
+    def __init__(self, fail_over: Callable[['ReplicaSession', BaseException], Awaitable[bool]], **kw) -> None:
+        super().__init__(**kw)
+        self._fail_over = fail_over
+
+    async def execute(self, *args, **kwargs):
+        try:
+            return await super().execute(*args, **kwargs)
+        except Exception as exc:
+            if not await self._fail_over(self, exc):
+                raise
+        return await super().execute(*args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        try:
+            return await super().stream(*args, **kwargs)
+        except Exception as exc:
+            if not await self._fail_over(self, exc):
+                raise
+        return await super().stream(*args, **kwargs)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: async_sessionmaker[AsyncSession] | None,
+        max_lag: float = settings.DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = settings.DB_REPLICA_CHECK_INTERVAL_SECONDS,
+        probe_timeout: float = settings.DB_REPLICA_PROBE_TIMEOUT_SECONDS,
+    ) -> None:
+        self.primary = primary
+        self.replica = replica
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.probe_timeout = probe_timeout
+        self._healthy = False
+        self._checked_at = float('-inf')
+
+    async def replica_lag(self) -> float:
+        async with self.replica() as db:
+            if db.bind.dialect.name != 'postgresql':
+                await db.execute(text('SELECT 1'))
+                return 0.0
+            return float((await db.execute(REPLICA_LAG_QUERY)).scalar_one())
+
+    async def replica_healthy(self) -> bool:
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._healthy
+        self._checked_at = now
+        try:
+            lag = await asyncio.wait_for(self.replica_lag(), self.probe_timeout)
+        except Exception:
+            logger.warning('read replica unreachable, routing reads to primary', exc_info=True)
+            self.mark_unhealthy()
+            return False
+        self._healthy = lag <= self.max_lag
+        self._checked_at = time.monotonic()
+        if not self._healthy:
+            logger.warning('read replica lagging by %.1fs, routing reads to primary', lag)
+        return self._healthy
+
+    def mark_unhealthy(self) -> None:
+        self._healthy = False
+        self._checked_at = time.monotonic()
+
+    async def read_sessionmaker(self) -> async_sessionmaker[AsyncSession]:
+        if self.replica is not None and await self.replica_healthy():
+            return self.replica
+        return self.primary
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        if self.replica is None or not await self.replica_healthy():
+            async with self.primary() as db:
+                yield db
+            return
+        async with ReplicaSession(self._fail_over, **self.replica.kw) as db:
+            try:
+                await asyncio.wait_for(db.connection(), self.probe_timeout)
+            except Exception as exc:
+                if not await self._fail_over(db, exc):
+                    raise
+            yield db
+
+    async def _fail_over(self, db: ReplicaSession, exc: BaseException) -> bool:
+        primary = self.primary.kw['bind']
+        if db.bind is primary or not is_connection_error(exc):
+            return False
+        logger.warning('read replica connection failed, retrying on primary', exc_info=exc)
+        self.mark_unhealthy()
+        await db.close()
+        db.bind = primary
+        db.sync_session.bind = primary.sync_engine
+        return True
+
+
+engine = build_engine(settings.DATABASE_URL)
 SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
-redis_client = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+replica_engine = build_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, expire_on_commit=False, class_=AsyncSession) if replica_engine is not None else None
+)
+db_router = ReplicaRouter(SessionLocal, ReplicaSessionLocal)
+
+
+def build_redis(url: str) -> Redis | LocalStore:
+    if url.startswith('memory://'):
+        return LocalStore()
+    return (InstrumentedRedis if settings.METRICS_ENABLED else Redis).from_url(url, decode_responses=True)
+
+
+redis_client = build_redis(settings.REDIS_URL)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with SessionLocal() as session:
         yield session
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    async with db_router.read_session() as session:
+        yield session
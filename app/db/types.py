@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlalchemy.engine import Dialect
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import TypeDecorator
+
+
+class UTCDateTime(TypeDecorator):
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value: datetime | None, dialect: Dialect) -> datetime | None:
+        if value is not None and value.tzinfo is not None and dialect.name == 'sqlite':
+            return value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
+    def process_result_value(self, value: datetime | None, dialect: Dialect) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class utcnow(FunctionElement):
+    type = UTCDateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow(element, compiler, **kw) -> str:
+    return 'now()'
+
+
+# CURRENT_TIMESTAMP on SQLite has one-second resolution, which collapses keyset order within a second.
+# %f yields milliseconds; pad to the six digits SQLAlchemy binds so stored and bound values compare as strings.
+@compiles(utcnow, 'sqlite')
+def _utcnow_sqlite(element, compiler, **kw) -> str:
+    return "(STRFTIME('%Y-%m-%d %H:%M:%f', 'now') || '000')"
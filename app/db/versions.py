@@ -0,0 +1,58 @@
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.db.local_store import LocalStore, local_script
+from app.db.session import redis_client
+
+_BUMP_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('SET', KEYS[1], ARGV[1])
+end
+local version = redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return version
+"""
+
+
+@local_script(_BUMP_SCRIPT)
+async def _bump_local(store: LocalStore, keys: list[str], args: list[str]) -> int:
+    await store.set(keys[0], args[0], nx=True)
+    version = await store.incr(keys[0])
+    await store.expire(keys[0], int(args[1]))
+    return version
+
+
+class VersionStore:
+    def __init__(self, redis: Redis, ttl_seconds: int, prefix: str = 'version:') -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._bump = redis.register_script(_BUMP_SCRIPT)
+
+    async def session_version(self, session_id: UUID) -> int:
+        return await self._current(f'{self.prefix}session:{session_id}')
+
+    async def user_version(self, user_id: UUID) -> int:
+        return await self._current(f'{self.prefix}user:{user_id}')
+
+    async def bump_session(self, session_id: UUID) -> int:
+        return int(await self._bump(keys=[f'{self.prefix}session:{session_id}'], args=[self._seed(), self.ttl_seconds]))
+
+    async def bump_user(self, user_id: UUID) -> int:
+        return int(await self._bump(keys=[f'{self.prefix}user:{user_id}'], args=[self._seed(), self.ttl_seconds]))
+
+    async def _current(self, key: str) -> int:
+        seed = self._seed()
+        previous = await self.redis.set(key, seed, nx=True, ex=self.ttl_seconds, get=True)
+        return seed if previous is None else int(previous)
+
+    # A lost counter restarts from the current time, so it never reissues a version a client may still hold.
+    @staticmethod
+    def _seed() -> int:
+        return time.time_ns() // 1000
+
+
+version_store = VersionStore(redis_client, settings.ETAG_VERSION_TTL_SECONDS)
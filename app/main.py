@@ -1,23 +1,61 @@
+import asyncio
 from contextlib import asynccontextmanager
 from uuid import UUID
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import select
 
 from app.api import auth, exam, users
+from app.api.deps import authenticate_token
+from app.api.responses import FastJSONResponse
+from app.core import metrics, profiling
 from app.core.config import settings
-from app.core.logging import setup_logging
-from app.db.session import redis_client
-from app.websocket.manager import manager
+from app.core.logging import RequestContextMiddleware, session_id_var, setup_logging, shutdown_logging
+from app.core.security import password_hasher
+from app.db import alert_partitions
+from app.db.alert_buffer import alert_buffer
+from app.db.principals import principal_cache
+from app.db.rate_limits import ws_frame_limiter
+from app.db.base import Base
+from app.db.session import SessionLocal, engine, redis_client
+from app.models.exam_session import ExamSession
+from app.models.user import UserRole
+from app.websocket import framing
+from app.websocket.event_log import EVENT_ID_PATTERN
+from app.websocket.framing import FrameError
+from app.websocket.manager import is_server_event, manager
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     setup_logging()
+    if engine.dialect.name == 'sqlite':
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    await principal_cache.start()
+    await alert_partitions.alert_archive.refresh()
+    maintenance = None
+    if engine.dialect.name == 'postgresql' and settings.ALERT_PARTITION_MAINTENANCE_INTERVAL_SECONDS > 0:
+        maintenance = asyncio.create_task(alert_partitions.run_maintenance())
     yield
+    if maintenance is not None:
+        maintenance.cancel()
+    if alert_buffer is not None:
+        await alert_buffer.drain()
+    await manager.close()
+    await principal_cache.close()
     await redis_client.aclose()
+    await engine.dispose()
+    shutdown_logging()
 
 
-app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=FastJSONResponse)
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+if settings.SQL_PROFILING:
+    app.add_middleware(profiling.QueryProfilerMiddleware)
+app.add_middleware(RequestContextMiddleware)
 app.include_router(auth.router, prefix=settings.API_V1_PREFIX)
 app.include_router(users.router, prefix=settings.API_V1_PREFIX)
 app.include_router(exam.router, prefix=settings.API_V1_PREFIX)
@@ -28,12 +66,121 @@ async def healthcheck() -> dict[str, str]:
     return {'status': 'ok'}
 
 
+@metrics.registry.collector
+def _collect_runtime_metrics() -> None:
+    pool = engine.sync_engine.pool
+    if hasattr(pool, 'checkedout'):
+        metrics.db_pool_connections.set('checked_out', value=pool.checkedout())
+        metrics.db_pool_connections.set('idle', value=pool.checkedin())
+        metrics.db_pool_connections.set('overflow', value=max(pool.overflow(), 0))
+
+    stats = manager.stats()
+    metrics.ws_connections.set(value=stats['connections'])
+    metrics.ws_sessions.set(value=stats['sessions'])
+    metrics.ws_dropped_messages.set(value=stats['dropped_messages'])
+    metrics.ws_evicted_clients.set(value=stats['evicted_clients'])
+    depths = manager.queue_depths()
+    metrics.ws_send_queue_depth_max.set(value=max(depths, default=0))
+    metrics.ws_send_queue_depth_sum.set(value=sum(depths))
+
+    metrics.password_hash_pending.set(value=password_hasher.pending)
+    metrics.password_hash_rejected.set(value=password_hasher.rejected)
+    cache = principal_cache.stats()
+    for outcome in ('local_hits', 'redis_hits', 'misses'):
+        metrics.principal_cache_lookups.set(outcome, value=cache[outcome])
+
+
+@app.get('/metrics', include_in_schema=False)
+async def metrics_endpoint() -> PlainTextResponse:
+    return PlainTextResponse(metrics.registry.render(), media_type='text/plain; version=0.0.4')
+
+
+async def _authorize_session_socket(token: str, session_id: UUID) -> bool:
+    try:
+        async with SessionLocal() as db:
+            principal = await authenticate_token(token, db)
+            if principal.role == UserRole.INVIGILATOR:
+                return True
+            student_id = await db.scalar(select(ExamSession.student_id).where(ExamSession.id == session_id))
+    except HTTPException:
+        return False
+    return student_id == principal.id
+
+
 @app.websocket('/ws/exam/{session_id}')
-async def exam_session_ws(websocket: WebSocket, session_id: UUID):
-    await manager.connect(session_id, websocket)
+async def exam_session_ws(
+    websocket: WebSocket, session_id: UUID, token: str = Query(...), last_event_id: str | None = Query(default=None)
+):
+    if last_event_id is not None and last_event_id != '$' and not EVENT_ID_PATTERN.match(last_event_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if not await _authorize_session_socket(token, session_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    session_id_var.set(str(session_id))
+    binary = framing.negotiate(websocket)
     try:
+        await manager.connect(session_id, websocket, last_event_id, binary=binary)
         while True:
-            payload = await websocket.receive_json()
-            await manager.broadcast(session_id, payload)
+            if binary:
+                try:
+                    records = framing.decode_records(await websocket.receive_bytes())
+                except (FrameError, KeyError):
+                    await websocket.close(code=status.WS_1007_INVALID_FRAME_PAYLOAD_DATA)
+                    break
+            else:
+                records = [await websocket.receive_json()]
+            if ws_frame_limiter is not None and any(ws_frame_limiter.check_local(session_id) for _ in records):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason='Rate limit exceeded')
+                break
+            # Subscribers must be able to trust that alert events come from the server.
+            if any(is_server_event(record.message if binary else record) for record in records):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason='Reserved message type')
+                break
+            for record in records:
+                if binary:
+                    await manager.broadcast_raw(session_id, record.data, record.frame)
+                else:
+                    await manager.broadcast(session_id, record)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+
+@app.websocket('/ws/invigilator')
+async def invigilator_ws(websocket: WebSocket, token: str = Query(...)):
+    try:
+        async with SessionLocal() as db:
+            principal = await authenticate_token(token, db)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if principal.role != UserRole.INVIGILATOR:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await manager.connect_multiplexed(websocket, binary=framing.negotiate(websocket))
+    try:
+        while True:
+            frame = await websocket.receive_json()
+            action = frame.get('action') if isinstance(frame, dict) else None
+            try:
+                session_ids = [UUID(str(value)) for value in frame.get('session_ids', [])]
+            except (AttributeError, TypeError, ValueError):
+                session_ids = None
+            if action not in ('subscribe', 'unsubscribe') or session_ids is None:
+                manager.send(websocket, {'type': 'error', 'detail': 'Expected {"action": "subscribe"|"unsubscribe", "session_ids": [...]}'})
+                continue
+
+            for session_id in session_ids:
+                if action == 'subscribe':
+                    await manager.subscribe(websocket, session_id)
+                else:
+                    manager.unsubscribe(websocket, session_id)
+            manager.send(websocket, {'type': f'{action}d', 'session_ids': [str(session_id) for session_id in session_ids]})
     except WebSocketDisconnect:
-        manager.disconnect(session_id, websocket)
+        pass
+    finally:
+        manager.disconnect(websocket)
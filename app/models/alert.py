@@ -2,11 +2,11 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Enum, ForeignKey, Index, Integer, String, Text, Uuid, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.db.types import UTCDateTime, utcnow
 
 
 class AlertSeverity(str, enum.Enum):
@@ -18,12 +18,15 @@ class AlertSeverity(str, enum.Enum):
 
 class Alert(Base):
     __tablename__ = 'alerts'
+    __table_args__ = (Index('ix_alerts_session_created_id', 'exam_session_id', text('created_at DESC'), text('id DESC')),)
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    exam_session_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey('exam_sessions.id', ondelete='CASCADE'), nullable=False, index=True)
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    exam_session_id: Mapped[uuid.UUID] = mapped_column(Uuid, ForeignKey('exam_sessions.id', ondelete='CASCADE'), nullable=False)
     severity: Mapped[AlertSeverity] = mapped_column(Enum(AlertSeverity, name='alert_severity'), nullable=False)
     event_type: Mapped[str] = mapped_column(String(100), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False, server_default=utcnow())
+    occurrences: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text('1'))
+    last_seen_at: Mapped[datetime] = mapped_column(UTCDateTime, nullable=False, server_default=utcnow())
 
     exam_session = relationship('ExamSession', back_populates='alerts')
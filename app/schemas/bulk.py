@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+
+
+class BulkRowError(BaseModel):
+    row: int
+    detail: str
@@ -1,10 +1,11 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, model_validator
 
 from app.models.alert import AlertSeverity
 from app.models.exam_session import SessionStatus
+from app.schemas.bulk import BulkRowError
 
 
 class ExamSessionCreate(BaseModel):
@@ -26,12 +27,34 @@ class ExamSessionRead(BaseModel):
     created_at: datetime
 
 
+class ExamSessionBulkCreate(BaseModel):
+    exam_name: str
+    student_id: uuid.UUID | None = None
+    student_email: EmailStr | None = None
+    invigilator_id: uuid.UUID | None = None
+
+    @model_validator(mode='after')
+    def _require_student(self) -> 'ExamSessionBulkCreate':
+        if self.student_id is None and self.student_email is None:
+            raise ValueError('student_id or student_email is required')
+        return self
+
+
+class ExamSessionBulkResult(BaseModel):
+    created: list[ExamSessionRead]
+    errors: list[BulkRowError]
+
+
 class AlertCreate(BaseModel):
     severity: AlertSeverity
     event_type: str
     description: str
 
 
+class AlertBatchCreate(BaseModel):
+    alerts: list[AlertCreate] = Field(min_length=1, max_length=1000)
+
+
 class AlertRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -41,3 +64,12 @@ class AlertRead(BaseModel):
     event_type: str
     description: str
     created_at: datetime
+    occurrences: int
+    last_seen_at: datetime
+
+
+class AlertSummary(BaseModel):
+    total: int
+    by_severity: dict[AlertSeverity, int]
+    by_event_type: dict[str, int]
+    per_minute: dict[str, int]
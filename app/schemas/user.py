@@ -4,6 +4,7 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, EmailStr
 
 from app.models.user import UserRole
+from app.schemas.bulk import BulkRowError
 
 
 class UserCreate(BaseModel):
@@ -21,3 +22,8 @@ class UserRead(BaseModel):
     full_name: str
     role: UserRole
     created_at: datetime
+
+
+class UserBulkResult(BaseModel):
+    created: list[UserRead]
+    errors: list[BulkRowError]
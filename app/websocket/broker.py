@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from collections.abc import Callable
+from uuid import UUID, uuid4
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[UUID, str, str | None], None]
+
+
+class RedisBroker:
+    def __init__(self, redis: Redis, channel_prefix: str = 'ws:session:') -> None:
+        self.redis = redis
+        self.channel_prefix = channel_prefix
+        self.node_id = uuid4().hex
+        self._handler: MessageHandler | None = None
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+
+    def bind(self, handler: MessageHandler) -> None:
+        self._handler = handler
+
+    async def publish(self, session_id: UUID, data: str, event_id: str | None = None) -> None:
+        await self.redis.publish(self._channel(session_id), f'{self.node_id}:{event_id or ""}:{data}')
+
+    async def subscribe(self, session_id: UUID) -> None:
+        if self._pubsub is None:
+            self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self._channel(session_id))
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def unsubscribe(self, session_id: UUID) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.unsubscribe(self._channel(session_id))
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('redis broker listener failed, retrying')
+                await asyncio.sleep(1.0)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            self._dispatch(message['channel'], message['data'])
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        origin, _, rest = payload.partition(':')
+        if origin == self.node_id or self._handler is None:
+            return
+        try:
+            session_id = UUID(channel[len(self.channel_prefix):])
+        except ValueError:
+            return
+        event_id, _, data = rest.partition(':')
+        self._handler(session_id, data, event_id or None)
+
+    def _channel(self, session_id: UUID) -> str:
+        return f'{self.channel_prefix}{session_id}'
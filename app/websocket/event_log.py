@@ -0,0 +1,45 @@
+import re
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+EVENT_ID_PATTERN = re.compile(r'^\d+-\d+$')
+
+
+def event_id_key(event_id: str) -> tuple[int, int]:
+    millis, _, sequence = event_id.partition('-')
+    return int(millis), int(sequence or 0)
+
+
+class RedisEventLog:
+    def __init__(self, redis: Redis, maxlen: int, ttl_seconds: int, prefix: str = 'ws:events:') -> None:
+        self.redis = redis
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def append(self, session_id: UUID, data: str) -> str:
+        key = self._key(session_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(key, {'d': data}, maxlen=self.maxlen, approximate=True)
+            pipe.expire(key, self.ttl_seconds)
+            event_id, _ = await pipe.execute()
+        return event_id
+
+    async def read_after(self, session_id: UUID, last_event_id: str) -> list[tuple[str, str]]:
+        entries = await self.redis.xrange(self._key(session_id), min=f'({last_event_id}', max='+')
+        return [(event_id, fields['d']) for event_id, fields in entries]
+
+    async def wait_after(self, session_id: UUID, last_event_id: str, block_ms: int) -> list[tuple[str, str]]:
+        response = await self.redis.xread({self._key(session_id): last_event_id}, block=block_ms)
+        if not response:
+            return []
+        _, entries = response[0]
+        return [(event_id, fields['d']) for event_id, fields in entries]
+
+    async def last_id(self, session_id: UUID) -> str:
+        entries = await self.redis.xrevrange(self._key(session_id), count=1)
+        return entries[0][0] if entries else '0-0'
+
+    def _key(self, session_id: UUID) -> str:
+        return f'{self.prefix}{session_id}'
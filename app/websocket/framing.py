@@ -0,0 +1,55 @@
+import struct
+from typing import Any, NamedTuple
+
+import orjson
+from fastapi import WebSocket
+
+BINARY_SUBPROTOCOL = 'quasar.frames.v1'
+
+_LENGTH = struct.Struct('>I')
+
+
+class FrameError(ValueError):
+    pass
+
+
+class Record(NamedTuple):
+    data: str
+    frame: bytes
+    message: Any
+
+
+def negotiate(websocket: WebSocket) -> bool:
+    return BINARY_SUBPROTOCOL in websocket.scope.get('subprotocols', ())
+
+
+def encode_record(data: str) -> bytes:
+    payload = data.encode()
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def decode_records(message: bytes) -> list[Record]:
+    records: list[Record] = []
+    view = memoryview(message)
+    offset, total = 0, len(message)
+    while offset < total:
+        if offset + _LENGTH.size > total:
+            raise FrameError('Truncated record length')
+        start = offset
+        (size,) = _LENGTH.unpack_from(message, offset)
+        offset += _LENGTH.size
+        if offset + size > total:
+            raise FrameError('Truncated record payload')
+        payload = view[offset:offset + size]
+        try:
+            data = str(payload, 'utf-8')
+        except UnicodeDecodeError as exc:
+            raise FrameError('Record is not valid UTF-8') from exc
+        try:
+            parsed = orjson.loads(payload)
+        except orjson.JSONDecodeError as exc:
+            raise FrameError('Record is not valid JSON') from exc
+        offset += size
+        # Keep the sender's length-prefixed bytes so plain binary subscribers get them without re-encoding.
+        records.append(Record(data, message if start == 0 and offset == total else message[start:offset], parsed))
+    return records
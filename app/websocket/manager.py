@@ -1,27 +1,298 @@
+import asyncio
+import enum
+import json
+import logging
+import time
 from collections import defaultdict
 from typing import DefaultDict
 from uuid import UUID
 
-from fastapi import WebSocket
+from fastapi import WebSocket, status
+
+from app.core.config import settings
+from app.core.metrics import ws_broadcast_duration
+from app.db.session import redis_client
+from app.websocket.broker import RedisBroker
+from app.websocket.event_log import RedisEventLog, event_id_key
+from app.websocket.framing import BINARY_SUBPROTOCOL, encode_record
+
+logger = logging.getLogger(__name__)
+
+
+class SlowConsumerPolicy(str, enum.Enum):
+    DROP_OLDEST = 'DROP_OLDEST'
+    COALESCE = 'COALESCE'
+    DISCONNECT = 'DISCONNECT'
+
+
+class EventType(str, enum.Enum):
+    ALERT_CREATED = 'alert.created'
+    ALERT_UPDATED = 'alert.updated'
+
+
+SERVER_EVENT_TYPES = frozenset(event.value for event in EventType)
+
+
+def is_server_event(message: object) -> bool:
+    return isinstance(message, dict) and message.get('type') in SERVER_EVENT_TYPES
+
+
+class _Outbound:
+    __slots__ = ('websocket', 'queue', 'task', 'sessions', 'multiplexed', 'resumable', 'binary', 'backlog')
+
+    def __init__(self, websocket: WebSocket, maxsize: int, multiplexed: bool, resumable: bool = False, binary: bool = False) -> None:
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=maxsize)
+        self.task: asyncio.Task | None = None
+        self.sessions: set[UUID] = set()
+        self.multiplexed = multiplexed
+        self.resumable = resumable
+        self.binary = binary
+        self.backlog: list[tuple[str | None, str]] | None = None
 
 
 class ConnectionManager:
-    def __init__(self) -> None:
-        self._connections: DefaultDict[UUID, list[WebSocket]] = defaultdict(list)
+    def __init__(
+        self,
+        queue_size: int = settings.WS_SEND_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy(settings.WS_SLOW_CONSUMER_POLICY),
+        broker: RedisBroker | None = None,
+        event_log: RedisEventLog | None = None,
+        batch_interval: float | None = settings.WS_BATCH_INTERVAL_MS / 1000 if settings.WS_BATCHING else None,
+        batch_max_bytes: int = settings.WS_BATCH_MAX_BYTES,
+    ) -> None:
+        self._subscribers: DefaultDict[UUID, dict[WebSocket, _Outbound]] = defaultdict(dict)
+        self._outbound: dict[WebSocket, _Outbound] = {}
+        self._background: set[asyncio.Task] = set()
+        self._coalesced: dict[str, tuple[UUID, EventType, dict]] = {}
+        self.queue_size = queue_size
+        self.policy = policy
+        self.dropped_messages = 0
+        self.evicted_clients = 0
+        self.broker = broker
+        self.event_log = event_log
+        self.batch_interval = batch_interval
+        self.batch_max_bytes = batch_max_bytes
+        if broker is not None:
+            broker.bind(self._fanout)
+
+    async def connect(self, session_id: UUID, websocket: WebSocket, last_event_id: str | None = None, binary: bool = False) -> None:
+        resumable = last_event_id is not None and self.event_log is not None
+        outbound = await self._accept(websocket, multiplexed=False, resumable=resumable, binary=binary)
+        if not resumable or last_event_id == '$':
+            await self.subscribe(websocket, session_id)
+            return
+
+        outbound.backlog = []
+        await self.subscribe(websocket, session_id)
+        try:
+            replayed = await self.event_log.read_after(session_id, last_event_id)
+        except Exception:
+            outbound.backlog = None
+            raise
+        last_key = event_id_key(last_event_id)
+        for event_id, data in replayed:
+            await outbound.queue.put(self._frame(outbound, session_id, data, event_id))
+            last_key = event_id_key(event_id)
+        backlog, outbound.backlog = outbound.backlog, None
+        for event_id, data in backlog:
+            if event_id is None or event_id_key(event_id) > last_key:
+                self._enqueue(outbound, self._frame(outbound, session_id, data, event_id))
 
-    async def connect(self, session_id: UUID, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self._connections[session_id].append(websocket)
+    async def connect_multiplexed(self, websocket: WebSocket, binary: bool = False) -> None:
+        await self._accept(websocket, multiplexed=True, binary=binary)
 
-    def disconnect(self, session_id: UUID, websocket: WebSocket) -> None:
-        if websocket in self._connections[session_id]:
-            self._connections[session_id].remove(websocket)
-        if not self._connections[session_id]:
-            self._connections.pop(session_id, None)
+    async def subscribe(self, websocket: WebSocket, session_id: UUID) -> None:
+        outbound = self._outbound.get(websocket)
+        if outbound is None or session_id in outbound.sessions:
+            return
+        outbound.sessions.add(session_id)
+        first = session_id not in self._subscribers
+        self._subscribers[session_id][websocket] = outbound
+        if first and self.broker is not None:
+            await self.broker.subscribe(session_id)
+
+    def unsubscribe(self, websocket: WebSocket, session_id: UUID) -> None:
+        outbound = self._outbound.get(websocket)
+        if outbound is None or session_id not in outbound.sessions:
+            return
+        outbound.sessions.discard(session_id)
+        self._detach(session_id, websocket)
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        outbound = self._outbound.pop(websocket, None)
+        if outbound is None:
+            return
+        if outbound.task is not None and outbound.task is not asyncio.current_task():
+            outbound.task.cancel()
+        for session_id in outbound.sessions:
+            self._detach(session_id, websocket)
+        outbound.sessions.clear()
 
     async def broadcast(self, session_id: UUID, message: dict) -> None:
-        for connection in self._connections.get(session_id, []):
-            await connection.send_json(message)
+        await self.broadcast_raw(session_id, json.dumps(message))
+
+    async def broadcast_raw(self, session_id: UUID, data: str, frame: bytes | None = None) -> None:
+        event_id = await self.event_log.append(session_id, data) if self.event_log is not None else None
+        self._fanout(session_id, data, event_id, frame)
+        if self.broker is not None:
+            await self.broker.publish(session_id, data, event_id)
+
+    async def publish(self, session_id: UUID, event: EventType, data: dict) -> None:
+        await self.broadcast(session_id, {'type': event.value, 'data': data})
+
+    def publish_coalesced(self, session_id: UUID, key: str, event: EventType, data: dict, delay: float) -> None:
+        first = key not in self._coalesced
+        self._coalesced[key] = (session_id, event, data)
+        if first:
+            asyncio.get_running_loop().call_later(delay, self._flush_coalesced, key)
+
+    def send(self, websocket: WebSocket, message: dict) -> None:
+        outbound = self._outbound.get(websocket)
+        if outbound is not None:
+            data = json.dumps(message)
+            self._enqueue(outbound, encode_record(data) if outbound.binary else data)
+
+    async def close(self) -> None:
+        if self.broker is not None:
+            await self.broker.close()
+
+    def queue_depths(self) -> list[int]:
+        return [outbound.queue.qsize() for outbound in self._outbound.values()]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'sessions': len(self._subscribers),
+            'connections': len(self._outbound),
+            'subscriptions': sum(len(outbound.sessions) for outbound in self._outbound.values()),
+            'dropped_messages': self.dropped_messages,
+            'evicted_clients': self.evicted_clients,
+        }
+
+    async def _accept(self, websocket: WebSocket, multiplexed: bool, resumable: bool = False, binary: bool = False) -> _Outbound:
+        if binary:
+            await websocket.accept(subprotocol=BINARY_SUBPROTOCOL)
+        else:
+            await websocket.accept()
+        outbound = _Outbound(websocket, self.queue_size, multiplexed, resumable, binary)
+        outbound.task = asyncio.create_task(self._writer(outbound))
+        self._outbound[websocket] = outbound
+        return outbound
+
+    def _detach(self, session_id: UUID, websocket: WebSocket) -> None:
+        subscribers = self._subscribers.get(session_id)
+        if subscribers is None:
+            return
+        subscribers.pop(websocket, None)
+        if not subscribers:
+            self._subscribers.pop(session_id, None)
+            if self.broker is not None:
+                self._spawn(self._release(session_id))
+
+    def _fanout(self, session_id: UUID, data: str, event_id: str | None = None, frame: bytes | None = None) -> None:
+        subscribers = self._subscribers.get(session_id)
+        if not subscribers:
+            return
+        started = time.perf_counter()
+        frames: dict[tuple[bool, bool, bool], str | bytes] = {}
+        if frame is not None:
+            frames[(False, False, True)] = frame
+        for outbound in list(subscribers.values()):
+            if outbound.backlog is not None:
+                outbound.backlog.append((event_id, data))
+                continue
+            shape = (outbound.multiplexed, outbound.resumable, outbound.binary)
+            frame = frames.get(shape)
+            if frame is None:
+                frame = frames[shape] = self._frame(outbound, session_id, data, event_id)
+            self._enqueue(outbound, frame)
+        ws_broadcast_duration.observe(time.perf_counter() - started)
+
+    @staticmethod
+    def _frame(outbound: _Outbound, session_id: UUID, data: str, event_id: str | None) -> str | bytes:
+        if outbound.multiplexed:
+            if event_id is None:
+                data = f'{{"session_id": "{session_id}", "message": {data}}}'
+            else:
+                data = f'{{"session_id": "{session_id}", "id": "{event_id}", "message": {data}}}'
+        elif outbound.resumable and event_id is not None:
+            data = f'{{"id": "{event_id}", "message": {data}}}'
+        return encode_record(data) if outbound.binary else data
+
+    def _enqueue(self, outbound: _Outbound, data: str | bytes) -> None:
+        queue = outbound.queue
+        if not queue.full():
+            queue.put_nowait(data)
+            return
+
+        if self.policy is SlowConsumerPolicy.DISCONNECT:
+            self.evicted_clients += 1
+            self.disconnect(outbound.websocket)
+            self._spawn(self._close(outbound.websocket, status.WS_1013_TRY_AGAIN_LATER))
+            return
+
+        if self.policy is SlowConsumerPolicy.COALESCE:
+            self.dropped_messages += queue.qsize()
+            while not queue.empty():
+                queue.get_nowait()
+        else:
+            queue.get_nowait()
+            self.dropped_messages += 1
+        queue.put_nowait(data)
+
+    async def _writer(self, outbound: _Outbound) -> None:
+        queue = outbound.queue
+        batching = outbound.binary and self.batch_interval is not None
+        send = outbound.websocket.send_bytes if outbound.binary else outbound.websocket.send_text
+        try:
+            while True:
+                data = await queue.get()
+                if batching:
+                    if self.batch_interval:
+                        await asyncio.sleep(self.batch_interval)
+                    if not queue.empty():
+                        data = self._batch(queue, data)
+                await send(data)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.debug('websocket writer stopped', exc_info=True)
+            self.disconnect(outbound.websocket)
+
+    def _batch(self, queue: asyncio.Queue, first: bytes) -> bytes:
+        records, size = [first], len(first)
+        while size < self.batch_max_bytes and not queue.empty():
+            record = queue.get_nowait()
+            records.append(record)
+            size += len(record)
+        return b''.join(records)
+
+    def _flush_coalesced(self, key: str) -> None:
+        pending = self._coalesced.pop(key, None)
+        if pending is not None:
+            self._spawn(self.publish(*pending))
+
+    async def _release(self, session_id: UUID) -> None:
+        if session_id not in self._subscribers:
+            await self.broker.unsubscribe(session_id)
+
+    async def _close(self, websocket: WebSocket, code: int) -> None:
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            logger.debug('failed to close evicted websocket', exc_info=True)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
 
 
-manager = ConnectionManager()
+manager = ConnectionManager(
+    broker=RedisBroker(redis_client) if settings.WS_BROKER == 'redis' else None,
+    event_log=(
+        RedisEventLog(redis_client, settings.WS_EVENT_LOG_MAXLEN, settings.WS_EVENT_LOG_TTL_SECONDS)
+        if settings.WS_EVENT_LOG
+        else None
+    ),
+)
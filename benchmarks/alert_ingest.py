@@ -0,0 +1,86 @@
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.alert_buffer import AlertWriteBuffer
+from app.db.base import Base
+from app.models import Alert, ExamSession, User
+from app.models.alert import AlertSeverity
+from app.models.user import UserRole
+
+
+def _row(session_id: uuid.UUID) -> dict:
+    return {
+        'exam_session_id': session_id,
+        'severity': AlertSeverity.MEDIUM,
+        'event_type': 'face_not_visible',
+        'description': 'benchmark',
+    }
+
+
+async def _seed(session_factory: async_sessionmaker[AsyncSession]) -> uuid.UUID:
+    async with session_factory() as db:
+        student = User(email=f'{uuid.uuid4()}@bench.local', full_name='Bench', hashed_password='x', role=UserRole.STUDENT)
+        db.add(student)
+        await db.flush()
+        session = ExamSession(exam_name='bench', student_id=student.id)
+        db.add(session)
+        await db.commit()
+        return session.id
+
+
+async def per_request(session_factory: async_sessionmaker[AsyncSession], session_id: uuid.UUID) -> None:
+    async with session_factory() as db:
+        result = await db.execute(select(ExamSession).where(ExamSession.id == session_id))
+        result.scalar_one()
+        alert = Alert(**_row(session_id))
+        db.add(alert)
+        await db.commit()
+        await db.refresh(alert)
+
+
+async def run(database_url: str, total: int, concurrency: int, batch_size: int, delay_ms: int) -> None:
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_id = await _seed(session_factory)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(coro_factory) -> None:
+        async with semaphore:
+            await coro_factory()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(lambda: per_request(session_factory, session_id)) for _ in range(total)))
+    baseline = total / (time.perf_counter() - started)
+
+    buffer = AlertWriteBuffer(session_factory, batch_size, delay_ms / 1000)
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(lambda: buffer.submit([_row(session_id)])) for _ in range(total)))
+    await buffer.drain()
+    buffered = total / (time.perf_counter() - started)
+
+    await engine.dispose()
+    print(f'per-request:  {baseline:10.0f} alerts/sec')
+    print(f'write-behind: {buffered:10.0f} alerts/sec ({buffered / baseline:.1f}x)')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare per-request alert inserts with the write-behind buffer.')
+    parser.add_argument('--database-url', default=settings.DATABASE_URL)
+    parser.add_argument('--total', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--delay-ms', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.total, args.concurrency, args.batch_size, args.delay_ms))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.pagination import PageParams, encode_cursor, keyset_page
+from app.core.config import settings
+from app.db.base import Base
+from app.models import Alert, ExamSession, User
+from app.models.alert import AlertSeverity
+from app.models.user import UserRole
+
+
+async def _seed(session_factory: async_sessionmaker[AsyncSession], count: int) -> tuple[uuid.UUID, datetime, uuid.UUID]:
+    async with session_factory() as db:
+        student = User(email=f'{uuid.uuid4()}@bench.local', full_name='Bench', hashed_password='x', role=UserRole.STUDENT)
+        db.add(student)
+        await db.flush()
+        session = ExamSession(exam_name='bench', student_id=student.id)
+        db.add(session)
+        await db.flush()
+
+        start = datetime.now(timezone.utc) - timedelta(seconds=count)
+        middle: tuple[datetime, uuid.UUID] | None = None
+        for offset in range(0, count, 10_000):
+            rows = []
+            for i in range(offset, min(offset + 10_000, count)):
+                row = {
+                    'id': uuid.uuid4(),
+                    'exam_session_id': session.id,
+                    'severity': AlertSeverity.LOW,
+                    'event_type': 'face_not_visible',
+                    'description': 'benchmark',
+                    'created_at': start + timedelta(seconds=i),
+                }
+                if i == count // 2:
+                    middle = (row['created_at'], row['id'])
+                rows.append(row)
+            await db.execute(insert(Alert), rows)
+        await db.commit()
+        return session.id, *middle
+
+
+async def _timed(session_factory: async_sessionmaker[AsyncSession], stmt, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        async with session_factory() as db:
+            started = time.perf_counter()
+            result = await db.execute(stmt)
+            result.scalars().all()
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def run(database_url: str, sizes: list[int], limit: int, repeats: int, full_scan_max: int) -> None:
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f'{"alerts":>10} {"full load ms":>14} {"first page ms":>14} {"mid page ms":>14}')
+    for size in sizes:
+        session_id, middle_at, middle_id = await _seed(session_factory, size)
+        base = select(Alert).where(Alert.exam_session_id == session_id)
+
+        full = '-'
+        if size <= full_scan_max:
+            full = f'{await _timed(session_factory, base.order_by(Alert.created_at.desc()), repeats):.2f}'
+        first = await _timed(session_factory, keyset_page(base, Alert.created_at, Alert.id, PageParams(None, limit)), repeats)
+        mid_page = PageParams(encode_cursor(middle_at, middle_id), limit)
+        mid = await _timed(session_factory, keyset_page(base, Alert.created_at, Alert.id, mid_page), repeats)
+        print(f'{size:>10} {full:>14} {first:>14.2f} {mid:>14.2f}')
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Compare full alert loads with keyset pages as the table grows.')
+    parser.add_argument('--database-url', default=settings.DATABASE_URL)
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--full-scan-max', type=int, default=100_000)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    asyncio.run(run(args.database_url, sizes, args.limit, args.repeats, args.full_scan_max))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import UUID
+
+import httpx
+from fastapi import Depends, FastAPI, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.pagination import PageParams, finish_page, keyset_page
+from app.api.responses import FastJSONResponse, columns_for, rows_response
+from app.core.config import settings
+from app.db.base import Base
+from app.models import Alert
+from app.schemas.exam import AlertRead
+from benchmarks.alert_pagination import _seed
+
+
+def _build_app(session_factory: async_sessionmaker[AsyncSession], rows: int) -> FastAPI:
+    app = FastAPI()
+    page = PageParams(None, rows)
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    @app.get('/orm/{session_id}', response_model=list[AlertRead])
+    async def orm_path(session_id: UUID, response: Response, db: AsyncSession = Depends(get_db)) -> list[Alert]:
+        stmt = select(Alert).where(Alert.exam_session_id == session_id)
+        result = await db.execute(keyset_page(stmt, Alert.created_at, Alert.id, page))
+        return finish_page(list(result.scalars().all()), page, response)
+
+    @app.get('/fast/{session_id}', response_model=list[AlertRead])
+    async def fast_path(session_id: UUID, response: Response, db: AsyncSession = Depends(get_db)) -> FastJSONResponse:
+        stmt = select(*columns_for(Alert, AlertRead)).where(Alert.exam_session_id == session_id)
+        result = await db.execute(keyset_page(stmt, Alert.created_at, Alert.id, page))
+        return rows_response(finish_page(result.all(), page, response), AlertRead, response)
+
+    return app
+
+
+async def _bench(session_factory: async_sessionmaker[AsyncSession], session_id: UUID, rows: int, repeats: int) -> None:
+    transport = httpx.ASGITransport(app=_build_app(session_factory, rows))
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for label in ('orm', 'fast'):
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                response = await client.get(f'/{label}/{session_id}')
+                samples.append(time.perf_counter() - started)
+                assert len(response.json()) == rows, response.text[:200]
+            print(f'{label:<5} {rows} rows  median {statistics.median(samples) * 1000:8.1f} ms  min {min(samples) * 1000:8.1f} ms')
+
+
+async def run(database_url: str, rows: int, repeats: int) -> None:
+    engine = create_async_engine(database_url)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_id, _, _ = await _seed(session_factory, rows)
+        await _bench(session_factory, session_id, rows, repeats)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='ORM + response_model vs column rows + orjson for a large alert page.')
+    parser.add_argument('--database-url', default=settings.DATABASE_URL)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, args.rows, args.repeats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+from app.core import logging as app_logging
+from app.core.config import settings
+
+
+class SlowStream:
+    def __init__(self, write_latency: float) -> None:
+        self.write_latency = write_latency
+        self.records = 0
+
+    def write(self, data: str) -> None:
+        time.sleep(self.write_latency)
+        self.records += 1
+
+    def flush(self) -> None:
+        return None
+
+
+async def _lag_probe(stop: asyncio.Event, samples: list[float], interval: float = 0.005) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def _pressure(records: int, batch: int) -> tuple[float, list[float]]:
+    logger = logging.getLogger('app.detector')
+    stop = asyncio.Event()
+    samples: list[float] = []
+    probe = asyncio.create_task(_lag_probe(stop, samples))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    for i in range(records):
+        logger.warning('gaze_away detected', extra={'fields': {'frame': i, 'confidence': 0.93}})
+        if i % batch == 0:
+            await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, samples
+
+
+def _run(label: str, queue_size: int, records: int, batch: int, write_latency: float) -> None:
+    settings.LOG_QUEUE_SIZE = queue_size
+    stream = SlowStream(write_latency)
+    app_logging.setup_logging(stream)
+    elapsed, samples = asyncio.run(_pressure(records, batch))
+    drain_started = time.perf_counter()
+    app_logging.shutdown_logging()
+    drained = time.perf_counter() - drain_started
+    dropped = getattr(logging.getLogger().handlers[0], 'dropped', 0)
+
+    samples = sorted(samples) or [0.0]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f'{label:<7} {records / elapsed:10.0f} records/sec  '
+        f'loop lag p50 {statistics.median(samples):7.2f} ms  p99 {p99:7.2f} ms  max {samples[-1]:7.2f} ms  '
+        f'written {stream.records}  dropped {dropped}  drain {drained * 1000:.0f} ms'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Log throughput and event-loop lag with a slow stdout sink.')
+    parser.add_argument('--records', type=int, default=20_000)
+    parser.add_argument('--batch', type=int, default=50)
+    parser.add_argument('--write-latency-us', type=float, default=20.0)
+    parser.add_argument('--queue-size', type=int, default=settings.LOG_QUEUE_SIZE)
+    args = parser.parse_args()
+
+    write_latency = args.write_latency_us / 1_000_000
+    _run('stream', 0, args.records, args.batch, write_latency)
+    _run('queue', args.queue_size, args.records, args.batch, write_latency)
+
+
+if __name__ == '__main__':
+    main()
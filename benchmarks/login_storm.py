@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.security import PasswordHasher, pwd_context, verify_password
+
+
+async def _lag_probe(stop: asyncio.Event, samples: list[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def _storm(logins: int, verify) -> tuple[float, list[float]]:
+    stop = asyncio.Event()
+    samples: list[float] = []
+    probe = asyncio.create_task(_lag_probe(stop, samples))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(verify() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    return elapsed, samples
+
+
+def _report(label: str, logins: int, elapsed: float, samples: list[float]) -> None:
+    samples = sorted(samples) or [0.0]
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(
+        f'{label:<8} {logins / elapsed:8.1f} logins/sec  '
+        f'loop lag p50 {statistics.median(samples):8.1f} ms  p99 {p99:8.1f} ms  max {samples[-1]:8.1f} ms'
+    )
+
+
+async def run(logins: int, rounds: int, workers: int) -> None:
+    hashed = pwd_context.copy(bcrypt__rounds=rounds).hash('correct horse battery staple')
+
+    async def inline() -> None:
+        verify_password('correct horse battery staple', hashed)
+
+    hasher = PasswordHasher(ThreadPoolExecutor(max_workers=workers), max_pending=logins)
+
+    async def pooled() -> None:
+        await hasher.verify('correct horse battery staple', hashed)
+
+    _report('inline', logins, *await _storm(logins, inline))
+    _report('pooled', logins, *await _storm(logins, pooled))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Event-loop lag during a concurrent login storm.')
+    parser.add_argument('--logins', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.logins, args.rounds, args.workers))
+
+
+if __name__ == '__main__':
+    main()
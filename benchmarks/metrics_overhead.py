@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import Histogram, MetricsMiddleware
+
+
+class _Route:
+    path = '/bench/{item_id}'
+
+
+async def _endpoint(scope, receive, send) -> None:
+    scope['route'] = _Route
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'ok'})
+
+
+async def _receive() -> dict:
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def _send(message) -> None:
+    return None
+
+
+async def _drive(app, requests: int) -> float:
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({'type': 'http', 'method': 'GET', 'path': '/bench/1'}, _receive, _send)
+    return (time.perf_counter() - started) / requests * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Per-request cost of the metrics middleware and histogram observe.')
+    parser.add_argument('--requests', type=int, default=200_000)
+    args = parser.parse_args()
+
+    bare = asyncio.run(_drive(_endpoint, args.requests))
+    instrumented = asyncio.run(_drive(MetricsMiddleware(_endpoint), args.requests))
+
+    histogram = Histogram('bench_seconds', 'bench', ('route',))
+    started = time.perf_counter()
+    for i in range(args.requests):
+        histogram.observe(i * 1e-6, '/bench')
+    observe = (time.perf_counter() - started) / args.requests * 1e9
+
+    print(f'bare ASGI call:         {bare:8.0f} ns/request')
+    print(f'with MetricsMiddleware: {instrumented:8.0f} ns/request (+{instrumented - bare:.0f} ns)')
+    print(f'histogram observe:      {observe:8.0f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+import argparse
+import time
+from uuid import uuid4
+
+from app.db.rate_limits import RateLimiter, RatePolicy, TokenBuckets
+
+
+def _per_check(check, keys: list, checks: int) -> float:
+    started = time.perf_counter()
+    for i in range(checks):
+        check(keys[i % len(keys)])
+    return (time.perf_counter() - started) / checks * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Per-check cost of the in-process token buckets.')
+    parser.add_argument('--checks', type=int, default=1_000_000)
+    parser.add_argument('--keys', type=int, default=10_000)
+    args = parser.parse_args()
+
+    keys = [uuid4() for _ in range(args.keys)]
+    buckets = TokenBuckets(rate=1e9, burst=1e9, max_keys=args.keys)
+    limiter = RateLimiter(RatePolicy('bench', 10**9, 1.0, shared=False), None, max_keys=args.keys)
+    throttled = TokenBuckets(rate=1.0, burst=1.0, max_keys=args.keys)
+
+    print(f'loop + builtin call baseline:    {_per_check(hash, keys, args.checks):6.0f} ns')
+    print(f'TokenBuckets.take (allowed):     {_per_check(buckets.take, keys, args.checks):6.0f} ns')
+    print(f'TokenBuckets.take (rejected):    {_per_check(throttled.take, keys, args.checks):6.0f} ns')
+    print(f'RateLimiter.check_local:         {_per_check(limiter.check_local, keys, args.checks):6.0f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,358 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+SCENARIOS = ('login_storm', 'alert_ingest', 'list_alerts', 'list_alerts_etag', 'ws_fanout')
+HIGHER_IS_BETTER = ('throughput',)
+LOWER_IS_BETTER = ('p50_ms', 'p99_ms', 'loop_lag_p99_ms', 'rss_mb')
+PASSWORD = 'correct horse battery staple'
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _rss_mb() -> float:
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class LagProbe:
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> 'LagProbe':
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._task.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - expected) * 1000)
+
+
+async def _measure(operations: int, concurrency: int, op: Callable[[int], Awaitable[None]], **extra) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    indexes = iter(range(operations))
+
+    async def worker() -> None:
+        nonlocal errors
+        for index in indexes:
+            started = time.perf_counter()
+            try:
+                await op(index)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    async with LagProbe() as probe:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, operations))))
+        duration = time.perf_counter() - started
+    return _result(operations, errors, duration, latencies, probe, **extra)
+
+
+def _result(operations: int, errors: int, duration: float, latencies: list[float], probe: LagProbe, **extra) -> dict:
+    return {
+        'operations': operations,
+        'errors': errors,
+        'duration_s': round(duration, 4),
+        'throughput': round((operations - errors) / duration, 2) if duration else 0.0,
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 3),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+        'loop_lag_p99_ms': round(_percentile(probe.samples, 0.99), 3),
+        'loop_lag_max_ms': round(max(probe.samples, default=0.0), 3),
+        'rss_mb': round(_rss_mb(), 1),
+        **extra,
+    }
+
+
+class _Subscriber:
+    def __init__(self, sent_at: list[float], latencies: list[float]) -> None:
+        self.sent_at = sent_at
+        self.latencies = latencies
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        self.latencies.append(time.perf_counter() - self.sent_at[json.loads(data)['seq']])
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+async def _ws_fanout(sessions: int, subscribers: int, messages: int) -> dict:
+    from app.websocket.manager import ConnectionManager
+
+    manager = ConnectionManager()
+    session_ids = [uuid4() for _ in range(sessions)]
+    sent_at: list[float] = []
+    latencies: list[float] = []
+    sockets = [_Subscriber(sent_at, latencies) for _ in range(sessions * subscribers)]
+    for index, socket in enumerate(sockets):
+        await manager.connect(session_ids[index % sessions], socket)
+
+    async with LagProbe() as probe:
+        started = time.perf_counter()
+        for seq in range(messages):
+            sent_at.append(time.perf_counter())
+            await manager.broadcast(session_ids[seq % sessions], {'type': 'telemetry', 'seq': seq})
+            if seq % sessions == sessions - 1:
+                await asyncio.sleep(0)
+        while any(manager.queue_depths()):
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        duration = time.perf_counter() - started
+
+    stats = manager.stats()
+    for socket in sockets:
+        manager.disconnect(socket)
+    deliveries = messages * subscribers
+    return _result(
+        deliveries,
+        deliveries - len(latencies),
+        duration,
+        latencies,
+        probe,
+        dropped=stats['dropped_messages'],
+        evicted=stats['evicted_clients'],
+    )
+
+
+async def _seed(sessions: int) -> tuple[str, UUID, list[tuple[UUID, UUID]]]:
+    from app.core.security import password_hasher
+    from app.db.session import SessionLocal
+    from app.models import ExamSession, User
+    from app.models.user import UserRole
+
+    hashed = await password_hasher.hash(PASSWORD)
+    run_id = uuid4().hex[:8]
+    async with SessionLocal() as db:
+        invigilator = User(email=f'inv-{run_id}@bench.example.com', full_name='Bench', hashed_password=hashed, role=UserRole.INVIGILATOR)
+        students = [
+            User(email=f'stu-{run_id}-{i}@bench.example.com', full_name='Bench', hashed_password=hashed, role=UserRole.STUDENT)
+            for i in range(sessions)
+        ]
+        db.add_all([invigilator, *students])
+        await db.flush()
+        exam_sessions = [ExamSession(exam_name=f'bench-{run_id}', student_id=student.id) for student in students]
+        db.add_all(exam_sessions)
+        await db.commit()
+        return invigilator.email, invigilator.id, [(session.id, student.id) for session, student in zip(exam_sessions, students)]
+
+
+async def _run_scenarios(args: argparse.Namespace) -> dict:
+    # Imported after main() has pointed DATABASE_URL and REDIS_URL at the stand-ins.
+    import httpx
+
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.main import app
+
+    selected = args.scenarios
+    results: dict[str, dict] = {}
+    async with app.router.lifespan_context(app):
+        invigilator_email, invigilator_id, sessions = await _seed(args.sessions)
+        invigilator = {'Authorization': f'Bearer {create_access_token(str(invigilator_id))}'}
+        students = [{'Authorization': f'Bearer {create_access_token(str(student_id))}'} for _, student_id in sessions]
+        prefix = f'{settings.API_V1_PREFIX}/exam/sessions'
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+
+            async def expect(response: Awaitable[httpx.Response], *statuses: int) -> None:
+                status = (await response).status_code
+                if status not in statuses:
+                    raise RuntimeError(f'unexpected status {status}')
+
+            if 'login_storm' in selected:
+                body = {'email': invigilator_email, 'password': PASSWORD}
+                results['login_storm'] = await _measure(
+                    args.logins, args.concurrency, lambda _: expect(client.post(f'{settings.API_V1_PREFIX}/auth/login', json=body), 200)
+                )
+
+            if 'alert_ingest' in selected:
+                alert = {'severity': 'MEDIUM', 'event_type': 'face_not_visible', 'description': 'benchmark'}
+
+                def ingest(index: int) -> Awaitable[None]:
+                    session_id, _ = sessions[index % len(sessions)]
+                    headers = students[index % len(students)]
+                    return expect(client.post(f'{prefix}/{session_id}/alerts', json=alert, headers=headers), 201)
+
+                results['alert_ingest'] = await _measure(args.alerts, args.concurrency, ingest)
+
+            if 'list_alerts' in selected:
+
+                def poll(index: int) -> Awaitable[None]:
+                    session_id, _ = sessions[index % len(sessions)]
+                    return expect(client.get(f'{prefix}/{session_id}/alerts', params={'limit': 100}, headers=invigilator), 200)
+
+                results['list_alerts'] = await _measure(args.polls, args.concurrency, poll)
+
+            if 'list_alerts_etag' in selected:
+                etags = {}
+                for session_id, _ in sessions:
+                    response = await client.get(f'{prefix}/{session_id}/alerts', params={'limit': 100}, headers=invigilator)
+                    etags[session_id] = response.headers.get('etag', '')
+
+                def conditional_poll(index: int) -> Awaitable[None]:
+                    session_id, _ = sessions[index % len(sessions)]
+                    headers = {**invigilator, 'If-None-Match': etags[session_id]}
+                    return expect(client.get(f'{prefix}/{session_id}/alerts', params={'limit': 100}, headers=headers), 304)
+
+                results['list_alerts_etag'] = await _measure(args.polls, args.concurrency, conditional_poll)
+
+    if 'ws_fanout' in selected:
+        results['ws_fanout'] = await _ws_fanout(args.ws_sessions, args.ws_subscribers, args.ws_messages)
+    return results
+
+
+def _run(args: argparse.Namespace) -> int:
+    scratch = None if args.database_url else tempfile.mkdtemp(prefix='quasar-bench-')
+    database_url = args.database_url or f'sqlite+aiosqlite:///{Path(scratch) / "bench.db"}'
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['REDIS_URL'] = args.redis_url
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+    try:
+        scenarios = asyncio.run(_run_scenarios(args))
+    finally:
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    report = {
+        'meta': {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'database': database_url.split('://', 1)[0],
+            'redis': args.redis_url.split('://', 1)[0],
+            'parameters': {name: value for name, value in vars(args).items() if name not in ('command', 'out', 'database_url', 'redis_url')},
+        },
+        'scenarios': scenarios,
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(output + '\n')
+        _print_table(scenarios)
+    else:
+        print(output)
+    return 0
+
+
+def _print_table(scenarios: dict[str, dict]) -> None:
+    print(f'{"scenario":<18} {"ops/s":>10} {"p50 ms":>9} {"p99 ms":>9} {"lag p99":>9} {"rss MB":>8} {"errors":>7}')
+    for name, result in scenarios.items():
+        print(
+            f'{name:<18} {result["throughput"]:>10.1f} {result["p50_ms"]:>9.2f} {result["p99_ms"]:>9.2f} '
+            f'{result["loop_lag_p99_ms"]:>9.2f} {result["rss_mb"]:>8.1f} {result["errors"]:>7}'
+        )
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[dict]:
+    rows = []
+    for name in baseline['scenarios'].keys() & candidate['scenarios'].keys():
+        before, after = baseline['scenarios'][name], candidate['scenarios'][name]
+        for metric in itertools.chain(HIGHER_IS_BETTER, LOWER_IS_BETTER):
+            if not before.get(metric):
+                continue
+            change = (after[metric] - before[metric]) / before[metric]
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append(
+                {
+                    'scenario': name,
+                    'metric': metric,
+                    'baseline': before[metric],
+                    'candidate': after[metric],
+                    'change': round(change, 4),
+                    'regression': worse > threshold,
+                }
+            )
+        if after.get('errors', 0) > before.get('errors', 0):
+            rows.append(
+                {
+                    'scenario': name,
+                    'metric': 'errors',
+                    'baseline': before.get('errors', 0),
+                    'candidate': after['errors'],
+                    'change': None,
+                    'regression': True,
+                }
+            )
+    return sorted(rows, key=lambda row: (row['scenario'], row['metric']))
+
+
+def _compare(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text())
+    candidate = json.loads(Path(args.candidate).read_text())
+    rows = compare(baseline, candidate, args.threshold)
+    if args.json:
+        print(json.dumps({'threshold': args.threshold, 'comparisons': rows}, indent=2))
+    else:
+        for row in rows:
+            change = f'{row["change"]:+.1%}' if row['change'] is not None else 'n/a'
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(f'{row["scenario"]:<18} {row["metric"]:<16} {row["baseline"]:>12} {row["candidate"]:>12} {change:>9}  {flag}')
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='API and WebSocket hot-path benchmark suite with JSON output.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run the scenarios against local stand-ins')
+    run.add_argument('--database-url', help='Throwaway database, defaults to a temporary SQLite file')
+    run.add_argument('--redis-url', default='memory://')
+    run.add_argument('--out', help='Write JSON here and print a summary table instead of the JSON')
+    run.add_argument('--scenarios', type=lambda value: value.split(','), default=list(SCENARIOS))
+    run.add_argument('--concurrency', type=int, default=50)
+    run.add_argument('--sessions', type=int, default=20)
+    run.add_argument('--logins', type=int, default=32)
+    run.add_argument('--alerts', type=int, default=2000)
+    run.add_argument('--polls', type=int, default=2000)
+    run.add_argument('--ws-sessions', type=int, default=20)
+    run.add_argument('--ws-subscribers', type=int, default=25)
+    run.add_argument('--ws-messages', type=int, default=2000)
+
+    diff = commands.add_parser('compare', help='Flag regressions between two JSON results')
+    diff.add_argument('baseline')
+    diff.add_argument('candidate')
+    diff.add_argument('--threshold', type=float, default=0.10, help='Allowed relative slowdown per metric')
+    diff.add_argument('--json', action='store_true')
+
+    args = parser.parse_args()
+    sys.exit(_run(args) if args.command == 'run' else _compare(args))
+
+
+if __name__ == '__main__':
+    main()
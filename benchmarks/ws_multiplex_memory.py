@@ -0,0 +1,60 @@
+import argparse
+import asyncio
+import gc
+import tracemalloc
+from uuid import uuid4
+
+from app.websocket.manager import ConnectionManager
+
+
+class _NullWebSocket:
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        return None
+
+    async def close(self, code: int = 1000) -> None:
+        return None
+
+
+async def _measure(sessions: int, per_socket: int) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    manager = ConnectionManager()
+    session_ids = [uuid4() for _ in range(sessions)]
+    sockets = []
+    for offset in range(0, sessions, per_socket):
+        websocket = _NullWebSocket()
+        sockets.append(websocket)
+        if per_socket == 1:
+            await manager.connect(session_ids[offset], websocket)
+        else:
+            await manager.connect_multiplexed(websocket)
+            for session_id in session_ids[offset : offset + per_socket]:
+                await manager.subscribe(websocket, session_id)
+    await asyncio.sleep(0)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for websocket in sockets:
+        manager.disconnect(websocket)
+    await asyncio.sleep(0)
+    return len(sockets), current
+
+
+async def run(sessions: int, per_socket: int) -> None:
+    for label, fan_in in (('per-session', 1), ('multiplexed', per_socket)):
+        sockets, used = await _measure(sessions, fan_in)
+        print(f'{label:<12} sessions {sessions:>7}  sockets {sockets:>7}  manager memory {used / 1024 / 1024:8.2f} MiB')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Manager-side memory for per-session vs multiplexed invigilator sockets.')
+    parser.add_argument('--sessions', type=int, default=10_000)
+    parser.add_argument('--per-socket', type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.per_socket))
+
+
+if __name__ == '__main__':
+    main()
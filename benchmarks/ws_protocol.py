@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+import json
+import time
+from uuid import uuid4
+
+from app.websocket.framing import decode_records, encode_record
+from app.websocket.manager import ConnectionManager
+
+
+def _ws_header(size: int, masked: bool) -> int:
+    return (2 if size < 126 else 4 if size < 65536 else 10) + (4 if masked else 0)
+
+
+class _Socket:
+    def __init__(self) -> None:
+        self.messages = 0
+        self.wire_bytes = 0
+        self.scope = {'subprotocols': []}
+
+    async def accept(self, subprotocol: str | None = None) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        self._count(len(data.encode()))
+
+    async def send_bytes(self, data: bytes) -> None:
+        self._count(len(data))
+
+    def _count(self, size: int) -> None:
+        self.messages += 1
+        self.wire_bytes += size + _ws_header(size, masked=False)
+
+
+def _telemetry(i: int) -> dict:
+    return {'type': 'telemetry', 'seq': i, 'ts': 1_760_000_000.0 + i / 30, 'gaze': [0.41, -0.07], 'faces': 1, 'focus': True}
+
+
+def _inbound(mode: str, messages: int, client_batch: int) -> list:
+    if mode == 'json':
+        return [json.dumps(_telemetry(i)) for i in range(messages)]
+    records = [encode_record(json.dumps(_telemetry(i))) for i in range(messages)]
+    return [b''.join(records[i:i + client_batch]) for i in range(0, messages, client_batch)]
+
+
+async def _run(mode: str, messages: int, subscribers: int, client_batch: int, batch_interval: float | None) -> dict:
+    manager = ConnectionManager(queue_size=messages + 1, batch_interval=batch_interval)
+    session_id = uuid4()
+    sockets = [_Socket() for _ in range(subscribers)]
+    for socket in sockets:
+        await manager.connect(session_id, socket, binary=mode != 'json')
+    inbound = _inbound(mode, messages, client_batch)
+    inbound_bytes = sum(len(frame if isinstance(frame, bytes) else frame.encode()) for frame in inbound)
+    inbound_bytes += sum(_ws_header(len(frame), masked=True) for frame in inbound)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    for frame in inbound:
+        if mode == 'json':
+            await manager.broadcast(session_id, json.loads(frame))
+        else:
+            for record in decode_records(frame):
+                await manager.broadcast_raw(session_id, record.data, record.frame)
+        await asyncio.sleep(0)
+    while any(outbound.queue.qsize() for outbound in manager._outbound.values()):
+        await asyncio.sleep(batch_interval or 0)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    for socket in sockets:
+        manager.disconnect(socket)
+    return {
+        'inbound': inbound_bytes,
+        'outbound': sum(socket.wire_bytes for socket in sockets),
+        'sends': sum(socket.messages for socket in sockets),
+        'cpu_us': cpu / messages * 1e6,
+        'rate': messages / wall,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='JSON vs length-prefixed binary frames through ConnectionManager.')
+    parser.add_argument('--messages', type=int, default=20_000)
+    parser.add_argument('--subscribers', type=int, default=10)
+    parser.add_argument('--client-batch', type=int, default=10, help='Records per binary message sent by the client')
+    parser.add_argument('--batch-interval-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    interval = args.batch_interval_ms / 1000
+    runs = (('json', None), ('binary', None), ('binary+batch', interval))
+    print(f'{"path":<13} {"in bytes":>10} {"out bytes":>11} {"sends":>8} {"cpu/msg":>10} {"msgs/s":>10}')
+    for label, batch_interval in runs:
+        mode = 'json' if label == 'json' else 'binary'
+        result = asyncio.run(_run(mode, args.messages, args.subscribers, args.client_batch, batch_interval))
+        print(
+            f'{label:<13} {result["inbound"]:>10} {result["outbound"]:>11} {result["sends"]:>8} '
+            f'{result["cpu_us"]:>8.1f}us {result["rate"]:>10.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+import asyncio
+import atexit
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+# Run hermetically in embedded mode unless the environment points the suite at real services.
+_EMBEDDED_DIR = tempfile.mkdtemp(prefix='quasar-tests-')
+atexit.register(shutil.rmtree, _EMBEDDED_DIR, True)
+os.environ.setdefault('DATABASE_URL', f'sqlite+aiosqlite:///{_EMBEDDED_DIR}/quasar.db')
+os.environ.setdefault('REDIS_URL', 'memory://')
+os.environ.setdefault('PASSWORD_BULK_HASH_ROUNDS', '4')
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.profiling import QueryProfile, count_queries  # noqa: E402
+from app.db.session import engine as app_engine  # noqa: E402
+
+API_PREFIX = '/api/v1'
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line('markers', 'max_queries(limit): fail the test if it issues more than `limit` SQL statements')
+
+
+def _check_budget(profile: QueryProfile, limit: int, label: str) -> None:
+    if profile.count > limit:
+        statements = '\n'.join(f'  {count}x {statement}' for statement, count in profile.statements.most_common())
+        pytest.fail(f'{label} issued {profile.count} queries, budget is {limit}:\n{statements}', pytrace=False)
+
+
+@pytest.fixture
+def max_queries() -> Callable[..., AbstractContextManager[QueryProfile]]:
+    @contextmanager
+    def budget(limit: int, engine: Engine = app_engine.sync_engine, label: str = 'block') -> Iterator[QueryProfile]:
+        with count_queries(engine) as profile:
+            yield profile
+        _check_budget(profile, limit, label)
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def _max_queries_marker(request: pytest.FixtureRequest) -> Iterator[None]:
+    marker = request.node.get_closest_marker('max_queries')
+    if marker is None:
+        yield
+        return
+    with count_queries(marker.kwargs.get('engine', app_engine.sync_engine)) as profile:
+        yield
+    _check_budget(profile, marker.args[0], request.node.nodeid)
+
+
+@dataclass
+class TwoDatabases:
+    primary: async_sessionmaker[AsyncSession]
+    replica: async_sessionmaker[AsyncSession]
+    engines: list[AsyncEngine]
+
+
+@pytest.fixture
+def two_databases(tmp_path: Path) -> Iterator[TwoDatabases]:
+    async def create(name: str) -> AsyncEngine:
+        engine = create_async_engine(f'sqlite+aiosqlite:///{tmp_path / name}.db')
+        async with engine.begin() as conn:
+            await conn.execute(text('CREATE TABLE marker (name TEXT NOT NULL)'))
+            await conn.execute(text('INSERT INTO marker (name) VALUES (:name)'), {'name': name})
+        return engine
+
+    async def setup() -> list[AsyncEngine]:
+        return [await create('primary'), await create('replica')]
+
+    async def teardown(engines: list[AsyncEngine]) -> None:
+        for engine in engines:
+            await engine.dispose()
+
+    engines = asyncio.run(setup())
+    yield TwoDatabases(
+        primary=async_sessionmaker(engines[0], expire_on_commit=False),
+        replica=async_sessionmaker(engines[1], expire_on_commit=False),
+        engines=engines,
+    )
+    asyncio.run(teardown(engines))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_clock() -> FakeClock:
+    return FakeClock()
+
+
+class FakeWebSocket:
+    def __init__(self, stalled: bool = False) -> None:
+        self.sent: list[str | bytes] = []
+        self.closed: int | None = None
+        self.gate = asyncio.Event()
+        if not stalled:
+            self.gate.set()
+
+    async def accept(self, subprotocol: str | None = None) -> None:
+        return None
+
+    async def send_text(self, data: str) -> None:
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = code
+
+
+@pytest.fixture
+def fake_websocket() -> type[FakeWebSocket]:
+    return FakeWebSocket
+
+
+@dataclass
+class ApiUser:
+    id: str
+    email: str
+    token: str
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'Authorization': f'Bearer {self.token}'}
+
+
+@dataclass
+class ExamSetup:
+    invigilator: ApiUser
+    student: ApiUser
+    session_id: str
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return self.invigilator.headers
+
+    @property
+    def alerts_url(self) -> str:
+        return f'{API_PREFIX}/exam/sessions/{self.session_id}/alerts'
+
+
+def _api_user(client: TestClient, name: str, role: str = 'INVIGILATOR') -> ApiUser:
+    email = f'{name}@centre.example.com'
+    response = client.post(
+        f'{API_PREFIX}/auth/register',
+        json={'email': email, 'full_name': name, 'password': 'correct-horse', 'role': role},
+    )
+    assert response.status_code == 201, response.text
+    login = client.post(f'{API_PREFIX}/auth/login', json={'email': email, 'password': 'correct-horse'})
+    assert login.status_code == 200, login.text
+    return ApiUser(response.json()['id'], email, login.json()['access_token'])
+
+
+def _exam_setup(client: TestClient, name: str) -> ExamSetup:
+    invigilator = _api_user(client, f'{name}-inv')
+    student = _api_user(client, f'{name}-stu', 'STUDENT')
+    response = client.post(
+        f'{API_PREFIX}/exam/sessions',
+        json={'exam_name': name, 'student_id': student.id},
+        headers=invigilator.headers,
+    )
+    assert response.status_code == 201, response.text
+    return ExamSetup(invigilator, student, response.json()['id'])
+
+
+@pytest.fixture
+def api_user() -> Callable[..., ApiUser]:
+    return _api_user
+
+
+@pytest.fixture
+def exam_setup() -> Callable[[TestClient, str], ExamSetup]:
+    return _exam_setup
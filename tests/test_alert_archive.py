@@ -0,0 +1,100 @@
+import gzip
+from collections.abc import Callable
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.api import exam
+from app.db.alert_partitions import (
+    AlertArchive,
+    merge_archived,
+    month_start,
+    next_month,
+    partition_month,
+    partition_name,
+)
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.alert import Alert, AlertSeverity
+
+
+def test_partition_names_and_bounds() -> None:
+    assert month_start(date(2026, 10, 18)) == date(2026, 10, 1)
+    assert next_month(date(2026, 1, 1)) == date(2026, 2, 1)
+    assert next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+    assert partition_name(date(2026, 3, 1)) == 'alerts_p202603'
+    assert partition_month('alerts_p202603') == date(2026, 3, 1)
+    assert partition_month('alerts_default') is None
+
+
+def test_merge_archived_prefers_live_rows() -> None:
+    shared, old, new = uuid4(), uuid4(), uuid4()
+    archived = [type('Row', (), {'id': old})(), type('Row', (), {'id': shared, 'source': 'archive'})()]
+    live = [type('Row', (), {'id': shared, 'source': 'live'})(), type('Row', (), {'id': new})()]
+    merged = merge_archived(archived, live)
+    assert [row.id for row in merged] == [old, shared, new]
+    assert merged[1].source == 'live'
+
+
+def test_archived_partition_is_indexed_and_listed(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, exam_setup: Callable) -> None:
+    root = tmp_path / 'archive'
+    archive = AlertArchive(root)
+    monkeypatch.setattr(exam, 'alert_archive', archive)
+
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'archive')
+        session_id, url, headers = setup.session_id, setup.alerts_url, setup.headers
+        exam_uuid = UUID(session_id)
+        january = datetime(2026, 1, 15, 8, 30, tzinfo=timezone.utc)
+
+        async def insert_old() -> None:
+            async with SessionLocal() as db:
+                db.add_all(
+                    Alert(exam_session_id=exam_uuid, severity=AlertSeverity.HIGH, event_type=f'old{index}', description='x', created_at=january + timedelta(minutes=index))
+                    for index in range(2)
+                )
+                await db.commit()
+
+        client.portal.call(insert_old)
+        client.post(url, json={'severity': 'LOW', 'event_type': 'live', 'description': 'x'}, headers=headers)
+
+        other_worker = AlertArchive(root)
+        client.portal.call(other_worker.refresh)
+        assert not other_worker.has_session(exam_uuid)
+
+        async def write() -> int:
+            async with SessionLocal() as db:
+                return await archive.write_partition(db, 'alerts_p202601')
+
+        assert client.portal.call(write) == 2
+        files = archive.session_files(exam_uuid)
+        assert [path.relative_to(root).as_posix() for path in files] == [f'alerts_p202601/{session_id}.ndjson.gz']
+        lines = gzip.decompress(files[0].read_bytes()).splitlines()
+        assert [orjson.loads(line)['event_type'] for line in lines] == ['old0', 'old1']
+        assert orjson.loads((root / 'alerts_p202601' / 'MANIFEST.json').read_bytes())['rows'] == 2
+
+        client.portal.call(other_worker.refresh)
+        assert other_worker.session_files(exam_uuid) == files
+        assert not other_worker.has_session(uuid4())
+
+        listed = client.get(url, headers=headers).json()
+        assert sorted(alert['event_type'] for alert in listed) == ['live', 'old0', 'old1']
+        export = client.get(f'{url}/export', headers=headers)
+        assert [orjson.loads(line)['event_type'] for line in export.content.splitlines()] == ['old0', 'old1', 'live']
+
+        async def detach() -> None:
+            async with SessionLocal() as db:
+                await db.execute(delete(Alert).where(Alert.created_at < datetime(2026, 2, 1, tzinfo=timezone.utc)))
+                await db.commit()
+
+        client.portal.call(detach)
+        listed = client.get(url, params={'severity': 'HIGH'}, headers=headers).json()
+        assert [alert['event_type'] for alert in listed] == ['old1', 'old0']
+        export = client.get(f'{url}/export', headers=headers)
+        assert [orjson.loads(line)['event_type'] for line in export.content.splitlines()] == ['old0', 'old1', 'live']
+
@@ -0,0 +1,96 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.alert_buffer import AlertWriteBuffer
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models import ExamSession, User
+from app.models.alert import AlertSeverity
+from app.models.user import UserRole
+
+
+def _row(session_id: UUID, event_type: str = 'gaze_away') -> dict:
+    return {'exam_session_id': session_id, 'severity': AlertSeverity.LOW, 'event_type': event_type, 'description': 'x'}
+
+
+def _run(scenario: Callable[[UUID], Awaitable[None]]) -> None:
+    async def main() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with SessionLocal() as db:
+            student = User(email=f'{uuid4().hex}@centre.example.com', full_name='Student', hashed_password='x', role=UserRole.STUDENT)
+            db.add(student)
+            await db.flush()
+            session = ExamSession(exam_name='buffer', student_id=student.id)
+            db.add(session)
+            await db.commit()
+            session_id = session.id
+        try:
+            await scenario(session_id)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
+
+
+def test_flushes_when_full_without_waiting_for_the_timer() -> None:
+    async def scenario(session_id: UUID) -> None:
+        buffer = AlertWriteBuffer(SessionLocal, max_size=3, max_delay=60)
+        results = await asyncio.wait_for(asyncio.gather(*(buffer.submit([_row(session_id, f'e{i}')]) for i in range(3))), 5)
+        assert [alerts[0].event_type for alerts in results] == ['e0', 'e1', 'e2']
+
+    _run(scenario)
+
+
+def test_flushes_after_the_delay_and_on_drain() -> None:
+    async def scenario(session_id: UUID) -> None:
+        buffer = AlertWriteBuffer(SessionLocal, max_size=100, max_delay=0.05)
+        alerts = await asyncio.wait_for(buffer.submit([_row(session_id), _row(session_id, 'tab_switch')]), 5)
+        assert [alert.event_type for alert in alerts] == ['gaze_away', 'tab_switch']
+
+        buffer = AlertWriteBuffer(SessionLocal, max_size=100, max_delay=60)
+        pending = asyncio.create_task(buffer.submit([_row(session_id)]))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(buffer.drain(), 5)
+        assert pending.done() and pending.result()[0].exam_session_id == session_id
+
+    _run(scenario)
+
+
+def test_failing_request_does_not_fail_the_rest_of_the_batch() -> None:
+    async def scenario(session_id: UUID) -> None:
+        buffer = AlertWriteBuffer(SessionLocal, max_size=100, max_delay=0.01)
+        results = await asyncio.gather(
+            buffer.submit([_row(session_id, 'before')]),
+            buffer.submit([_row(session_id, 'fine'), _row(uuid4(), 'orphan')]),
+            buffer.submit([_row(session_id, 'after')]),
+            return_exceptions=True,
+        )
+        assert results[0][0].event_type == 'before'
+        assert isinstance(results[1], Exception)
+        assert results[2][0].event_type == 'after'
+
+    _run(scenario)
+
+
+@pytest.mark.parametrize('write_behind', [False, True], ids=['direct', 'write-behind'])
+def test_batch_endpoint(monkeypatch: pytest.MonkeyPatch, exam_setup: Callable, write_behind: bool) -> None:
+    from app.api import exam
+
+    monkeypatch.setattr(exam, 'alert_buffer', AlertWriteBuffer(SessionLocal, 500, 0.01) if write_behind else None)
+    with TestClient(app) as client:
+        setup = exam_setup(client, f'batch-{write_behind}')
+        alerts = [{'severity': 'HIGH', 'event_type': f'e{i}', 'description': 'x'} for i in range(3)]
+        response = client.post(f'{setup.alerts_url}:batch', json={'alerts': alerts}, headers=setup.headers)
+        assert response.status_code == 201, response.text
+        assert [alert['event_type'] for alert in response.json()] == ['e0', 'e1', 'e2']
+
+        missing = client.post(f'/api/v1/exam/sessions/{uuid4()}/alerts:batch', json={'alerts': alerts}, headers=setup.headers)
+        assert missing.status_code == 404
+        empty = client.post(f'{setup.alerts_url}:batch', json={'alerts': []}, headers=setup.headers)
+        assert empty.status_code == 422
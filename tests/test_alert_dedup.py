@@ -0,0 +1,77 @@
+import asyncio
+from collections.abc import Callable
+from uuid import uuid4
+
+import httpx
+import pytest
+from fakeredis.aioredis import FakeRedis
+from fastapi.testclient import TestClient
+
+from app.api import exam
+from app.db.alert_buffer import AlertWriteBuffer
+from app.db.alert_dedup import AlertDeduplicator
+from app.db.base import Base
+from app.db.local_store import LocalStore
+from app.db.session import SessionLocal, engine, redis_client
+from app.main import app
+from app.models.alert import AlertSeverity
+
+
+@pytest.mark.parametrize('write_behind', [False, True], ids=['direct', 'write-behind'])
+def test_concurrent_duplicates_collapse_into_one_row(monkeypatch: pytest.MonkeyPatch, exam_setup: Callable, write_behind: bool) -> None:
+    monkeypatch.setattr(exam, 'alert_deduplicator', AlertDeduplicator(redis_client, window_seconds=30, wait_seconds=5))
+    monkeypatch.setattr(exam, 'alert_buffer', AlertWriteBuffer(SessionLocal, 500, 0.02) if write_behind else None)
+
+    with TestClient(app) as client:
+        setup = exam_setup(client, f'burst-{write_behind}')
+    alerts_url, headers = setup.alerts_url, setup.headers
+
+    async def scenario() -> None:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                alert = {'severity': 'MEDIUM', 'event_type': 'face_not_visible', 'description': 'burst'}
+                responses = await asyncio.gather(*(client.post(alerts_url, json=alert, headers=headers) for _ in range(40)))
+                assert {response.status_code for response in responses} == {201}
+                assert len({response.json()['id'] for response in responses}) == 1
+
+                listed = (await client.get(alerts_url, headers=headers)).json()
+                assert len(listed) == 1
+                assert listed[0]['occurrences'] == 40
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('store', [lambda: FakeRedis(decode_responses=True), LocalStore], ids=['lua', 'local'])
+def test_orphan_takes_over_only_an_unchanged_key(store: Callable) -> None:
+    async def scenario() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        redis = store()
+        deduplicator = AlertDeduplicator(redis, window_seconds=30, wait_seconds=1)
+        session_id, gone = uuid4(), uuid4()
+        key = deduplicator._key(session_id, 'LOW', 'gaze_away')
+        row = {'exam_session_id': session_id, 'severity': AlertSeverity.LOW, 'event_type': 'gaze_away', 'description': 'x'}
+        try:
+            for rival in (None, 'pending:rival'):
+                await redis.set(key, str(gone), px=1000)
+                fresh, repeats = await deduplicator.claim(session_id, [row])
+                assert fresh == [] and repeats[0][0] == gone
+                if rival is not None:
+                    await redis.set(key, rival, px=1000)
+
+                async with SessionLocal() as db:
+                    writes, orphans = await deduplicator.bump(db, session_id, repeats)
+                assert writes == [] and [pending.row['id'] for pending in orphans] == [repeats[0][1].row['id']]
+                if rival is None:
+                    assert await redis.get(key) == f'pending:{orphans[0].row["id"]}'
+                    if isinstance(redis, FakeRedis):
+                        assert await redis.pttl(key) > 1000
+                    await deduplicator.release(session_id, orphans)
+                else:
+                    assert await redis.get(key) == rival
+                    assert key not in deduplicator._claims
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from app.db import alert_stats as alert_stats_module
+from app.db.alert_stats import AlertStats, alert_stats
+from app.db.base import Base
+from app.db.local_store import LocalStore
+from app.db.session import SessionLocal, engine, redis_client
+from app.main import app
+from app.models import Alert, ExamSession, User
+from app.models.alert import AlertSeverity
+from app.models.user import UserRole
+
+
+def test_coalesced_repeats_land_in_the_same_minute_live_and_rebuilt() -> None:
+    async def scenario() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        exam_name = f'stats-{uuid4().hex}'
+        first_seen = datetime(2026, 10, 18, 9, 59, 50, tzinfo=timezone.utc)
+        stats = AlertStats(LocalStore(), ttl_seconds=3600)
+        try:
+            async with SessionLocal() as db:
+                student = User(email=f'{uuid4().hex}@centre.example.com', full_name='Student', hashed_password='x', role=UserRole.STUDENT)
+                db.add(student)
+                await db.flush()
+                session = ExamSession(exam_name=exam_name, student_id=student.id)
+                db.add(session)
+                await db.flush()
+                alert = Alert(
+                    exam_session_id=session.id, severity=AlertSeverity.HIGH, event_type='gaze_away', description='x',
+                    created_at=first_seen, last_seen_at=first_seen,
+                )
+                db.add(alert)
+                await db.commit()
+                await stats.record(session.id, exam_name, [(alert, 1)])
+
+                # Two repeats coalesce into the row after the minute has rolled over.
+                bumped = (
+                    await db.scalars(
+                        update(Alert)
+                        .where(Alert.id == alert.id)
+                        .values(occurrences=3, last_seen_at=first_seen + timedelta(seconds=20))
+                        .returning(Alert)
+                    )
+                ).one()
+                await db.commit()
+                await stats.record(session.id, exam_name, [(bumped, 2)])
+
+                live = await stats.session_summary(session.id)
+                assert live['per_minute'] == {'2026-10-18T09:59': 3}
+                assert await stats.rebuild(db, exam_name) == 2
+                assert await stats.session_summary(session.id) == live
+                assert await stats.exam_summary(exam_name) == live
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_summary_endpoints_survive_a_rebuild(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'summary')
+        for severity, event_type in (('HIGH', 'gaze_away'), ('HIGH', 'gaze_away'), ('LOW', 'tab_switch'), ('CRITICAL', 'second_face')):
+            response = client.post(
+                setup.alerts_url, json={'severity': severity, 'event_type': event_type, 'description': 'x'}, headers=setup.headers
+            )
+            assert response.status_code == 201, response.text
+
+        urls = [f'/api/v1/exam/sessions/{setup.session_id}/summary', '/api/v1/exam/exams/summary/summary']
+        before = [client.get(url, headers=setup.headers).json() for url in urls]
+        assert before[0] == before[1]
+        assert before[0]['total'] == 4
+        assert before[0]['by_severity'] == {'LOW': 1, 'MEDIUM': 0, 'HIGH': 2, 'CRITICAL': 1}
+        assert before[0]['by_event_type'] == {'gaze_away': 2, 'tab_switch': 1, 'second_face': 1}
+        assert sum(before[0]['per_minute'].values()) == 4
+
+        async def lose_redis() -> None:
+            await redis_client.delete(alert_stats.session_key(UUID(setup.session_id)), alert_stats.exam_key('summary'))
+
+        client.portal.call(lose_redis)
+        assert client.get(urls[0], headers=setup.headers).json()['total'] == 0
+        client.portal.call(alert_stats_module._rebuild, 'summary')
+        assert [client.get(url, headers=setup.headers).json() for url in urls] == before
+
+        student = {'Authorization': f'Bearer {setup.student.token}'}
+        assert client.get(urls[0], headers=student).status_code == 403
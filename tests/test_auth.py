@@ -0,0 +1,56 @@
+from collections.abc import Callable
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.security import bulk_pwd_context, password_hasher
+from app.db.session import SessionLocal
+from app.main import app
+from app.models.user import User
+
+PREFIX = '/api/v1'
+
+
+def test_login_sheds_load_when_the_hash_pool_is_saturated(monkeypatch: pytest.MonkeyPatch, api_user: Callable) -> None:
+    with TestClient(app) as client:
+        user = api_user(client, 'busy-inv')
+        rejected = password_hasher.rejected
+        monkeypatch.setattr(password_hasher, 'pending', password_hasher.max_pending)
+
+        response = client.post(f'{PREFIX}/auth/login', json={'email': user.email, 'password': 'correct-horse'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert password_hasher.rejected == rejected + 1
+
+        monkeypatch.setattr(password_hasher, 'pending', 0)
+        assert client.post(f'{PREFIX}/auth/login', json={'email': user.email, 'password': 'correct-horse'}).status_code == 200
+
+
+@pytest.mark.parametrize('rehash', [False, True])
+def test_login_rehashes_low_cost_hashes(monkeypatch: pytest.MonkeyPatch, api_user: Callable, rehash: bool) -> None:
+    monkeypatch.setattr(settings, 'PASSWORD_REHASH_ON_LOGIN', rehash)
+    weak = bulk_pwd_context.hash('correct-horse')
+    assert weak.startswith('$2b$04$')
+
+    with TestClient(app) as client:
+        user = api_user(client, f'rehash-{rehash}-inv')
+
+        async def stored_hash(value: str | None = None) -> str:
+            async with SessionLocal() as db:
+                row = await db.get(User, UUID(user.id))
+                if value is not None:
+                    row.hashed_password = value
+                    await db.commit()
+                return row.hashed_password
+
+        client.portal.call(stored_hash, weak)
+        response = client.post(f'{PREFIX}/auth/login', json={'email': user.email, 'password': 'correct-horse'})
+        assert response.status_code == 200
+        upgraded = client.portal.call(stored_hash)
+        if rehash:
+            assert upgraded.startswith('$2b$12$')
+            assert client.post(f'{PREFIX}/auth/login', json={'email': user.email, 'password': 'correct-horse'}).status_code == 200
+        else:
+            assert upgraded == weak
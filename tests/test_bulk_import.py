@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.security import PasswordHasher, PasswordHasherBusy, bulk_password_hasher, verify_password
+from app.main import app
+
+PREFIX = '/api/v1'
+
+
+def test_bulk_hashing_runs_one_password_per_job_and_admits_one_import(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    calls: list[str] = []
+
+    def slow_hash(password: str) -> str:
+        calls.append(password)
+        release.wait(5)
+        return f'hashed-{password}'
+
+    monkeypatch.setattr(security, 'get_bulk_password_hash', slow_hash)
+
+    async def scenario() -> None:
+        hasher = PasswordHasher(ThreadPoolExecutor(max_workers=2), max_pending=2)
+        interactive = PasswordHasher(ThreadPoolExecutor(max_workers=1), max_pending=1)
+        importing = asyncio.create_task(hasher.hash_many([f'p{index}' for index in range(5)]))
+        await asyncio.sleep(0.05)
+        assert hasher.pending == 2
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.hash_many(['other'])
+        assert verify_password('secret', await interactive.hash('secret'))
+
+        release.set()
+        assert await importing == [f'hashed-p{index}' for index in range(5)]
+        assert sorted(calls) == [f'p{index}' for index in range(5)]
+
+    asyncio.run(scenario())
+
+
+def test_user_and_session_imports(monkeypatch: pytest.MonkeyPatch, api_user: Callable) -> None:
+    hashed: list[str] = []
+    hash_many = bulk_password_hasher.hash_many
+
+    async def recording_hash_many(passwords: list[str], parallelism: int | None = None) -> list[str]:
+        hashed.extend(passwords)
+        return await hash_many(passwords, parallelism)
+
+    monkeypatch.setattr(bulk_password_hasher, 'hash_many', recording_hash_many)
+    with TestClient(app) as client:
+        headers = api_user(client, 'import-inv').headers
+        student = {'full_name': 'Student', 'password': 'student-pass', 'role': 'STUDENT'}
+        rows = [
+            {**student, 'email': 'import-a@centre.example.com'},
+            {**student, 'email': 'import-a@centre.example.com'},
+            {**student, 'email': 'import-inv@centre.example.com', 'password': 'taken-pass'},
+            {**student, 'email': 'not-an-email'},
+        ]
+        response = client.post(f'{PREFIX}/users:batch', json=rows, headers=headers)
+        assert response.status_code == 201, response.text
+        body = response.json()
+        assert [user['email'] for user in body['created']] == ['import-a@centre.example.com']
+        assert [error['row'] for error in body['errors']] == [1, 2, 3]
+        assert body['errors'][1]['detail'] == 'Email already registered'
+        assert hashed == ['student-pass']
+
+        csv = 'email,full_name,password,role\nimport-b@centre.example.com,B,student-pass,STUDENT\n'
+        response = client.post(f'{PREFIX}/users:batch', content=csv, headers={**headers, 'Content-Type': 'text/csv'})
+        assert [user['email'] for user in response.json()['created']] == ['import-b@centre.example.com']
+        login = client.post(f'{PREFIX}/auth/login', json={'email': 'import-b@centre.example.com', 'password': 'student-pass'})
+        assert login.status_code == 200
+
+        sessions = [
+            {'exam_name': 'import', 'student_email': 'import-a@centre.example.com'},
+            {'exam_name': 'import', 'student_email': 'nobody@centre.example.com'},
+        ]
+        response = client.post(f'{PREFIX}/exam/sessions:batch', params={'start': 'true'}, json=sessions, headers=headers)
+        assert response.status_code == 201, response.text
+        body = response.json()
+        assert [session['status'] for session in body['created']] == ['ACTIVE']
+        assert body['errors'] == [{'row': 1, 'detail': 'Student not found'}]
+
+        assert client.post(f'{PREFIX}/users:batch', content='{}', headers={**headers, 'Content-Type': 'application/json'}).status_code == 400
+        assert client.post(f'{PREFIX}/users:batch', content='x', headers={**headers, 'Content-Type': 'text/plain'}).status_code == 415
@@ -0,0 +1,48 @@
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+PREFIX = '/api/v1'
+
+
+def test_unchanged_alert_list_is_not_modified(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'etag-unchanged')
+        first = client.get(setup.alerts_url, headers=setup.headers)
+        assert first.status_code == 200
+        etag = first.headers['ETag']
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+
+        for candidate in (etag, f'W/{etag}', f'"stale", {etag}'):
+            cached = client.get(setup.alerts_url, headers={**setup.headers, 'If-None-Match': candidate})
+            assert cached.status_code == 304
+            assert cached.headers['ETag'] == etag
+            assert cached.content == b''
+
+        filtered = client.get(setup.alerts_url, params={'severity': 'HIGH'}, headers={**setup.headers, 'If-None-Match': etag})
+        assert filtered.status_code == 200
+        assert filtered.headers['ETag'] != etag
+
+
+def test_alert_post_and_session_update_change_the_etag(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'etag-changed')
+        etags = [client.get(setup.alerts_url, headers=setup.headers).headers['ETag']]
+
+        alert = {'severity': 'HIGH', 'event_type': 'phone_detected', 'description': 'phone on desk'}
+        assert client.post(setup.alerts_url, json=alert, headers=setup.headers).status_code == 201
+        response = client.get(setup.alerts_url, headers={**setup.headers, 'If-None-Match': etags[-1]})
+        assert response.status_code == 200
+        assert [row['event_type'] for row in response.json()] == ['phone_detected']
+        etags.append(response.headers['ETag'])
+
+        started = client.post(f'{PREFIX}/exam/sessions/{setup.session_id}/start', headers=setup.headers)
+        assert started.status_code == 200
+        response = client.get(setup.alerts_url, headers={**setup.headers, 'If-None-Match': etags[-1]})
+        assert response.status_code == 200
+        etags.append(response.headers['ETag'])
+
+        assert len(set(etags)) == 3
+        assert client.get(setup.alerts_url, headers={**setup.headers, 'If-None-Match': etags[-1]}).status_code == 304
@@ -0,0 +1,135 @@
+import asyncio
+import shutil
+import time
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import session as db_session
+from app.db.session import ReplicaRouter, get_read_db
+
+
+async def _marker(router: ReplicaRouter) -> str:
+    async with (await router.read_sessionmaker())() as db:
+        return (await db.execute(text('SELECT name FROM marker'))).scalar_one()
+
+
+def test_reads_go_to_healthy_replica(two_databases, monkeypatch) -> None:
+    router = ReplicaRouter(two_databases.primary, two_databases.replica, max_lag=5, check_interval=0)
+    monkeypatch.setattr(db_session, 'db_router', router)
+
+    async def scenario() -> str:
+        dependency = get_read_db()
+        db = await anext(dependency)
+        try:
+            return (await db.execute(text('SELECT name FROM marker'))).scalar_one()
+        finally:
+            await dependency.aclose()
+
+    assert asyncio.run(scenario()) == 'replica'
+
+
+def test_unreachable_replica_falls_back_to_primary(two_databases, tmp_path) -> None:
+    unreachable = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/missing/replica.db')
+    router = ReplicaRouter(two_databases.primary, async_sessionmaker(unreachable), max_lag=5, check_interval=0)
+
+    async def scenario() -> str:
+        try:
+            return await _marker(router)
+        finally:
+            await unreachable.dispose()
+
+    assert asyncio.run(scenario()) == 'primary'
+
+
+def test_lagging_replica_falls_back_until_rechecked(two_databases) -> None:
+    class LaggingRouter(ReplicaRouter):
+        lag = 30.0
+
+        async def replica_lag(self) -> float:
+            return self.lag
+
+    router = LaggingRouter(two_databases.primary, two_databases.replica, max_lag=5, check_interval=60)
+
+    async def scenario() -> list[str]:
+        seen = [await _marker(router)]
+        router.lag = 0.0
+        seen.append(await _marker(router))
+        router._checked_at = float('-inf')
+        seen.append(await _marker(router))
+        return seen
+
+    assert asyncio.run(scenario()) == ['primary', 'primary', 'replica']
+
+
+def test_probe_gives_up_on_a_blackholed_replica(two_databases) -> None:
+    async def blackhole():
+        await asyncio.sleep(3600)
+
+    hanging = create_async_engine('sqlite+aiosqlite://', async_creator=blackhole)
+    router = ReplicaRouter(two_databases.primary, async_sessionmaker(hanging), max_lag=5, check_interval=60, probe_timeout=0.05)
+
+    async def scenario() -> tuple[str, float]:
+        started = time.monotonic()
+        try:
+            async with router.read_session() as db:
+                return (await db.execute(text('SELECT name FROM marker'))).scalar_one(), time.monotonic() - started
+        finally:
+            await hanging.dispose()
+
+    marker, elapsed = asyncio.run(scenario())
+    assert marker == 'primary'
+    assert elapsed < 1
+
+
+def test_replica_that_dies_between_checks_falls_back_on_checkout(two_databases, tmp_path) -> None:
+    (tmp_path / 'replica').mkdir()
+    replica = create_async_engine(f'sqlite+aiosqlite:///{tmp_path}/replica/replica.db')
+    router = ReplicaRouter(two_databases.primary, async_sessionmaker(replica), max_lag=5, check_interval=60)
+
+    async def read() -> str:
+        async with router.read_session() as db:
+            return (await db.execute(text('SELECT name FROM marker'))).scalar_one()
+
+    async def scenario() -> list[str]:
+        async with replica.begin() as conn:
+            await conn.execute(text('CREATE TABLE marker (name TEXT NOT NULL)'))
+            await conn.execute(text("INSERT INTO marker (name) VALUES ('replica')"))
+        try:
+            seen = [await read()]
+            await replica.dispose()
+            shutil.rmtree(tmp_path / 'replica')
+            seen.append(await read())
+            assert router._healthy is False
+            seen.append(await read())
+            return seen
+        finally:
+            await replica.dispose()
+
+    assert asyncio.run(scenario()) == ['replica', 'primary', 'primary']
+
+
+def test_query_that_loses_the_replica_is_retried_on_primary(two_databases) -> None:
+    replica_engine = two_databases.engines[1]
+
+    def drop_connection(conn, cursor, statement, parameters, context, executemany) -> None:
+        if 'marker' in statement:
+            raise OperationalError(statement, parameters, ConnectionResetError('server closed the connection'))
+
+    router = ReplicaRouter(two_databases.primary, two_databases.replica, max_lag=5, check_interval=60)
+
+    async def scenario() -> list[str]:
+        async with router.read_session() as db:
+            healthy = (await db.execute(text('SELECT name FROM marker'))).scalar_one()
+        event.listen(replica_engine.sync_engine, 'before_cursor_execute', drop_connection)
+        try:
+            async with router.read_session() as db:
+                scalars = (await db.scalars(text('SELECT name FROM marker'))).all()
+                streamed = [row.name async for row in await db.stream(text('SELECT name FROM marker'))]
+        finally:
+            event.remove(replica_engine.sync_engine, 'before_cursor_execute', drop_connection)
+        return [healthy, *scalars, *streamed]
+
+    assert asyncio.run(scenario()) == ['replica', 'primary', 'primary']
+    assert router._healthy is False
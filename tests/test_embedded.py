@@ -0,0 +1,101 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.db.local_store import LocalStore
+from app.db.refresh_tokens import RefreshTokenStore
+from app.db.session import engine, redis_client
+from app.db.versions import VersionStore
+from app.main import app
+
+
+def test_local_store_expiry_and_scripts(fake_clock: Callable[[], float]) -> None:
+    async def scenario() -> None:
+        clock = fake_clock
+        store = LocalStore(clock=clock)
+
+        assert await store.set('k', 1, ex=10) is True
+        assert await store.set('k', 2, nx=True, get=True) == '1'
+        assert await store.incr('k') == 2
+        clock.now += 10
+        assert await store.get('k') is None
+
+        async with store.pipeline() as pipe:
+            pipe.hincrby('h', 'total', 3)
+            pipe.expire('h', 5)
+            assert await pipe.execute() == [3, True]
+        assert await store.hgetall('h') == {'total': '3'}
+
+        versions = VersionStore(store, ttl_seconds=60)
+        first = await versions.bump_session('s')
+        assert await versions.bump_session('s') == first + 1
+        assert await versions.session_version('s') == first + 1
+
+        tokens = RefreshTokenStore(store, ttl_seconds=60)
+        await tokens.issue('user', 'old')
+        assert await tokens.rotate('user', 'old', 'new') is True
+        assert await tokens.rotate('user', 'old', 'newer') is False
+        assert await tokens.revoke_all('user') == 1
+
+    asyncio.run(scenario())
+
+
+def test_local_store_rejects_the_redis_broker() -> None:
+    with pytest.raises(ValidationError, match='WS_BROKER=redis'):
+        Settings(REDIS_URL='memory://', WS_BROKER='redis')
+    assert Settings(REDIS_URL='memory://', WS_BROKER='local').WS_BROKER == 'local'
+    assert Settings(REDIS_URL='redis://localhost:6379/0', WS_BROKER='redis').WS_BROKER == 'redis'
+    assert not hasattr(LocalStore(), 'pubsub')
+
+
+def test_api_round_trip_on_sqlite_and_local_store(exam_setup: Callable) -> None:
+    assert engine.dialect.name == 'sqlite'
+    assert isinstance(redis_client, LocalStore)
+
+    with TestClient(app) as client:
+        prefix = '/api/v1'
+        setup = exam_setup(client, 'embedded')
+        headers = setup.headers
+        tokens = client.post(f'{prefix}/auth/login', json={'email': setup.invigilator.email, 'password': 'correct-horse'}).json()
+        refreshed = client.post(f'{prefix}/auth/refresh', json={'refresh_token': tokens['refresh_token']})
+        assert refreshed.status_code == 200
+        assert client.post(f'{prefix}/auth/refresh', json={'refresh_token': tokens['refresh_token']}).status_code == 401
+
+        alerts_url = setup.alerts_url
+        for event_type in ('gaze_away', 'second_face', 'tab_switch'):
+            response = client.post(alerts_url, json={'severity': 'HIGH', 'event_type': event_type, 'description': 'x'}, headers=headers)
+            assert response.status_code == 201, response.text
+
+        listed = client.get(alerts_url, headers=headers)
+        assert [alert['event_type'] for alert in listed.json()] == ['tab_switch', 'second_face', 'gaze_away']
+        created = [datetime.fromisoformat(alert['created_at']) for alert in listed.json()]
+        assert all(value.tzinfo is not None for value in created)
+        assert any(value.microsecond for value in created)
+        assert client.get(alerts_url, headers={**headers, 'If-None-Match': listed.headers['etag']}).status_code == 304
+
+
+def test_keyset_pages_on_sqlite_do_not_repeat_rows(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'paging')
+        alerts_url, headers = setup.alerts_url, setup.headers
+        created = []
+        for index in range(5):
+            response = client.post(alerts_url, json={'severity': 'LOW', 'event_type': f'e{index}', 'description': 'x'}, headers=headers)
+            created.append(response.json())
+
+        seen, cursor = [], None
+        while True:
+            response = client.get(alerts_url, params={'limit': 2, **({'cursor': cursor} if cursor else {})}, headers=headers)
+            seen += [alert['event_type'] for alert in response.json()]
+            cursor = response.headers.get('x-next-cursor')
+            if cursor is None:
+                break
+        assert seen == ['e4', 'e3', 'e2', 'e1', 'e0']
+
+        since = client.get(alerts_url, params={'since': created[2]['created_at']}, headers=headers)
+        assert [alert['event_type'] for alert in since.json()] == ['e4', 'e3', 'e2']
@@ -0,0 +1,74 @@
+import asyncio
+import gzip
+import resource
+from collections.abc import Callable
+from datetime import datetime, timezone
+from urllib.parse import quote
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.api.export import ExportFormat, encode_rows
+from app.main import app
+from app.models.alert import AlertSeverity
+from app.schemas.exam import AlertRead
+
+FIELDS = tuple(AlertRead.model_fields)
+
+
+async def _partitions(total: int, chunk_size: int):
+    session_id = uuid4()
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for offset in range(0, total, chunk_size):
+        yield [
+            (uuid4(), session_id, AlertSeverity.LOW, 'gaze_away', f'alert {i}', created_at, 1, created_at)
+            for i in range(offset, min(offset + chunk_size, total))
+        ]
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def test_export_memory_stays_flat_for_one_million_rows() -> None:
+    async def scenario() -> tuple[int, float, float]:
+        written = 0
+        warm_peak = 0.0
+        async for chunk in encode_rows(_partitions(1_000_000, 1000), FIELDS, ExportFormat.NDJSON):
+            written += chunk.count(b'\n')
+            if written == 50_000:
+                warm_peak = _peak_rss_mb()
+        return written, warm_peak, _peak_rss_mb()
+
+    written, warm_peak, final_peak = asyncio.run(scenario())
+    assert written == 1_000_000
+    assert final_peak - warm_peak < 16
+
+
+def test_csv_export_is_gzip_compressed() -> None:
+    async def scenario() -> bytes:
+        return b''.join([chunk async for chunk in encode_rows(_partitions(10, 4), FIELDS, ExportFormat.CSV, compress=True)])
+
+    lines = gzip.decompress(asyncio.run(scenario())).decode().splitlines()
+    assert lines[0] == ','.join(FIELDS)
+    assert len(lines) == 11
+    assert lines[1].split(',')[2:4] == ['LOW', 'gaze_away']
+
+
+def test_exam_export_with_a_non_ascii_name(exam_setup: Callable) -> None:
+    name = '数学 "final"; paper'
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'unicode-export')
+        session = client.post(
+            '/api/v1/exam/sessions', json={'exam_name': name, 'student_id': setup.student.id}, headers=setup.headers
+        )
+        alert = {'severity': 'LOW', 'event_type': 'gaze_away', 'description': 'x'}
+        client.post(f'/api/v1/exam/sessions/{session.json()["id"]}/alerts', json=alert, headers=setup.headers)
+
+        response = client.get(f'/api/v1/exam/exams/{quote(name)}/alerts/export', params={'format': 'csv'}, headers=setup.headers)
+        assert response.status_code == 200
+        assert response.headers['content-disposition'] == (
+            'attachment; filename="alerts-____final___paper.csv"; '
+            "filename*=UTF-8''alerts-%E6%95%B0%E5%AD%A6%20%22final%22%3B%20paper.csv"
+        )
+        assert len(response.text.splitlines()) == 2
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from collections.abc import Callable
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.main import app
+from app.websocket.framing import BINARY_SUBPROTOCOL, FrameError, decode_records, encode_record
+from app.websocket.manager import ConnectionManager
+
+
+def test_decode_records_keeps_the_original_frames() -> None:
+    frames = [encode_record(json.dumps({'seq': seq, 'text': 'zażółć'})) for seq in range(3)]
+    records = decode_records(b''.join(frames))
+    assert [json.loads(record.data)['seq'] for record in records] == [0, 1, 2]
+    assert [record.frame for record in records] == frames
+
+    single = encode_record('{}')
+    assert decode_records(single)[0].frame is single
+    assert decode_records(b'') == []
+    assert decode_records(encode_record('[1, 2]'))[0].message == [1, 2]
+
+
+@pytest.mark.parametrize(
+    ('message', 'error'),
+    [
+        (encode_record('{}') + b'\x00\x00', 'Truncated record length'),
+        (encode_record('{"seq": 1}')[:-1], 'Truncated record payload'),
+        (encode_record('{}') + b'\x00\x00\x00\x02\xc3\x28', 'Record is not valid UTF-8'),
+        (encode_record('not json\n\ndata: {"forged": 1}'), 'Record is not valid JSON'),
+    ],
+    ids=['length', 'payload', 'utf-8', 'json'],
+)
+def test_decode_records_rejects_malformed_messages(message: bytes, error: str) -> None:
+    with pytest.raises(FrameError, match=error):
+        decode_records(message)
+
+
+def test_batch_joins_queued_records_up_to_the_byte_limit() -> None:
+    manager = ConnectionManager(batch_max_bytes=10)
+    queue: asyncio.Queue[bytes] = asyncio.Queue()
+    for record in (b'bbbb', b'cccc', b'dddd'):
+        queue.put_nowait(record)
+    assert manager._batch(queue, b'aaaa') == b'aaaabbbbcccc'
+    assert queue.qsize() == 1
+    assert manager._batch(queue, b'a' * 20) == b'a' * 20
+    assert manager._batch(queue, b'') == b'dddd'
+    assert queue.empty()
+
+
+def test_plain_binary_subscribers_receive_the_sender_bytes(fake_websocket: type) -> None:
+    async def scenario() -> None:
+        manager = ConnectionManager(batch_interval=None)
+        session_id = uuid4()
+        plain, multiplexed = fake_websocket(), fake_websocket()
+        await manager.connect(session_id, plain, binary=True)
+        await manager.connect_multiplexed(multiplexed, binary=True)
+        await manager.subscribe(multiplexed, session_id)
+
+        record = decode_records(encode_record('{"seq": 1}'))[0]
+        await manager.broadcast_raw(session_id, record.data, record.frame)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert plain.sent[0] is record.frame
+        assert json.loads(decode_records(multiplexed.sent[0])[0].data) == {'session_id': str(session_id), 'message': {'seq': 1}}
+        manager.disconnect(plain)
+        manager.disconnect(multiplexed)
+
+    asyncio.run(scenario())
+
+
+def test_exam_socket_closes_on_a_record_that_is_not_json(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'framing')
+        url = f'/ws/exam/{setup.session_id}?token={setup.student.token}'
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(url, subprotocols=[BINARY_SUBPROTOCOL]) as websocket:
+                websocket.send_bytes(encode_record('{"seq": 1}') + encode_record('not json\n\ndata: {"forged": 1}'))
+                websocket.receive_bytes()
+        assert closed.value.code == 1007
@@ -0,0 +1,111 @@
+import io
+import json
+import logging
+import queue
+from collections.abc import Iterator
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import logging as app_logging
+from app.core.config import settings
+from app.core.logging import DroppingQueueHandler, RequestContextMiddleware, SamplingFilter, session_id_var
+
+logger = logging.getLogger('quasar.tests')
+
+
+@pytest.fixture
+def log_stream(monkeypatch: pytest.MonkeyPatch) -> Iterator[io.StringIO]:
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    monkeypatch.setattr(settings, 'LOG_LEVEL', 'INFO')
+    stream = io.StringIO()
+    yield stream
+    app_logging.shutdown_logging()
+    root.handlers, root.level = handlers, level
+
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    return [line for line in map(json.loads, stream.getvalue().splitlines()) if line['logger'] == logger.name]
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get('/sessions/{session_id}')
+    async def handler(session_id: str) -> dict[str, str]:
+        session_id_var.set(session_id)
+        logger.info('handled', extra={'fields': {'step': 'read'}})
+        return {}
+
+    return app
+
+
+@pytest.mark.parametrize('queue_size', [0, 100], ids=['direct', 'queued'])
+def test_records_carry_request_and_session_context(monkeypatch: pytest.MonkeyPatch, log_stream: io.StringIO, queue_size: int) -> None:
+    monkeypatch.setattr(settings, 'LOG_QUEUE_SIZE', queue_size)
+    app_logging.setup_logging(log_stream)
+    client = TestClient(_build_app())
+
+    response = client.get('/sessions/s-1', headers={'X-Request-ID': 'req-1'})
+    generated = client.get('/sessions/s-2').headers['x-request-id']
+    logger.info('outside a request')
+    app_logging.shutdown_logging()
+
+    assert response.headers['x-request-id'] == 'req-1'
+    lines = _lines(log_stream)
+    assert [(line['message'], line.get('request_id'), line.get('session_id')) for line in lines] == [
+        ('handled', 'req-1', 's-1'),
+        ('handled', generated, 's-2'),
+        ('outside a request', None, None),
+    ]
+    assert lines[0]['step'] == 'read' and lines[0]['logger'] == 'quasar.tests' and lines[0]['level'] == 'INFO'
+
+
+def _record(name: str, created: float, level: int = logging.INFO) -> logging.LogRecord:
+    record = logging.LogRecord(name, level, __file__, 1, 'message', None, None)
+    record.created = created
+    return record
+
+
+def test_sampling_and_rate_limits(monkeypatch: pytest.MonkeyPatch) -> None:
+    sampler = SamplingFilter({'noisy': 0.25}, {'chatty': 2})
+    monkeypatch.setattr(app_logging.random, 'random', lambda: 0.5)
+    assert sampler.filter(_record('noisy', 10.0)) is False
+    monkeypatch.setattr(app_logging.random, 'random', lambda: 0.1)
+    assert sampler.filter(_record('noisy', 10.0)) is True
+
+    assert [sampler.filter(_record('chatty', 20.1)) for _ in range(3)] == [True, True, False]
+    assert sampler.filter(_record('chatty', 20.9, logging.ERROR)) is True
+    assert sampler.filter(_record('chatty', 21.0)) is True
+    assert sampler.filter(_record('other', 20.5)) is True
+    assert sampler.suppressed == 2
+
+
+def test_setup_installs_the_sampling_filter(monkeypatch: pytest.MonkeyPatch, log_stream: io.StringIO) -> None:
+    monkeypatch.setattr(settings, 'LOG_QUEUE_SIZE', 0)
+    monkeypatch.setattr(settings, 'LOG_RATE_LIMITS', {'quasar.tests': 1})
+    app_logging.setup_logging(log_stream)
+    for _ in range(3):
+        logger.info('burst')
+    logger.error('failure')
+    assert [line['message'] for line in _lines(log_stream)] == ['burst', 'failure']
+
+
+def test_full_queue_drops_instead_of_blocking_and_shutdown_flushes(monkeypatch: pytest.MonkeyPatch, log_stream: io.StringIO) -> None:
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record('quasar.tests', 1.0))
+    handler.handle(_record('quasar.tests', 1.0))
+    assert handler.dropped == 1 and handler.queue.qsize() == 1
+
+    monkeypatch.setattr(settings, 'LOG_QUEUE_SIZE', 1000)
+    app_logging.setup_logging(log_stream)
+    listener = app_logging._listener
+    assert isinstance(logging.getLogger().handlers[0], DroppingQueueHandler)
+    for index in range(200):
+        logger.info('queued %d', index)
+    app_logging.shutdown_logging()
+    assert app_logging._listener is None and listener._thread is None
+    assert [line['message'] for line in _lines(log_stream)] == [f'queued {index}' for index in range(200)]
@@ -0,0 +1,36 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import Registry
+from app.main import app
+
+
+def test_histogram_and_counter_rendering() -> None:
+    registry = Registry()
+    latency = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+    lookups = registry.counter('lookups_total', 'Lookups.', ('outcome',))
+    latency.observe(0.05, '/a')
+    latency.observe(0.5, '/a')
+    lookups.inc('hit', amount=2)
+
+    assert registry.render().splitlines() == [
+        '# HELP latency_seconds Latency.',
+        '# TYPE latency_seconds histogram',
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 2',
+        'latency_seconds_count{route="/a"} 2',
+        'latency_seconds_sum{route="/a"} 0.55',
+        '# HELP lookups_total Lookups.',
+        '# TYPE lookups_total counter',
+        'lookups_total{outcome="hit"} 2',
+    ]
+
+
+def test_monotonic_totals_are_exported_as_counters() -> None:
+    with TestClient(app) as client:
+        body = client.get('/metrics').text
+    for name in ('ws_dropped_messages_total', 'ws_evicted_clients_total', 'password_hash_rejected_total', 'principal_cache_lookups_total'):
+        assert f'# TYPE {name} counter' in body
+    for name in ('ws_send_queue_depth_max', 'ws_send_queue_depth_sum'):
+        assert f'# TYPE {name} gauge' in body
+        assert f'\n{name} 0\n' in body
@@ -0,0 +1,71 @@
+from collections.abc import Callable
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams, decode_cursor, encode_cursor, keyset_slice
+from app.main import app
+
+PREFIX = '/api/v1'
+
+
+def test_cursor_round_trip_and_rejects_garbage() -> None:
+    created_at, row_id = datetime(2026, 10, 18, 9, 30, 5, 123456, tzinfo=timezone.utc), uuid4()
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+    for cursor in ('not-base64!', encode_cursor(created_at, row_id)[:-8], 'bm8tc2VwYXJhdG9y'):
+        with pytest.raises(HTTPException) as raised:
+            decode_cursor(cursor)
+        assert raised.value.status_code == 400
+
+
+def test_keyset_slice_matches_database_order() -> None:
+    rows = [SimpleNamespace(created_at=datetime(2026, 10, 18, 9, minute), id=uuid4()) for minute in range(5)]
+    page = PageParams(cursor=None, limit=2)
+    first = keyset_slice(rows, page)
+    assert [row.created_at.minute for row in first] == [4, 3, 2]
+    page.cursor = encode_cursor(first[1].created_at, first[1].id)
+    assert [row.created_at.minute for row in keyset_slice(rows, page)] == [2, 1, 0]
+
+
+def _pages(client: TestClient, url: str, headers: dict, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({'cursor': cursor} if cursor else {})}, headers=headers)
+        assert response.status_code == 200, response.text
+        pages.append(response.json())
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_alert_pages_with_filters(exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'pages')
+        url, headers = setup.alerts_url, setup.headers
+
+        created = []
+        for index in range(7):
+            severity = 'HIGH' if index % 2 else 'LOW'
+            alert = {'severity': severity, 'event_type': f'e{index}', 'description': 'x'}
+            created.append(client.post(url, json=alert, headers=headers).json())
+
+        pages = _pages(client, url, headers, limit=3)
+        assert [len(page) for page in pages] == [3, 3, 1]
+        assert [alert['event_type'] for page in pages for alert in page] == [f'e{index}' for index in range(6, -1, -1)]
+
+        high = _pages(client, url, headers, limit=2, severity='HIGH')
+        assert [alert['event_type'] for page in high for alert in page] == ['e5', 'e3', 'e1']
+
+        recent = _pages(client, url, headers, limit=2, since=created[3]['created_at'])
+        assert [alert['event_type'] for page in recent for alert in page] == ['e6', 'e5', 'e4', 'e3']
+
+        assert client.get(url, params={'cursor': 'garbage'}, headers=headers).status_code == 400
+        assert client.get(url, params={'limit': 0}, headers=headers).status_code == 422
+
+        users = _pages(client, f'{PREFIX}/users/', headers, limit=1)
+        emails = [user['email'] for page in users for user in page]
+        assert len(emails) == len(set(emails)) and {'pages-inv@centre.example.com', 'pages-stu@centre.example.com'} <= set(emails)
@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+from sqlalchemy import select
+
+from app.db.base import Base
+from app.db.local_store import LocalStore
+from app.db.principals import Principal, PrincipalCache, principal_cache
+from app.db.session import SessionLocal, engine
+from app.models.user import User, UserRole
+
+
+class CountingLoader:
+    def __init__(self) -> None:
+        self.calls: list[UUID] = []
+
+    async def __call__(self, user_id: UUID) -> Principal:
+        self.calls.append(user_id)
+        return Principal(user_id, f'{user_id}@centre.example.com', 'Student', UserRole.STUDENT, datetime.now(timezone.utc))
+
+
+def test_local_tier_bounds_expiry_and_counts(fake_clock: Callable[[], float]) -> None:
+    async def scenario() -> None:
+        clock = fake_clock
+        cache = PrincipalCache(LocalStore(clock=clock), max_size=2, local_ttl=30, redis_ttl=300, clock=clock)
+        loader = CountingLoader()
+        first, second, third = uuid4(), uuid4(), uuid4()
+
+        await cache.get(first, loader)
+        await cache.get(first, loader)
+        await cache.get(second, loader)
+        await cache.get(third, loader)
+        assert cache.stats() == {'size': 2, 'local_hits': 1, 'redis_hits': 0, 'misses': 3}
+
+        # The least recently used entry was evicted locally but is still in the shared tier.
+        await cache.get(first, loader)
+        assert cache.stats()['redis_hits'] == 1
+
+        clock.now += 31
+        await cache.get(third, loader)
+        assert cache.stats()['redis_hits'] == 2
+        assert loader.calls == [first, second, third]
+
+        clock.now += 300
+        await cache.get(third, loader)
+        assert loader.calls == [first, second, third, third]
+
+    asyncio.run(scenario())
+
+
+def test_invalidation_reaches_other_workers() -> None:
+    async def scenario() -> None:
+        server = FakeServer()
+        workers = [
+            PrincipalCache(FakeRedis(server=server, decode_responses=True), max_size=10, local_ttl=300, redis_ttl=300)
+            for _ in range(2)
+        ]
+        for worker in workers:
+            await worker.start()
+        await asyncio.sleep(0.1)
+        loader = CountingLoader()
+        user_id = uuid4()
+        try:
+            await workers[0].get(user_id, loader)
+            await workers[1].get(user_id, loader)
+            assert workers[1].stats()['redis_hits'] == 1
+
+            await workers[0].invalidate(user_id)
+            for _ in range(50):
+                if workers[1].stats()['size'] == 0:
+                    break
+                await asyncio.sleep(0.02)
+            await workers[1].get(user_id, loader)
+            assert loader.calls == [user_id, user_id]
+        finally:
+            for worker in workers:
+                await worker.close()
+
+    asyncio.run(scenario())
+
+
+def test_committed_user_changes_invalidate_the_cache() -> None:
+    async def scenario() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with SessionLocal() as db:
+            user = User(email=f'{uuid4().hex}@centre.example.com', full_name='Before', hashed_password='x', role=UserRole.STUDENT)
+            db.add(user)
+            await db.commit()
+            user_id = user.id
+
+        async def load(user_id: UUID) -> Principal | None:
+            async with SessionLocal() as db:
+                user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+                return Principal.from_user(user) if user is not None else None
+
+        try:
+            assert (await principal_cache.get(user_id, load)).full_name == 'Before'
+            async with SessionLocal() as db:
+                user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+                user.full_name = 'After'
+                await db.flush()
+                await db.rollback()
+            assert (await principal_cache.get(user_id, load)).full_name == 'Before'
+
+            async with SessionLocal() as db:
+                user = (await db.execute(select(User).where(User.id == user_id))).scalar_one()
+                user.full_name = 'After'
+                await db.commit()
+            await asyncio.sleep(0.05)
+            assert (await principal_cache.get(user_id, load)).full_name == 'After'
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,48 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.profiling import QueryProfilerMiddleware, normalize_statement
+
+engine = create_engine('sqlite://')
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get('/sessions/{count}')
+    async def n_plus_one(count: int) -> dict[str, int]:
+        with engine.connect() as conn:
+            for session_id in range(count):
+                conn.execute(text('SELECT :id AS alert_count'), {'id': session_id})
+        return {'count': count}
+
+    return app
+
+
+def test_normalize_statement_collapses_whitespace_and_in_lists() -> None:
+    assert normalize_statement('SELECT *\n  FROM alerts WHERE id IN ($1, $2, $3)') == 'SELECT * FROM alerts WHERE id IN (...)'
+
+
+def test_server_timing_and_n_plus_one_warning(max_queries, caplog) -> None:
+    client = TestClient(_build_app())
+    with max_queries(6, engine=engine) as profile, caplog.at_level('WARNING', logger='app.core.profiling'):
+        response = client.get('/sessions/6')
+
+    assert profile.count == 6
+    assert response.headers['server-timing'].endswith('desc="6 queries"')
+    assert any(record.fields['repeated'] == {'SELECT ? AS alert_count': 6} for record in caplog.records)
+
+
+def test_query_budget_fails_when_exceeded(max_queries) -> None:
+    client = TestClient(_build_app())
+    with pytest.raises(pytest.fail.Exception, match='issued 3 queries, budget is 2'):
+        with max_queries(2, engine=engine):
+            client.get('/sessions/3')
+
+
+@pytest.mark.max_queries(1, engine=engine)
+def test_max_queries_marker() -> None:
+    TestClient(_build_app()).get('/sessions/1')
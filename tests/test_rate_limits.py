@@ -0,0 +1,74 @@
+import asyncio
+from ipaddress import ip_network
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from starlette.requests import Request
+
+from app.api import deps
+from app.db.local_store import LocalStore
+from app.db.rate_limits import _WINDOW_SCRIPT, RateLimiter, RatePolicy, TokenBuckets
+
+
+def test_policy_parse() -> None:
+    assert RatePolicy.parse('login', '10/m') == RatePolicy('login', 10, 60.0, True)
+    assert RatePolicy.parse('alerts', ' 20 / 5s ', shared=False) == RatePolicy('alerts', 20, 5.0, False)
+    assert RatePolicy.parse('bulk', '100/1.5h').period == 5400.0
+    for spec in ('0/s', '10', '10/d', 'ten/m', '-1/s'):
+        with pytest.raises(ValueError):
+            RatePolicy.parse('bad', spec)
+
+
+def test_token_bucket_refills_and_bounds_keys() -> None:
+    buckets = TokenBuckets(rate=2.0, burst=3, max_keys=2)
+    assert [buckets.take('a', now=0.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take('a', now=0.0) == pytest.approx(0.5)
+    assert buckets.take('a', now=0.5) == 0.0
+    assert buckets.take('a', now=100.0) == 0.0
+    assert [buckets.take('a', now=100.0) for _ in range(3)][-1] == pytest.approx(0.5)
+
+    buckets.take('b', now=100.0)
+    buckets.take('c', now=100.0)
+    assert len(buckets) == 2
+
+
+@pytest.mark.parametrize('store', [lambda: FakeRedis(decode_responses=True), LocalStore], ids=['lua', 'local'])
+def test_sliding_window_script(store) -> None:
+    async def scenario() -> None:
+        window = store().register_script(_WINDOW_SCRIPT)
+        keys = ['w:1', 'w:0']
+        assert [await window(keys=keys, args=[100, 1000, 3]) for _ in range(4)] == [0, 0, 0, 900]
+
+        # The next window still carries the previous count, weighted by how much of it overlaps.
+        keys = ['w:2', 'w:1']
+        assert await window(keys=keys, args=[100, 1000, 3]) == 900
+        assert [await window(keys=keys, args=[700, 1000, 3]) for _ in range(3)] == [0, 0, 300]
+
+    asyncio.run(scenario())
+
+
+def test_shared_window_limits_across_workers() -> None:
+    async def scenario() -> None:
+        redis = FakeRedis(decode_responses=True)
+        policy = RatePolicy('login_ip', 3, 60.0, True)
+        workers = [RateLimiter(policy, redis, max_keys=10), RateLimiter(policy, redis, max_keys=10)]
+        waits = [await workers[index % 2].check('10.0.0.1') for index in range(4)]
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] > 0
+
+    asyncio.run(scenario())
+
+
+def _request(peer: str, forwarded: str | None = None) -> Request:
+    headers = [(b'x-forwarded-for', forwarded.encode())] if forwarded is not None else []
+    return Request({'type': 'http', 'headers': headers, 'client': (peer, 1234)})
+
+
+def test_client_ip_honours_trusted_proxies(monkeypatch: pytest.MonkeyPatch) -> None:
+    assert deps.client_ip(_request('10.0.0.5', '203.0.113.9')) == '10.0.0.5'
+
+    monkeypatch.setattr(deps, 'trusted_proxies', [ip_network('10.0.0.0/8')])
+    assert deps.client_ip(_request('10.0.0.5', '203.0.113.9')) == '203.0.113.9'
+    assert deps.client_ip(_request('10.0.0.5', '198.51.100.1, 203.0.113.9, 10.1.2.3')) == '203.0.113.9'
+    assert deps.client_ip(_request('10.0.0.5')) == '10.0.0.5'
+    assert deps.client_ip(_request('192.0.2.7', '203.0.113.9')) == '192.0.2.7'
@@ -0,0 +1,73 @@
+import asyncio
+from collections.abc import Callable
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+
+from app.db.local_store import LocalStore
+from app.db.refresh_tokens import RefreshTokenStore
+
+STORES = pytest.mark.parametrize('store', [lambda: FakeRedis(decode_responses=True), LocalStore], ids=['lua', 'local'])
+
+
+@STORES
+def test_rotation_detects_reuse_and_revokes_the_family(store: Callable) -> None:
+    async def scenario() -> None:
+        redis = store()
+        tokens = RefreshTokenStore(redis, ttl_seconds=60)
+        await tokens.issue('user', 'laptop')
+        await tokens.issue('user', 'phone')
+
+        assert await tokens.rotate('user', 'laptop', 'laptop-2') is True
+        assert await tokens.rotate('user', 'laptop', 'stolen') is False
+        assert await tokens.rotate('other', 'phone', 'phone-2') is False
+        assert await redis.get('refresh:' + tokens.digest('laptop')) is None
+        assert await redis.get('refresh:' + tokens.digest('laptop-2')) == 'user'
+
+        assert await tokens.revoke_all('user') == 2
+        assert await tokens.rotate('user', 'phone', 'phone-2') is False
+        assert await tokens.rotate('user', 'laptop-2', 'laptop-3') is False
+        assert await tokens.revoke_all('user') == 0
+
+    asyncio.run(scenario())
+
+
+@STORES
+def test_expired_digests_are_pruned_from_the_family(store: Callable, fake_clock: Callable[[], float]) -> None:
+    async def scenario() -> None:
+        redis = store()
+        tokens = RefreshTokenStore(redis, ttl_seconds=60, clock=fake_clock)
+        for device in ('a', 'b', 'c'):
+            await tokens.issue('user', device)
+        fake_clock.now += 30
+        await tokens.issue('user', 'd')
+        assert len(await redis.zrange('refresh_family:user', 0, -1)) == 4
+
+        fake_clock.now += 31
+        await tokens.issue('user', 'e')
+        assert await redis.zrange('refresh_family:user', 0, -1) == [tokens.digest('d'), tokens.digest('e')]
+        fake_clock.now += 30
+        await tokens.rotate('user', 'e', 'f')
+        assert await redis.zrange('refresh_family:user', 0, -1) == [tokens.digest('f')]
+
+    asyncio.run(scenario())
+
+
+def test_families_from_older_releases_are_converted() -> None:
+    async def scenario() -> None:
+        redis = FakeRedis(decode_responses=True)
+        tokens = RefreshTokenStore(redis, ttl_seconds=60)
+        await redis.set('refresh:' + tokens.digest('legacy'), 'user', ex=60)
+        await redis.sadd('refresh_family:user', tokens.digest('legacy'))
+
+        await tokens.issue('user', 'fresh')
+        assert await redis.type('refresh_family:user') == 'zset'
+        assert await tokens.rotate('user', 'legacy', 'legacy-2') is True
+        assert await tokens.revoke_all('user') == 2
+
+        await redis.sadd('refresh_family:other', tokens.digest('old'))
+        await redis.set('refresh:' + tokens.digest('old'), 'other', ex=60)
+        assert await tokens.revoke_all('other') == 1
+        assert await redis.get('refresh:' + tokens.digest('old')) is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,36 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+from app.websocket.broker import RedisBroker
+from app.websocket.manager import ConnectionManager
+
+
+def test_broadcast_reaches_subscribers_on_other_workers(fake_websocket: type) -> None:
+    async def scenario() -> None:
+        server = FakeServer()
+        worker_a = ConnectionManager(broker=RedisBroker(FakeRedis(server=server, decode_responses=True)))
+        worker_b = ConnectionManager(broker=RedisBroker(FakeRedis(server=server, decode_responses=True)))
+        session_id = uuid4()
+        student, invigilator = fake_websocket(), fake_websocket()
+        await worker_a.connect(session_id, student)
+        await worker_b.connect(session_id, invigilator)
+
+        await worker_a.broadcast(session_id, {'event': 'gaze_away'})
+        for _ in range(50):
+            if invigilator.sent:
+                break
+            await asyncio.sleep(0.05)
+
+        assert [json.loads(frame) for frame in invigilator.sent] == [{'event': 'gaze_away'}]
+        assert [json.loads(frame) for frame in student.sent] == [{'event': 'gaze_away'}]
+
+        worker_a.disconnect(student)
+        worker_b.disconnect(invigilator)
+        await worker_a.close()
+        await worker_b.close()
+
+    asyncio.run(scenario())
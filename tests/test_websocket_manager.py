@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api import exam
+from app.db.local_store import LocalStore
+from app.main import app
+from app.websocket.event_log import RedisEventLog
+from app.websocket.manager import ConnectionManager, SlowConsumerPolicy
+from app.websocket.manager import manager as app_manager
+
+
+def _seqs(websocket) -> list[int]:
+    return [json.loads(frame)['seq'] for frame in websocket.sent]
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.parametrize(
+    ('policy', 'dropped', 'stalled_receives'),
+    [
+        (SlowConsumerPolicy.DROP_OLDEST, 7, [0, 8, 9]),
+        (SlowConsumerPolicy.COALESCE, 8, [0, 9]),
+    ],
+)
+def test_slow_consumer_loses_messages_without_holding_back_others(
+    fake_websocket: type, policy: SlowConsumerPolicy, dropped: int, stalled_receives: list[int]
+) -> None:
+    async def scenario() -> None:
+        manager = ConnectionManager(queue_size=2, policy=policy)
+        session_id = uuid4()
+        fast, stalled = fake_websocket(), fake_websocket(stalled=True)
+        await manager.connect(session_id, fast)
+        await manager.connect(session_id, stalled)
+
+        for seq in range(10):
+            await manager.broadcast(session_id, {'seq': seq})
+            await _settle()
+        assert _seqs(fast) == list(range(10))
+        assert manager.dropped_messages == dropped
+        assert manager.evicted_clients == 0
+
+        stalled.gate.set()
+        await _settle()
+        assert _seqs(stalled) == stalled_receives
+        manager.disconnect(fast)
+        manager.disconnect(stalled)
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_evicts_the_slow_consumer(fake_websocket: type) -> None:
+    async def scenario() -> None:
+        manager = ConnectionManager(queue_size=2, policy=SlowConsumerPolicy.DISCONNECT)
+        session_id = uuid4()
+        fast, stalled = fake_websocket(), fake_websocket(stalled=True)
+        await manager.connect(session_id, fast)
+        await manager.connect(session_id, stalled)
+
+        for seq in range(10):
+            await manager.broadcast(session_id, {'seq': seq})
+            await _settle()
+        assert _seqs(fast) == list(range(10))
+        assert manager.evicted_clients == 1
+        assert manager.dropped_messages == 0
+        assert stalled.closed == 1013
+        assert manager.stats()['connections'] == 1
+        manager.disconnect(fast)
+
+    asyncio.run(scenario())
+
+
+class GatedEventLog(RedisEventLog):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def read_after(self, session_id: UUID, last_event_id: str) -> list[tuple[str, str]]:
+        await self.gate.wait()
+        return await super().read_after(session_id, last_event_id)
+
+
+def _resumed(websocket) -> list[tuple[str, int]]:
+    return [(frame['id'], frame['message']['seq']) for frame in map(json.loads, websocket.sent)]
+
+
+def test_reconnect_replays_the_missed_tail_then_live_events_once(fake_websocket: type) -> None:
+    async def scenario() -> None:
+        event_log = GatedEventLog(LocalStore(), maxlen=100, ttl_seconds=60)
+        manager = ConnectionManager(event_log=event_log)
+        session_id = uuid4()
+        watcher = fake_websocket()
+        await manager.connect(session_id, watcher, last_event_id='$')
+        for seq in range(5):
+            await manager.broadcast(session_id, {'seq': seq})
+        await _settle()
+        history = _resumed(watcher)
+        assert [seq for _, seq in history] == [0, 1, 2, 3, 4]
+
+        # Events published while the replay is still being read land in the backlog and in the log.
+        event_log.gate.clear()
+        client = fake_websocket()
+        connecting = asyncio.create_task(manager.connect(session_id, client, last_event_id=history[1][0]))
+        await _settle()
+        for seq in (5, 6):
+            await manager.broadcast(session_id, {'seq': seq})
+        event_log.gate.set()
+        await connecting
+        for seq in (7, 8):
+            await manager.broadcast(session_id, {'seq': seq})
+        await _settle()
+
+        received = _resumed(client)
+        assert [seq for _, seq in received] == [2, 3, 4, 5, 6, 7, 8]
+        assert received == _resumed(watcher)[2:]
+        manager.disconnect(watcher)
+        manager.disconnect(client)
+
+    asyncio.run(scenario())
+
+
+def test_event_stream_resumes_after_last_event_id(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def scenario() -> None:
+        manager = ConnectionManager(event_log=RedisEventLog(LocalStore(), maxlen=100, ttl_seconds=60))
+        monkeypatch.setattr(exam, 'manager', manager)
+        session_id = uuid4()
+        ids = [await manager.event_log.append(session_id, json.dumps({'seq': seq})) for seq in range(3)]
+
+        response = await exam.stream_session_events(session_id, last_event_id=ids[0], _=None)
+        stream = response.body_iterator
+        replayed = [await anext(stream) for _ in range(2)]
+        assert replayed == [f'id: {ids[1]}\ndata: {{"seq": 1}}\n\n', f'id: {ids[2]}\ndata: {{"seq": 2}}\n\n']
+
+        pending = asyncio.create_task(anext(stream))
+        await _settle()
+        live = await manager.event_log.append(session_id, '{"seq": 3,\r\n"forged": "x"}\n\ndata: 1')
+        assert await asyncio.wait_for(pending, 5) == f'id: {live}\ndata: {{"seq": 3,\ndata: "forged": "x"}}\ndata: \ndata: data: 1\n\n'
+        await stream.aclose()
+
+    asyncio.run(scenario())
+
+
+def test_invigilator_socket_subscriptions(api_user: Callable) -> None:
+    with TestClient(app) as client:
+        token = api_user(client, 'multiplex-inv').token
+        first, second = str(uuid4()), str(uuid4())
+        baseline = app_manager.stats()
+
+        with client.websocket_connect(f'/ws/invigilator?token={token}') as websocket:
+            websocket.send_json({'action': 'subscribe', 'session_ids': [first, second]})
+            assert websocket.receive_json() == {'type': 'subscribed', 'session_ids': [first, second]}
+            assert app_manager.stats()['subscriptions'] == baseline['subscriptions'] + 2
+
+            client.portal.call(app_manager.broadcast, UUID(first), {'seq': 1})
+            assert websocket.receive_json() == {'session_id': first, 'message': {'seq': 1}}
+
+            websocket.send_json({'action': 'unsubscribe', 'session_ids': [first]})
+            assert websocket.receive_json() == {'type': 'unsubscribed', 'session_ids': [first]}
+            client.portal.call(app_manager.broadcast, UUID(first), {'seq': 2})
+            client.portal.call(app_manager.broadcast, UUID(second), {'seq': 3})
+            assert websocket.receive_json() == {'session_id': second, 'message': {'seq': 3}}
+
+            websocket.send_json({'action': 'subscribe', 'session_ids': ['not-a-uuid']})
+            assert websocket.receive_json()['type'] == 'error'
+            websocket.send_json(['subscribe'])
+            assert websocket.receive_json()['type'] == 'error'
+
+        for _ in range(50):
+            if app_manager.stats() == baseline:
+                break
+            time.sleep(0.02)
+        assert app_manager.stats() == baseline
+
+        student = api_user(client, 'multiplex-stu', 'STUDENT').token
+        for query in (f'token={student}', 'token=garbage'):
+            with pytest.raises(WebSocketDisconnect) as closed:
+                with client.websocket_connect(f'/ws/invigilator?{query}') as websocket:
+                    websocket.receive_json()
+            assert closed.value.code == 1008
+
+
+def test_exam_socket_requires_the_session_student_or_an_invigilator(api_user: Callable, exam_setup: Callable) -> None:
+    with TestClient(app) as client:
+        setup = exam_setup(client, 'exam-socket')
+        other = api_user(client, 'exam-socket-other', 'STUDENT')
+        url = f'/ws/exam/{setup.session_id}'
+        for query in (f'?token={other.token}', '?token=garbage', ''):
+            with pytest.raises(WebSocketDisconnect) as closed:
+                with client.websocket_connect(f'{url}{query}') as websocket:
+                    websocket.receive_json()
+            assert closed.value.code == 1008
+
+        with client.websocket_connect(f'{url}?token={setup.invigilator.token}') as invigilator:
+            with client.websocket_connect(f'{url}?token={setup.student.token}') as student:
+                student.send_json({'type': 'telemetry', 'seq': 1})
+                assert invigilator.receive_json() == {'type': 'telemetry', 'seq': 1}
+
+                response = client.post(
+                    setup.alerts_url, json={'severity': 'HIGH', 'event_type': 'gaze_away', 'description': 'x'}, headers=setup.headers
+                )
+                pushed = invigilator.receive_json()
+                assert pushed['type'] == 'alert.created'
+                assert pushed['data'] == response.json()
+
+                assert [student.receive_json()['type'] for _ in range(2)] == ['telemetry', 'alert.created']
+                student.send_json({'type': 'alert.created', 'data': {'event_type': 'forged'}})
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    student.receive_json()
+                assert closed.value.code == 1008
+
+            client.portal.call(app_manager.broadcast, UUID(setup.session_id), {'seq': 2})
+            assert invigilator.receive_json() == {'seq': 2}